@@ -0,0 +1,280 @@
+"""
+Batch review of many pull requests in one process.
+
+This module runs AgentTorero crews for a list of pull requests through a bounded
+pool of worker threads. The imports, the HTTP session, the LLM clients and the
+test case index are loaded once and shared by every job, and each pull request
+gets its own report file.
+"""
+
+import functools
+import math
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from src.agent_torero.config import get_config, get_int_config
+from src.agent_torero.handlers.github import get_session, list_open_pull_requests
+from src.agent_torero.handlers.jira import (JIRAHandler, check_jira_client,
+                                            get_ticket_cache)
+from src.agent_torero.handlers.keywords import get_test_case_index
+from src.agent_torero.ratelimit import get_scheduler
+
+
+def parse_targets(
+    selectors: Iterable[str],
+    list_pull_requests: Callable[[str], List[int]] = list_open_pull_requests,
+) -> List[Tuple[str, int]]:
+    """
+    Expand batch selectors into (repo_name, pull_number) pairs.
+
+    A selector is either 'repo#123' (or 'repo:123') for a single pull request, or a
+    bare 'repo' for all of its open pull requests. Duplicates are dropped.
+
+    Args:
+        selectors (Iterable[str]): The selectors, e.g. from the command line.
+        list_pull_requests (Callable[[str], List[int]]): Lists the open pull request
+            numbers of a repository. Defaults to list_open_pull_requests().
+
+    Returns:
+        List[Tuple[str, int]]: The pull requests to review, in selector order.
+
+    Raises:
+        ValueError: If a pull request number is not an integer.
+    """
+    targets: List[Tuple[str, int]] = []
+    for selector in selectors:
+        selector = selector.strip()
+        if not selector:
+            continue
+        repo_name, separator, number = selector.replace(":", "#", 1).partition("#")
+        if separator:
+            if not number.isdigit():
+                raise ValueError(f"Invalid pull request number in '{selector}'")
+            pairs = [(repo_name, int(number))]
+        else:
+            pairs = [(repo_name, pull) for pull in list_pull_requests(repo_name)]
+        targets.extend(pair for pair in pairs if pair not in targets)
+    return targets
+
+
+def review_pull_request(repo_name: str, pull_number: int, force_full: bool = False) -> str:
+    """
+    Run the AgentTorero crew for a single pull request.
+
+    Args:
+        repo_name (str): The repository name.
+        pull_number (int): The pull request number.
+        force_full (bool): Review the whole pull request even if it was reviewed
+            before. Defaults to False.
+
+    Returns:
+        str: The path of the written report.
+    """
+    # pylint: disable=import-outside-toplevel
+    from src.agent_torero.crew import REPORT_FILE, AgentTorero
+
+    inputs = {"pull_number": pull_number, "repo_name": repo_name}
+    AgentTorero().crew().kickoff(inputs=dict(inputs, force_full_review=force_full))
+    return REPORT_FILE.format(**inputs)
+
+
+def warm_up() -> None:
+    """
+    Load the state shared by all jobs before the workers start.
+
+    The test case index, the HTTP session and the Jira client are process-wide
+    singletons, as are the LLM clients, so loading them once here keeps the first
+    jobs from racing to load them. The Jira client is health checked and rebuilt
+    if it cannot reach the server.
+    """
+    # pylint: disable=import-outside-toplevel
+    from src.agent_torero.llm import GeminiFlashLLM, GeminiProLLM
+
+    get_session()
+    JIRAHandler()
+    if not check_jira_client():
+        JIRAHandler()
+    get_test_case_index().get()
+    GeminiProLLM()
+    GeminiFlashLLM()
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    """
+    Return the nearest-rank percentile of a non-empty list of values.
+    """
+    ordered = sorted(values)
+    rank = math.ceil(percent / 100 * len(ordered)) - 1
+    return ordered[max(0, min(rank, len(ordered) - 1))]
+
+
+def run_batch(
+    targets: List[Tuple[str, int]],
+    max_workers: Optional[int] = None,
+    review: Callable[[str, int], str] = review_pull_request,
+) -> dict:
+    """
+    Review pull requests concurrently with a bounded worker pool.
+
+    A failing review is recorded and does not stop the other jobs.
+
+    Args:
+        targets (List[Tuple[str, int]]): The (repo_name, pull_number) pairs to review.
+        max_workers (Optional[int]): The number of concurrent reviews. Defaults to
+            the BATCH_WORKERS setting.
+        review (Callable[[str, int], str]): Reviews one pull request and returns the
+            report path. Defaults to review_pull_request().
+
+    Returns:
+        dict: The per PR 'results' (repo_name, pull_number, success, seconds and the
+        report or error), and the 'summary' of the run, see summarize().
+    """
+    if max_workers is None:
+        max_workers = get_int_config("BATCH_WORKERS", 4)
+    max_workers = max(1, min(max_workers, len(targets) or 1))
+
+    def job(repo_name: str, pull_number: int) -> dict:
+        started = time.perf_counter()
+        result = {"repo_name": repo_name, "pull_number": pull_number}
+        try:
+            result["report"] = review(repo_name, pull_number)
+            result["success"] = True
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            result["error"] = str(e)
+            result["success"] = False
+        result["seconds"] = time.perf_counter() - started
+        return result
+
+    started = time.perf_counter()
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="review") as executor:
+        futures = [executor.submit(job, repo_name, pull) for repo_name, pull in targets]
+        for future in as_completed(futures):
+            result = future.result()
+            status = "done" if result["success"] else f"failed: {result['error']}"
+            print(
+                f"[{len(results) + 1}/{len(targets)}] {result['repo_name']}#"
+                f"{result['pull_number']} {status} ({result['seconds']:.1f}s)"
+            )
+            results.append(result)
+    wall_seconds = time.perf_counter() - started
+
+    order = {target: position for position, target in enumerate(targets)}
+    results.sort(key=lambda r: order[(r["repo_name"], r["pull_number"])])
+    return {"results": results, "summary": summarize(results, wall_seconds, max_workers)}
+
+
+def summarize(results: List[dict], wall_seconds: float, workers: int) -> dict:
+    """
+    Compute the throughput and latency summary of a batch run.
+
+    Args:
+        results (List[dict]): The job results of run_batch().
+        wall_seconds (float): The wall-clock duration of the run.
+        workers (int): The number of workers of the run.
+
+    Returns:
+        dict: The number of 'jobs', 'succeeded' and 'failed' jobs, the 'workers',
+        'wall_seconds', 'throughput_per_minute' and the job latency 'latency_mean',
+        'latency_p50', 'latency_p95' and 'latency_max' in seconds.
+    """
+    latencies = [result["seconds"] for result in results]
+    succeeded = sum(1 for result in results if result["success"])
+    summary = {
+        "jobs": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "workers": workers,
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_per_minute": round(60 * len(results) / wall_seconds, 2)
+        if wall_seconds > 0
+        else 0.0,
+    }
+    if latencies:
+        summary.update(
+            {
+                "latency_mean": round(statistics.fmean(latencies), 3),
+                "latency_p50": round(_percentile(latencies, 50), 3),
+                "latency_p95": round(_percentile(latencies, 95), 3),
+                "latency_max": round(max(latencies), 3),
+            }
+        )
+    return summary
+
+
+def format_summary(summary: dict) -> str:
+    """
+    Format a batch summary for the console.
+
+    Args:
+        summary (dict): The summary of run_batch().
+
+    Returns:
+        str: A short multi-line report.
+    """
+    lines = [
+        f"Reviewed {summary['jobs']} pull requests with {summary['workers']} workers "
+        f"in {summary['wall_seconds']:.1f}s: {summary['succeeded']} succeeded, "
+        f"{summary['failed']} failed.",
+        f"Throughput: {summary['throughput_per_minute']:.2f} pull requests per minute.",
+    ]
+    if summary["jobs"]:
+        lines.append(
+            f"Latency: mean {summary['latency_mean']:.1f}s, p50 {summary['latency_p50']:.1f}s, "
+            f"p95 {summary['latency_p95']:.1f}s, max {summary['latency_max']:.1f}s."
+        )
+    return "\n".join(lines)
+
+
+def main(selectors: List[str]) -> dict:
+    """
+    Review the pull requests matched by the selectors and print a summary.
+
+    Args:
+        selectors (List[str]): See parse_targets(). Defaults to the BATCH_TARGETS
+            setting (comma separated) when empty. A '--full' selector forces full
+            reviews of previously reviewed pull requests.
+
+    Returns:
+        dict: See run_batch(), plus the 'rate_limits' metrics of each external service
+        and the 'jira_cache' and 'llm_cache' statistics.
+    """
+    force_full = "--full" in selectors
+    selectors = [selector for selector in selectors if selector != "--full"]
+    if not selectors:
+        selectors = (get_config("BATCH_TARGETS") or "").split(",")
+    targets = parse_targets(selectors)
+    if not targets:
+        print("No pull requests to review.")
+        return {"results": [], "summary": summarize([], 0.0, 0)}
+    warm_up()
+    batch = run_batch(targets, review=functools.partial(review_pull_request, force_full=force_full))
+    print(format_summary(batch["summary"]))
+    batch["rate_limits"] = get_scheduler().metrics()
+    for name, metrics in batch["rate_limits"].items():
+        print(
+            f"Rate limit {name}: {metrics['acquired']} calls, {metrics['waits']} waited "
+            f"{metrics['wait_seconds']:.1f}s in total (max {metrics['max_wait_seconds']:.1f}s), "
+            f"{metrics['throttled']} throttled, now {metrics['rate']:.2f} calls/s."
+        )
+    ticket_cache = get_ticket_cache()
+    batch["jira_cache"] = ticket_cache.stats() if ticket_cache is not None else {}
+    if batch["jira_cache"]:
+        print(
+            f"Jira cache: {batch['jira_cache']['hit_rate']:.0%} hit rate "
+            f"({batch['jira_cache']['hits']} hits, {batch['jira_cache']['stale']} stale, "
+            f"{batch['jira_cache']['misses']} misses, "
+            f"{batch['jira_cache']['memory_hits']} read from memory)."
+        )
+    from src.agent_torero.llm import get_llm_cache  # pylint: disable=import-outside-toplevel
+
+    llm_cache = get_llm_cache()
+    batch["llm_cache"] = llm_cache.stats() if llm_cache is not None else {}
+    if batch["llm_cache"]:
+        print(
+            f"LLM cache: {batch['llm_cache']['hits']} hits, {batch['llm_cache']['misses']} "
+            f"misses, {batch['llm_cache']['seconds_saved']:.1f}s saved."
+        )
+    return batch
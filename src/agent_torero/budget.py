@@ -0,0 +1,200 @@
+"""
+Token budget of a crew run.
+
+This module caps the size of the tool results and task outputs that the
+sequential crew carries from task to task. Each source gets a share of the
+CREW_MEMORY_LIMIT setting; larger values are compacted deterministically, and
+what was trimmed is recorded per run.
+"""
+
+import json
+import math
+import threading
+from typing import Any, Dict, Optional
+
+from src.agent_torero.config import get_int_config
+
+# Share of CREW_MEMORY_LIMIT granted to a single value of each source.
+BUDGET_SHARES = {
+    "github": 0.25,
+    "jira": 0.15,
+    "jira_graph": 0.05,
+    "test_cases": 0.15,
+    "task_output": 0.15,
+}
+# Estimated characters per token, for English text and code.
+CHARS_PER_TOKEN = 4
+# Room left for the notes that replace trimmed content.
+_NOTE_CHARS = 48
+
+
+def count_tokens(value: Any) -> int:
+    """
+    Estimate the number of tokens of a value.
+
+    Args:
+        value (Any): A string, or a JSON serializable value counted in compact JSON.
+
+    Returns:
+        int: The estimated number of tokens.
+    """
+    return math.ceil(len(_dumps(value)) / CHARS_PER_TOKEN)
+
+
+def _dumps(value: Any) -> str:
+    """Serialize a value the way its size is measured."""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _json_size(value: Any) -> int:
+    """Return the size of a value nested in a list or dict, quotes included."""
+    return len(json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str))
+
+
+def compact(value: Any, max_chars: int) -> Any:
+    """
+    Shrink a value to about max_chars characters, keeping its structure.
+
+    Strings keep their beginning, lists their first items and dicts all their
+    keys, the largest values being shrunk first. The result only depends on the
+    value and the limit.
+
+    Args:
+        value (Any): A string or a JSON serializable value.
+        max_chars (int): The size to shrink the value to.
+
+    Returns:
+        Any: The value itself if it fits, or a shrunk copy with notes in place of
+        the trimmed content.
+    """
+    size = len(_dumps(value))
+    if size <= max_chars:
+        return value
+    if isinstance(value, str):
+        keep = max(0, max_chars - _NOTE_CHARS)
+        return f"{value[:keep]} [... {size - keep} characters trimmed]"
+    if isinstance(value, (list, tuple)):
+        kept: list = []
+        used = 2 + _NOTE_CHARS
+        for item in value:
+            item_size = _json_size(item) + 1
+            if used + item_size > max_chars:
+                if not kept:
+                    kept.append(compact(item, max_chars - used - 2))
+                break
+            kept.append(item)
+            used += item_size
+        if len(kept) < len(value):
+            kept.append(f"[... {len(value) - len(kept)} more items trimmed]")
+        return kept
+    if isinstance(value, dict):
+        result = dict(value)
+        for key in sorted(result, key=lambda k: (-_json_size(result[k]), str(k))):
+            excess = len(_dumps(result)) - max_chars
+            if excess <= 0:
+                break
+            current = len(_dumps(result[key]))
+            result[key] = compact(result[key], max(_NOTE_CHARS, current - excess))
+        return result
+    return value
+
+
+class TokenBudget:
+    """
+    Per-run budget applying a token limit to each value of a source.
+    """
+
+    def __init__(self, limit: Optional[int] = None) -> None:
+        """
+        Initialize an empty budget.
+
+        Args:
+            limit (Optional[int]): The token limit shared by the sources. Defaults to
+                the CREW_MEMORY_LIMIT setting.
+        """
+        self.limit = limit if limit is not None else get_int_config("CREW_MEMORY_LIMIT", 32000)
+        self._lock = threading.Lock()
+        self.usage: Dict[str, Dict[str, int]] = {}
+
+    def source_limit(self, source: str) -> int:
+        """
+        Return the token limit of a single value of a source.
+
+        Args:
+            source (str): The source name, a key of BUDGET_SHARES.
+
+        Returns:
+            int: The token limit.
+        """
+        return max(1, int(self.limit * BUDGET_SHARES.get(source, 0.1)))
+
+    def fit(self, source: str, value: Any) -> Any:
+        """
+        Compact a value to the limit of its source and record its size.
+
+        Args:
+            source (str): The source name, e.g. 'github' or 'task_output'.
+            value (Any): A tool result or task output.
+
+        Returns:
+            Any: The value, compacted if it exceeded the limit.
+        """
+        tokens = count_tokens(value)
+        limit = self.source_limit(source)
+        result = value
+        if tokens > limit:
+            result = compact(value, limit * CHARS_PER_TOKEN)
+        kept = count_tokens(result)
+        with self._lock:
+            usage = self.usage.setdefault(
+                source, {"values": 0, "tokens": 0, "kept_tokens": 0, "trimmed_values": 0}
+            )
+            usage["values"] += 1
+            usage["tokens"] += tokens
+            usage["kept_tokens"] += kept
+            usage["trimmed_values"] += int(result is not value)
+        return result
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """
+        Return what each source used and how much was trimmed.
+
+        Returns:
+            Dict[str, Dict[str, int]]: The number of 'values', their 'tokens', the
+            'kept_tokens' after trimming and the number of 'trimmed_values' per source.
+        """
+        with self._lock:
+            return {source: dict(usage) for source, usage in self.usage.items()}
+
+    def format_summary(self) -> str:
+        """
+        Format the summary for the run log.
+
+        Returns:
+            str: One line per source, or a note that nothing was counted.
+        """
+        lines = [
+            f"Token budget {source}: {usage['values']} values, {usage['tokens']} tokens, "
+            f"{usage['tokens'] - usage['kept_tokens']} trimmed from "
+            f"{usage['trimmed_values']} values (limit {self.source_limit(source)} per value)."
+            for source, usage in sorted(self.summary().items())
+        ]
+        return "\n".join(lines) or "Token budget: nothing counted."
+
+
+def fit_tool_output(budget: Optional[TokenBudget], source: str, value: Any) -> Any:
+    """
+    Compact a tool result to the limit of its source.
+
+    Args:
+        budget (Optional[TokenBudget]): The budget of the run. Defaults to a budget
+            with the CREW_MEMORY_LIMIT setting when None.
+        source (str): The source name, e.g. 'github'.
+        value (Any): The tool result.
+
+    Returns:
+        Any: The result, compacted if it exceeded the limit.
+    """
+    return (budget if budget is not None else TokenBudget()).fit(source, value)
@@ -0,0 +1,193 @@
+"""
+Persistent, size-bounded key-value cache.
+
+This module provides a small SQLite-backed cache with least-recently-used
+eviction and an optional time-to-live, shared by the HTTP and API response
+caches of the application.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    meta TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries(accessed_at);
+"""
+
+
+class DiskLRUCache:
+    """
+    SQLite-backed cache bounded by total value size, evicting least recently used entries.
+    """
+
+    def __init__(
+        self, path: Path, max_bytes: int, ttl_seconds: Optional[float] = None
+    ) -> None:
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path (Path): Path of the SQLite database file.
+            max_bytes (int): The maximum total size of the stored values.
+            ttl_seconds (Optional[float]): Entries older than this are treated as missing.
+                Defaults to None (no expiry).
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        """
+        Return a cached value and its metadata, marking it as recently used.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[Tuple[bytes, Dict[str, Any]]]: The value and metadata, or None if the
+            key is missing or expired.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, meta, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, meta, created_at = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                with self._conn:
+                    self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+            self.hits += 1
+            return bytes(value), json.loads(meta)
+
+    def set(self, key: str, value: bytes, meta: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Store a value, evicting least recently used entries to stay within max_bytes.
+
+        Values larger than max_bytes are not stored.
+
+        Args:
+            key (str): The cache key.
+            value (bytes): The value to store.
+            meta (Optional[Dict[str, Any]]): JSON serializable metadata stored with the value.
+        """
+        if len(value) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO entries(key, value, meta, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET "
+                "value = excluded.value, meta = excluded.meta, size = excluded.size, "
+                "created_at = excluded.created_at, accessed_at = excluded.accessed_at",
+                (key, value, json.dumps(meta or {}), len(value), now, now),
+            )
+            self._evict()
+
+    def touch(self, key: str, meta: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Mark an entry as fresh again, optionally replacing its metadata.
+
+        Args:
+            key (str): The cache key.
+            meta (Optional[Dict[str, Any]]): New metadata, or None to keep the current one.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            if meta is None:
+                self._conn.execute(
+                    "UPDATE entries SET created_at = ?, accessed_at = ? WHERE key = ?",
+                    (now, now, key),
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE entries SET meta = ?, created_at = ?, accessed_at = ? WHERE key = ?",
+                    (json.dumps(meta), now, now, key),
+                )
+
+    def _evict(self) -> None:
+        """
+        Delete least recently used entries until the total size fits max_bytes.
+        """
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed_at"
+        ).fetchall():
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def delete(self, key: str) -> None:
+        """
+        Remove an entry from the cache.
+
+        Args:
+            key (str): The cache key.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        """
+        Remove every entry from the cache.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries")
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the number of entries, their total size and the lookup counters.
+
+        Returns:
+            Dict[str, int]: Cache statistics.
+        """
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._conn.close()
@@ -32,10 +32,55 @@ OPTIONAL_VARS = {
     "OPENAI_API_KEY": "dummy",  # Dummy value to satisfy CrewAI validation
     "LOG_LEVEL": "INFO",
     "MAX_DIFF_SIZE": "50000",
+    "DIFF_PAGE_SIZE": "12000",  # Bytes of diff returned per tool page
+    "DIFF_INDEX_TTL_SECONDS": "60",  # Reuse a fetched diff before checking the PR head again
     "SAVE_JIRA_DEBUG": "false",
     "CREW_MEMORY_LIMIT": "32000",  # Limit memory payload size
     "CREW_VERBOSE": "true",  # Enable verbose output
+    "INCREMENTAL_REVIEW": "true",  # Review only the commits pushed since the last review
+    "REVIEW_FORCE_FULL": "false",  # Always review the whole pull request
+    "BATCH_WORKERS": "4",  # Concurrent crews in batch mode
+    "BATCH_TARGETS": "",  # Default batch selectors, e.g. "repo#123,other-repo"
     "AGENT_TORERO_ROOT_DIR": str(ROOT_DIR),
+    "CACHE_DIR": str(ROOT_DIR / ".cache"),  # Local databases and caches
+    "TEST_CASES_BACKEND": "pandas",  # pandas (in memory) or sqlite (FTS5 database)
+    "TEST_CASE_FAST_PATH": "true",  # Select test cases from the diff without the LLM
+    "TEST_CASE_FAST_PATH_MIN_CONFIDENCE": "1.0",
+    "GITHUB_BACKEND": "rest",  # rest or graphql (one query for details, files, commits)
+    "GITHUB_POOL_SIZE": "16",  # Keep-alive connections per host
+    "GITHUB_MAX_RETRIES": "4",
+    "GITHUB_BACKOFF_FACTOR": "0.5",  # Seconds, doubled on each retry
+    "GITHUB_BACKOFF_JITTER": "0.5",  # Random seconds added to each backoff
+    "GITHUB_RATE_PER_SECOND": "10",  # Until rate limit headers tell otherwise
+    "GITHUB_GRAPHQL_RATE_PER_SECOND": "2",
+    "JIRA_RATE_PER_SECOND": "5",
+    "GEMINI_RATE_PER_SECOND": "1",
+    "JIRA_POOL_SIZE": "8",  # Keep-alive connections to the Jira server
+    "JIRA_MAX_RETRIES": "3",
+    "JIRA_BACKOFF_FACTOR": "0.5",  # Seconds, doubled on each retry
+    "JIRA_TICKET_CHAR_BUDGET": "8000",  # Characters of description and comments per ticket
+    "JIRA_MAX_COMMENTS": "10",  # Newest comments kept per ticket
+    "JIRA_GRAPH_DEPTH": "2",  # Link hops followed from the PR's tickets
+    "JIRA_GRAPH_MAX_NODES": "40",
+    "JIRA_GRAPH_WORKERS": "4",  # Concurrent searches per graph level
+    "JIRA_OUTBOX": "true",  # Post review comments in the background
+    "JIRA_OUTBOX_MAX_ATTEMPTS": "6",
+    "JIRA_OUTBOX_BACKOFF_SECONDS": "2",  # Doubled after each failed attempt
+    "JIRA_OUTBOX_DRAIN_SECONDS": "30",  # Wait at exit for queued comments
+    "JIRA_CACHE": "true",  # Reuse tickets whose 'updated' time did not change
+    "JIRA_CACHE_TTL_SECONDS": str(24 * 60 * 60),  # Refetch cached tickets at least daily
+    "JIRA_CACHE_MAX_BYTES": str(20 * 1024 * 1024),
+    "JIRA_CACHE_MEMORY_ENTRIES": "256",
+    "GEMINI_RATE_LIMIT_RETRIES": "4",
+    "LLM_STREAM": "true",  # Stream LLM output, writing reports as they are generated
+    "MODEL_ROUTING": "true",  # Serve each task with Gemini Flash or Pro, see routing.py
+    "ROUTER_PRO_MIN_TOKENS": "24000",  # Input tokens sending analysis calls to Pro
+    "ROUTER_PRO_MIN_COMPLEXITY": "20",  # Diff hunks and code blocks sending them to Pro
+    "LLM_CACHE": "false",  # Reuse responses to byte-identical prompts
+    "LLM_CACHE_TTL_SECONDS": str(7 * 24 * 60 * 60),
+    "LLM_CACHE_MAX_BYTES": str(200 * 1024 * 1024),
+    "GITHUB_CACHE": "true",  # Revalidate cached responses with ETags
+    "GITHUB_CACHE_MAX_BYTES": str(100 * 1024 * 1024),
 }
 
 # Validate and collect environment variables
@@ -118,5 +163,23 @@ def get_int_config(key: str, default: int = 0) -> int:
         return default
 
 
+def get_float_config(key: str, default: float = 0.0) -> float:
+    """
+    Get a float configuration value.
+
+    Args:
+        key (str): The configuration key to retrieve.
+        default (float, optional): The default float value if key is not found or conversion fails.
+                Defaults to 0.0.
+
+    Returns:
+        float: The float configuration value.
+    """
+    try:
+        return float(get_config(key, str(default)))
+    except (ValueError, TypeError):
+        return default
+
+
 # Initialize configuration on import
 validate_config()
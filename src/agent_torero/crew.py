@@ -3,22 +3,40 @@ AgentTorero crew definition.
 """
 
 from datetime import datetime
-from typing import List
+from typing import Callable, List, Optional, Tuple
 
-from crewai import Agent, Crew, Process, Task
+from crewai import LLM, Agent, Crew, Process, Task
 from crewai.agents.agent_builder.base_agent import BaseAgent
 from crewai.knowledge.knowledge_config import KnowledgeConfig
 from crewai.knowledge.source.text_file_knowledge_source import \
     TextFileKnowledgeSource
-from crewai.project import CrewBase, agent, crew, task, tool
+from crewai.crews.crew_output import CrewOutput
+from crewai.project import (CrewBase, after_kickoff, agent, before_kickoff,
+                            crew, task, tool)
+from crewai.tasks.conditional_task import ConditionalTask
+from crewai.tasks.task_output import TaskOutput
 
-from src.agent_torero.config import get_config
+from src.agent_torero.budget import TokenBudget
+from src.agent_torero.config import (get_bool_config, get_config,
+                                     get_float_config)
+from src.agent_torero.handlers.diff_selector import select_test_cases_for_diff
+from src.agent_torero.handlers.github import create_github_handler
 from src.agent_torero.llm import GeminiFlashLLM, GeminiProLLM
+from src.agent_torero.review_state import get_review_state_store
+from src.agent_torero.routing import ModelRouter, RoutedLLM
+from src.agent_torero.streaming import (ProgressCallback, TaskStreams,
+                                        get_stream_listener)
 from src.agent_torero.tools.github_tool import GithubPullRequestReviewTool
 from src.agent_torero.tools.jira_tool import (JIRAAddCommentTool,
+                                              JIRAIssueGraphTool,
                                               JIRATicketInfoTool)
 from src.agent_torero.tools.keywords import TestCaseSearchTool
 
+# Review report of each pull request, interpolated with the crew inputs.
+REPORT_FILE = "reports/{repo_name}_{pull_number}.md"
+# Tasks whose output is the review itself, never trimmed by the token budget.
+UNTRIMMED_TASKS = ("review_and_synthesis_task", "jira_add_comment_task")
+
 
 @CrewBase
 class AgentTorero:
@@ -31,7 +49,198 @@ class AgentTorero:
         file_paths=["rbi_provider_linux.txt"],
     )
     knowledge_config = KnowledgeConfig(results_limit=50, score_threshold=0.7)
-    current_time = datetime.now().isoformat()
+    preselected_test_cases: str = ""
+    # (repo_name, pull_number, head_sha) of the reviewed pull request.
+    review_target: Optional[Tuple[str, int, str]] = None
+    token_budget: Optional[TokenBudget] = None
+    model_router: Optional[ModelRouter] = None
+    task_streams: Optional[TaskStreams] = None
+    # Called with the task name and every streamed chunk, e.g. streaming.print_progress.
+    stream_progress: Optional[ProgressCallback] = None
+
+    def budget(self) -> TokenBudget:
+        """
+        Return the token budget of this run, creating it on first use.
+        """
+        if self.token_budget is None:
+            self.token_budget = TokenBudget()
+        return self.token_budget
+
+    def router(self) -> ModelRouter:
+        """
+        Return the model router of this run, creating it on first use.
+        """
+        if self.model_router is None:
+            self.model_router = ModelRouter()
+        return self.model_router
+
+    def agent_llm(self, task_class: str, default: Callable[[], LLM]) -> LLM:
+        """
+        Return the LLM of an agent whose calls belong to a task class.
+
+        Args:
+            task_class (str): The agent's default task class, see routing.TASK_CLASSES.
+            default (Callable[[], LLM]): Returns the LLM used when MODEL_ROUTING is off.
+
+        Returns:
+            LLM: A RoutedLLM, or the default LLM.
+        """
+        if not get_bool_config("MODEL_ROUTING", True):
+            return default()
+        return RoutedLLM(self.router(), task_class)
+
+    @before_kickoff
+    def prepare_inputs(self, inputs: dict) -> dict:
+        """
+        Set the review scope and preselect test cases before the crew runs.
+        """
+        inputs = dict(inputs or {})
+        self.set_review_scope(inputs)
+        self.preselect_test_cases(inputs)
+        return inputs
+
+    @before_kickoff
+    def start_streaming(self, inputs: dict) -> dict:
+        """
+        Follow the streamed LLM output of the tasks of this run.
+
+        The review is written to its report file as it is generated, and the time
+        to first token of every call is recorded.
+        """
+        if get_bool_config("LLM_STREAM", True):
+            self.task_streams = TaskStreams(self.tasks, progress=self.stream_progress)
+            get_stream_listener().register(self.task_streams)
+        return inputs
+
+    def set_review_scope(self, inputs: dict) -> None:
+        """
+        Decide between a full and an incremental review of the pull request.
+
+        When the pull request was reviewed before and its new head descends from the
+        reviewed head, only the commits pushed since are reviewed, on top of the
+        previous report. A full review is forced with the 'force_full_review' input
+        or the REVIEW_FORCE_FULL setting, and happens when the history was rewritten.
+        """
+        inputs.update({"review_mode": "full", "since_sha": "", "previous_report": ""})
+        self.review_target = None
+        if not get_bool_config("INCREMENTAL_REVIEW") or "pull_number" not in inputs:
+            return
+
+        repo_name, pull_number = inputs["repo_name"], int(inputs["pull_number"])
+        try:
+            github_api = create_github_handler(pull_number=pull_number, repo_name=repo_name)
+            head_sha = github_api.fetch_head_sha()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            print(f"Review state unavailable, running a full review: {str(e)}")
+            return
+        self.review_target = (repo_name, pull_number, head_sha)
+
+        if inputs.get("force_full_review") or get_bool_config("REVIEW_FORCE_FULL"):
+            return
+        state = get_review_state_store().get(repo_name, pull_number)
+        if state is None or state["head_sha"] == head_sha:
+            return
+        try:
+            comparison = github_api.compare_commits(state["head_sha"], head_sha)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            print(f"Cannot compare with the last review, running a full review: {str(e)}")
+            return
+        if comparison["status"] != "ahead":
+            print("The pull request history was rewritten, running a full review.")
+            return
+
+        inputs.update(
+            {
+                "review_mode": "incremental",
+                "since_sha": state["head_sha"],
+                "previous_report": state["report"],
+            }
+        )
+
+    def preselect_test_cases(self, inputs: dict) -> None:
+        """
+        Select test cases straight from the PR diff before the crew runs.
+
+        When the selection is confident, the test cases retrieval task is skipped and
+        the review uses the preselected test cases instead.
+        """
+        self.preselected_test_cases = ""
+        inputs["preselected_test_cases"] = ""
+        if not get_bool_config("TEST_CASE_FAST_PATH") or "pull_number" not in inputs:
+            return
+
+        try:
+            github_api = create_github_handler(
+                pull_number=int(inputs["pull_number"]), repo_name=inputs["repo_name"]
+            )
+            diff_index = github_api.fetch_pr_diff_index(since_sha=inputs.get("since_sha") or None)
+            selection = select_test_cases_for_diff(diff_index.diff)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            print(f"Test case fast path unavailable, using the agent instead: {str(e)}")
+            return
+
+        min_confidence = get_float_config("TEST_CASE_FAST_PATH_MIN_CONFIDENCE", 1.0)
+        if selection["confidence"] < min_confidence:
+            return
+
+        self.preselected_test_cases = "\n".join(
+            f"ID: {test_case.get('ID', 'N/A')}, Title: {test_case.get('Title', 'N/A')}, "
+            f"Summary: {test_case.get('Summary', 'N/A')}"
+            for test_case in selection["test_cases"]
+        )
+        inputs["preselected_test_cases"] = self.preselected_test_cases
+
+    @after_kickoff
+    def save_review_state(self, output: CrewOutput) -> CrewOutput:
+        """
+        Record the reviewed head SHA and report for the next incremental review.
+        """
+        if self.review_target is None:
+            return output
+        task_output = self.review_and_synthesis_task().output
+        if task_output is not None and task_output.raw:
+            try:
+                get_review_state_store().save(*self.review_target, report=task_output.raw)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                print(f"Failed to save the review state: {str(e)}")
+        return output
+
+    @after_kickoff
+    def log_token_budget(self, output: CrewOutput) -> CrewOutput:
+        """
+        Log the tokens each source used and what the token budget trimmed.
+        """
+        print(self.budget().format_summary())
+        return output
+
+    @after_kickoff
+    def log_model_routing(self, output: CrewOutput) -> CrewOutput:
+        """
+        Log which model served each LLM call and what the routing saved.
+        """
+        if self.model_router is not None:
+            print(self.model_router.format_summary())
+        return output
+
+    @after_kickoff
+    def log_streaming(self, output: CrewOutput) -> CrewOutput:
+        """
+        Stop following the streamed output and log the latencies of the LLM calls.
+        """
+        if self.task_streams is not None:
+            get_stream_listener().unregister(self.task_streams)
+            print(self.task_streams.format_summary())
+        return output
+
+    def trim_task_output(self, output: TaskOutput) -> None:
+        """
+        Compact the output of a task to the token budget before later tasks use it.
+
+        The review and the comment tasks are left as they are.
+        """
+        if output.name in UNTRIMMED_TASKS or not output.raw:
+            return
+        output.raw = self.budget().fit("task_output", output.raw)
 
     @agent
     def github_specialist(self) -> Agent:
@@ -41,7 +250,7 @@ class AgentTorero:
             config=self.agents_config["github_specialist"],  # type: ignore[index]
             verbose=True,
             reasoning=True,
-            llm=GeminiProLLM(),
+            llm=self.agent_llm("fetch", GeminiProLLM),
         )
 
     @agent
@@ -52,7 +261,7 @@ class AgentTorero:
             config=self.agents_config["jira_specialist"],  # type: ignore[index]
             verbose=True,
             reasoning=True,
-            llm=GeminiProLLM(),
+            llm=self.agent_llm("fetch", GeminiProLLM),
             allow_delegation=False,
         )
 
@@ -66,7 +275,7 @@ class AgentTorero:
             reasoning=True,
             knowledge_sources=[self.rbi_provider_knowledge],
             knowledge_config=self.knowledge_config,
-            llm=GeminiProLLM(),
+            llm=self.agent_llm("analysis", GeminiProLLM),
         )
 
     @agent
@@ -77,7 +286,7 @@ class AgentTorero:
             config=self.agents_config["test_cases_retrieval_specialist"],  # type: ignore[index]
             verbose=True,
             reasoning=True,
-            llm=GeminiProLLM(),
+            llm=self.agent_llm("analysis", GeminiProLLM),
         )
 
     @agent
@@ -90,7 +299,7 @@ class AgentTorero:
             reasoning=True,
             max_reasoning_attempts=5,
             inject_date=True,
-            llm=GeminiProLLM(),
+            llm=self.agent_llm("synthesis", GeminiProLLM),
         )
 
     @agent
@@ -102,7 +311,7 @@ class AgentTorero:
             verbose=True,
             reasoning=False,
             inject_date=True,
-            llm=GeminiFlashLLM(),
+            llm=self.agent_llm("fetch", GeminiFlashLLM),
         )
 
     @task
@@ -139,9 +348,11 @@ class AgentTorero:
     def test_cases_retrieval_task(self) -> Task:
         """
         Task to retrieve relevant test cases from the test cases knowledge source.
+        Skipped when the test cases were already selected from the diff.
         """
         # pylint: disable=no-member
-        return Task(
+        return ConditionalTask(
+            condition=lambda _: not self.preselected_test_cases,
             config=self.tasks_config["test_cases_retrieval_task"],  # type: ignore[index]
         )
 
@@ -153,7 +364,7 @@ class AgentTorero:
         # pylint: disable=no-member
         return Task(
             config=self.tasks_config["review_and_synthesis_task"],  # type: ignore[index]
-            output_file="report.md",
+            output_file=REPORT_FILE,
         )
 
     @task
@@ -169,12 +380,17 @@ class AgentTorero:
     @tool
     def jira_ticket_info_tool(self) -> JIRATicketInfoTool:
         """Creates the JIRA Ticket Info tool"""
-        return JIRATicketInfoTool()
+        return JIRATicketInfoTool(token_budget=self.budget())
+
+    @tool
+    def jira_issue_graph_tool(self) -> JIRAIssueGraphTool:
+        """Creates the JIRA Linked Issues Graph tool"""
+        return JIRAIssueGraphTool(token_budget=self.budget())
 
     @tool
     def github_tool(self) -> GithubPullRequestReviewTool:
         """Creates the GitHub API tool"""
-        return GithubPullRequestReviewTool()
+        return GithubPullRequestReviewTool(token_budget=self.budget())
 
     @tool
     def jira_add_comment_tool(self) -> JIRAAddCommentTool:
@@ -184,7 +400,7 @@ class AgentTorero:
     @tool
     def test_case_search_tool(self) -> TestCaseSearchTool:
         """Creates the Test Case Search tool"""
-        return TestCaseSearchTool()
+        return TestCaseSearchTool(token_budget=self.budget())
 
     @crew
     def crew(self) -> Crew:
@@ -203,5 +419,6 @@ class AgentTorero:
                     "api_key": get_config("GEMINI_API_KEY"),
                 },
             },
-            output_log_file=f"crew_ai_run_{self.current_time}.txt",
+            output_log_file=f"crew_ai_run_{datetime.now().isoformat()}.txt",
+            task_callback=self.trim_task_output,
         )
@@ -0,0 +1,243 @@
+"""
+Deterministic, diff-driven test case selection.
+
+This module extracts terms (changed paths, identifiers and string literals) from a
+unified diff, matches them against a precomputed term -> keyword index built from
+the canonical keywords and the test cases CSV, and ranks the test cases of the
+best matching keywords. It lets the crew skip the LLM driven keyword lookup when
+the match is confident.
+"""
+
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Set
+
+from src.agent_torero.handlers.github import parse_diff_git_line
+from src.agent_torero.handlers.keywords import (SearchTestCases,
+                                                get_test_case_index)
+
+_HUNK_RE = re.compile(r"^@@ [^@]* @@ ?(.*)$")
+_IDENTIFIER_RE = re.compile(r"[A-Za-z_$][A-Za-z0-9_$]{2,}")
+_STRING_RE = re.compile(r"""(["'`])((?:(?!\1)[^\\\n]|\\.){3,120})\1""")
+_WORD_PART_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+")
+_ALNUM_RE = re.compile(r"[^\W_]+")
+
+# Term weights by where the term was found in the diff.
+PATH_WEIGHT = 3.0
+STRING_WEIGHT = 2.0
+IDENTIFIER_WEIGHT = 1.0
+
+# Keywords whose tokens are covered less than this are ignored.
+MIN_KEYWORD_COVERAGE = 0.5
+# Number of fully matched keywords at which the selection is fully confident.
+CONFIDENT_KEYWORD_COUNT = 3
+
+_STOPWORDS = frozenset(
+    """
+    a an and are as at be by for from has if in is it of on or that the this to was
+    with not no yes true false null none undefined nil self cls var let const
+    def function func return import export default class new get set add del use
+    int str bool float string number object list dict array map type void async await
+    try catch except finally raise throw else elif while break continue pass
+    src lib test tests spec js ts py cpp cc json yaml yml txt md html css index main
+    """.split()
+)
+
+
+def _stem(token: str) -> str:
+    """
+    Apply a light plural stemming so that e.g. 'cookies' matches 'cookie'.
+    """
+    if len(token) > 4 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def _split_identifier(identifier: str) -> List[str]:
+    """
+    Split a snake_case, kebab-case or camelCase identifier into lower-cased words.
+    """
+    words = []
+    for part in re.split(r"[_$\-]+", identifier):
+        words.extend(word.lower() for word in _WORD_PART_RE.findall(part))
+    return words
+
+
+def _normalize_terms(words: List[str]) -> List[str]:
+    """
+    Drop stopwords and very short words, and stem the rest.
+    """
+    return [_stem(word) for word in words if len(word) > 1 and word not in _STOPWORDS]
+
+
+def extract_diff_terms(diff: str) -> Counter:
+    """
+    Extract weighted terms from a unified diff.
+
+    Changed file paths, identifiers and string literals on added or removed lines,
+    and the function context of hunk headers are split into words.
+
+    Args:
+        diff (str): The unified diff text.
+
+    Returns:
+        Counter: Accumulated weight per normalized term.
+    """
+    terms: Counter = Counter()
+    for line in (diff or "").splitlines():
+        paths = parse_diff_git_line(line) if line.startswith("diff --git ") else None
+        if paths:
+            for path in set(paths):
+                for part in re.split(r"[/.]", path):
+                    for term in _normalize_terms(_split_identifier(part)):
+                        terms[term] += PATH_WEIGHT
+            continue
+
+        hunk_match = _HUNK_RE.match(line)
+        if hunk_match:
+            changed = hunk_match.group(1)
+        elif line[:1] in ("+", "-") and not line.startswith(("+++", "---")):
+            changed = line[1:]
+        else:
+            continue
+
+        for literal in _STRING_RE.finditer(changed):
+            words = [word.lower() for word in _ALNUM_RE.findall(literal.group(2))]
+            for term in _normalize_terms(words):
+                terms[term] += STRING_WEIGHT
+        for identifier in _IDENTIFIER_RE.findall(_STRING_RE.sub(" ", changed)):
+            for term in _normalize_terms(_split_identifier(identifier)):
+                terms[term] += IDENTIFIER_WEIGHT
+    return terms
+
+
+class DiffTestCaseSelector:
+    """
+    Selects test cases for a diff without an LLM round trip.
+
+    The term -> keyword index is built once per loaded SearchTestCases, from the
+    canonical keywords and the keyword phrases of the test cases CSV.
+    """
+
+    def __init__(self, search: SearchTestCases) -> None:
+        """
+        Build the term -> keyword index.
+
+        Args:
+            search (SearchTestCases): The loaded test cases to select from.
+        """
+        self.search = search
+        phrases = {kw.strip() for kw in search.get_all_keywords()}
+        phrases.update(search.get_test_case_keywords())
+
+        self._keywords: List[str] = []
+        self._keyword_terms: List[Set[str]] = []
+        index: Dict[str, List[int]] = defaultdict(list)
+        for phrase in sorted(p for p in phrases if p):
+            keyword_terms = set(
+                _normalize_terms([word.lower() for word in _ALNUM_RE.findall(phrase)])
+            )
+            if not keyword_terms:
+                continue
+            idx = len(self._keywords)
+            self._keywords.append(phrase)
+            self._keyword_terms.append(keyword_terms)
+            for term in keyword_terms:
+                index[term].append(idx)
+        self._index = dict(index)
+        self._idf = {
+            term: math.log(1 + len(self._keywords) / len(ids))
+            for term, ids in self._index.items()
+        }
+
+    def match_keywords(self, terms: Counter, limit: int = 8) -> List[dict]:
+        """
+        Rank the keywords whose words appear among the diff terms.
+
+        Args:
+            terms (Counter): Weighted diff terms, see extract_diff_terms().
+            limit (int): The maximum number of keywords to return. Defaults to 8.
+
+        Returns:
+            List[dict]: Keywords with their 'score' and 'coverage' (share of the
+            keyword's words found in the diff), best first.
+        """
+        matched: Dict[int, Set[str]] = defaultdict(set)
+        for term in terms:
+            for idx in self._index.get(term, ()):
+                matched[idx].add(term)
+
+        candidates = []
+        for idx, found in matched.items():
+            coverage = len(found) / len(self._keyword_terms[idx])
+            if coverage < MIN_KEYWORD_COVERAGE:
+                continue
+            score = coverage * sum(
+                self._idf[term] * (1 + math.log(terms[term])) for term in found
+            )
+            candidates.append(
+                {
+                    "keyword": self._keywords[idx],
+                    "score": round(score, 3),
+                    "coverage": round(coverage, 3),
+                }
+            )
+        candidates.sort(key=lambda c: (-c["score"], c["keyword"]))
+        return candidates[:limit]
+
+    def select(self, diff: str, top_k: int = 25, max_keywords: int = 8) -> dict:
+        """
+        Select and rank the test cases relevant to a diff.
+
+        Args:
+            diff (str): The unified diff text.
+            top_k (int): The maximum number of test cases to return. Defaults to 25.
+            max_keywords (int): The maximum number of keywords to search with. Defaults to 8.
+
+        Returns:
+            dict: The matched 'keywords', the ranked 'test_cases', the strongest diff
+            'terms' and a 'confidence' between 0 and 1. Confidence grows with the
+            number of keywords fully covered by the diff and is 0 without test cases.
+        """
+        terms = extract_diff_terms(diff)
+        keywords = self.match_keywords(terms, limit=max_keywords)
+        test_cases = self.search.rank_by_keywords(
+            [k["keyword"] for k in keywords], top_k=top_k
+        )
+
+        full_matches = sum(1 for k in keywords if k["coverage"] >= 1.0)
+        confidence = min(1.0, full_matches / CONFIDENT_KEYWORD_COUNT) if test_cases else 0.0
+        return {
+            "keywords": keywords,
+            "test_cases": test_cases,
+            "terms": [term for term, _ in terms.most_common(20)],
+            "confidence": round(confidence, 3),
+        }
+
+
+_selector: Optional[DiffTestCaseSelector] = None
+_selector_lock = threading.Lock()
+
+
+def select_test_cases_for_diff(diff: str, top_k: int = 25) -> dict:
+    """
+    Select test cases for a diff using the process-wide test case index.
+
+    The selector is rebuilt only when the shared index reloads its data.
+
+    Args:
+        diff (str): The unified diff text.
+        top_k (int): The maximum number of test cases to return. Defaults to 25.
+
+    Returns:
+        dict: See DiffTestCaseSelector.select().
+    """
+    global _selector  # pylint: disable=global-statement
+    search = get_test_case_index().get()
+    with _selector_lock:
+        if _selector is None or _selector.search is not search:
+            _selector = DiffTestCaseSelector(search)
+        selector = _selector
+    return selector.select(diff, top_k=top_k)
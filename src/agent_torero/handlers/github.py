@@ -4,12 +4,662 @@ This module provides functionality to fetch pull request details and diffs
 from GitHub repositories using the GitHub REST API.
 """
 
+import hashlib
 import re
-from typing import Optional
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 import requests
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
 
-from src.agent_torero.config import get_config
+from src.agent_torero.cache import DiskLRUCache
+from src.agent_torero.config import (get_bool_config, get_config,
+                                     get_float_config, get_int_config)
+from src.agent_torero.ratelimit import RateLimitedAdapter
+
+# Transient statuses worth retrying for idempotent requests.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Page size and page cap of list endpoints (GitHub lists at most 3000 files, 250 commits).
+LIST_PAGE_SIZE = 100
+MAX_LIST_PAGES = 30
+
+_DIFF_GIT_RE = re.compile(r"^diff --git a/(.+?) b/(.+?)\n?$")
+_FILE_START_RE = re.compile(r"^diff --git ", re.MULTILINE)
+_HUNK_START_RE = re.compile(r"^@@", re.MULTILINE)
+
+
+def parse_diff_git_line(line: str) -> Optional[Tuple[str, str]]:
+    """Parse the old and new paths of a 'diff --git a/<old> b/<new>' line.
+
+    Paths may contain spaces. When both paths are the same, the line is split in
+    its middle, so that a path containing ' b/' is parsed right too.
+
+    Args:
+        line: The diff header line, with or without its newline.
+
+    Returns:
+        Optional[Tuple[str, str]]: The old and new paths, or None if the line is not
+            a diff header.
+    """
+    line = line.rstrip("\n")
+    rest = line[len("diff --git ") :]
+    half = (len(rest) - 1) // 2
+    if (
+        line.startswith("diff --git a/")
+        and len(rest) % 2 == 1
+        and rest[half : half + 3] == " b/"
+        and rest[2:half] == rest[half + 3 :]
+    ):
+        return rest[2:half], rest[half + 3 :]
+    match = _DIFF_GIT_RE.match(line)
+    return (match.group(1), match.group(2)) if match else None
+
+
+class GitHubRetry(Retry):
+    """Retry policy for GitHub API requests.
+
+    Besides the usual transient statuses it retries secondary rate limit
+    responses (403 with a Retry-After header), and caps the Retry-After wait.
+    """
+
+    MAX_RETRY_AFTER = 60.0
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if status_code == 403 and has_retry_after and self.respect_retry_after_header:
+            return bool(self.total) and self._is_method_retryable(method)
+        return super().is_retry(method, status_code, has_retry_after)
+
+    def get_retry_after(self, response) -> Optional[float]:
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.MAX_RETRY_AFTER)
+
+
+def _build_session() -> requests.Session:
+    """Build a requests session with a tuned connection pool and transport retries.
+
+    Returns:
+        requests.Session: A session retrying idempotent requests with exponential
+            backoff and jitter, honouring Retry-After headers, and pacing requests
+            through the shared rate limit scheduler.
+    """
+    retry = GitHubRetry(
+        total=get_int_config("GITHUB_MAX_RETRIES", 4),
+        backoff_factor=get_float_config("GITHUB_BACKOFF_FACTOR", 0.5),
+        backoff_jitter=get_float_config("GITHUB_BACKOFF_JITTER", 0.5),
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    pool_size = get_int_config("GITHUB_POOL_SIZE", 16)
+    adapter = RateLimitedAdapter(
+        "github", pool_connections=4, pool_maxsize=pool_size, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    # GraphQL has its own, point based, rate limit.
+    session.mount(
+        "https://api.github.com/graphql",
+        RateLimitedAdapter(
+            "github_graphql", pool_connections=1, pool_maxsize=pool_size, max_retries=retry
+        ),
+    )
+    return session
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide GitHub session, creating it on first use.
+
+    The session keeps connections to api.github.com alive and is shared by all
+    GitHubHandler instances and tool invocations.
+
+    Returns:
+        requests.Session: The shared session.
+    """
+    global _session  # pylint: disable=global-statement
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+class GitHubResponseCache:
+    """Conditional request (ETag / Last-Modified) cache for GitHub GET responses.
+
+    Response bodies are stored on disk with their validators. Later requests
+    send If-None-Match / If-Modified-Since and a 304 Not Modified answer, which
+    does not count against the GitHub rate limit, is served from disk.
+    """
+
+    def __init__(self, store: DiskLRUCache):
+        """Initialize the cache.
+
+        Args:
+            store: The persistent store holding response bodies.
+        """
+        self.store = store
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    @staticmethod
+    def cache_key(url: str, headers: Dict[str, str]) -> str:
+        """Build the cache key of a request.
+
+        The key covers the URL, the requested media type and the credentials, so
+        different representations and different users never share an entry.
+
+        Args:
+            url: The request URL.
+            headers: The request headers.
+
+        Returns:
+            str: The hex digest identifying the request.
+        """
+        parts = (headers.get("Authorization", ""), headers.get("Accept", ""), url)
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def get(
+        self,
+        session: requests.Session,
+        url: str,
+        headers: Dict[str, str],
+        timeout: float,
+        stream: bool = False,
+        min_bytes: Optional[int] = None,
+    ) -> requests.Response:
+        """Send a GET request, revalidating a cached body when there is one.
+
+        Args:
+            session: The session to send the request with.
+            url: The request URL.
+            headers: The request headers.
+            timeout: The request timeout in seconds.
+            stream: Don't download the body of a full response. The caller reads it
+                and may hand it back with store_streamed(). Defaults to False.
+            min_bytes: For streamed reads, the number of bytes the caller will read at
+                most. A cached partial body longer than this can still be revalidated.
+
+        Returns:
+            requests.Response: The live response, or a 200 response rebuilt from
+                the cached body when the server answered 304 Not Modified.
+        """
+        key = self.cache_key(url, headers)
+        entry = self.store.get(key)
+        if entry is not None and not entry[1].get("complete", True):
+            if min_bytes is None or len(entry[0]) <= min_bytes:
+                entry = None
+        request_headers = dict(headers)
+        if entry is not None:
+            _, meta = entry
+            if meta.get("etag"):
+                request_headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                request_headers["If-Modified-Since"] = meta["last_modified"]
+
+        response = session.get(url, headers=request_headers, timeout=timeout, stream=stream)
+        if response.status_code == 304:
+            if entry is None:
+                # The server ignored our missing validators; refetch unconditionally.
+                return session.get(url, headers=headers, timeout=timeout, stream=stream)
+            body, meta = entry
+            self.store.touch(key)
+            with self._lock:
+                self.hits += 1
+                self.bytes_saved += len(body)
+            return self._response_from_cache(response, body, meta)
+
+        with self._lock:
+            self.misses += 1
+        if not stream:
+            self.store_streamed(url, headers, response, response.content)
+        return response
+
+    def store_streamed(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        response: requests.Response,
+        body: bytes,
+        complete: bool = True,
+    ) -> None:
+        """Store the body of a full response if it carries validators.
+
+        Args:
+            url: The request URL.
+            headers: The request headers, without conditional headers.
+            response: The 200 response the body was read from.
+            body: The body bytes that were read.
+            complete: False if the caller stopped reading before the end of the body.
+        """
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.status_code != 200 or not (etag or last_modified):
+            return
+        if getattr(response, "from_cache", False):
+            return
+        self.store.set(
+            self.cache_key(url, headers),
+            body,
+            {
+                "etag": etag,
+                "last_modified": last_modified,
+                "content_type": response.headers.get("Content-Type"),
+                "encoding": response.encoding,
+                "complete": complete,
+            },
+        )
+
+    @staticmethod
+    def _response_from_cache(
+        not_modified: requests.Response, body: bytes, meta: dict
+    ) -> requests.Response:
+        """Rebuild a 200 response from a cached body and the 304 response headers."""
+        response = requests.Response()
+        response.status_code = 200
+        response._content = body  # pylint: disable=protected-access
+        response._content_consumed = True  # pylint: disable=protected-access
+        response.headers = CaseInsensitiveDict(not_modified.headers)
+        if meta.get("content_type"):
+            response.headers["Content-Type"] = meta["content_type"]
+        response.encoding = meta.get("encoding")
+        response.url = not_modified.url
+        response.request = not_modified.request
+        response.reason = "OK"
+        response.from_cache = True  # type: ignore[attr-defined]
+        not_modified.close()
+        return response
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit, miss and bytes-saved counters with the store statistics.
+
+        Returns:
+            Dict[str, int]: 'hits' counts 304 responses served from disk, 'misses'
+                counts full responses, 'bytes_saved' the body bytes not downloaded.
+        """
+        with self._lock:
+            counters = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bytes_saved": self.bytes_saved,
+            }
+        store_stats = self.store.stats()
+        counters.update(
+            {
+                "entries": store_stats["entries"],
+                "bytes": store_stats["bytes"],
+                "evictions": store_stats["evictions"],
+            }
+        )
+        return counters
+
+
+_response_cache: Optional[GitHubResponseCache] = None
+
+
+def get_response_cache() -> Optional[GitHubResponseCache]:
+    """Return the process-wide GitHub response cache, creating it on first use.
+
+    Returns:
+        Optional[GitHubResponseCache]: The shared cache, or None if GITHUB_CACHE is off.
+    """
+    global _response_cache  # pylint: disable=global-statement
+    if not get_bool_config("GITHUB_CACHE", True):
+        return None
+    if _response_cache is None:
+        with _session_lock:
+            if _response_cache is None:
+                store = DiskLRUCache(
+                    Path(get_config("CACHE_DIR", ".cache")) / "github_http.sqlite3",
+                    max_bytes=get_int_config("GITHUB_CACHE_MAX_BYTES", 100 * 1024 * 1024),
+                )
+                _response_cache = GitHubResponseCache(store)
+    return _response_cache
+
+
+def github_get(
+    url: str,
+    headers: Dict[str, str],
+    timeout: float = 10,
+    stream: bool = False,
+    min_bytes: Optional[int] = None,
+) -> requests.Response:
+    """Send a GET request to the GitHub API over the shared session and cache.
+
+    Args:
+        url: The request URL.
+        headers: The request headers.
+        timeout: The request timeout in seconds. Defaults to 10.
+        stream: Leave the body unread for the caller to stream. Defaults to False.
+        min_bytes: The number of body bytes a streaming caller needs at most.
+
+    Returns:
+        requests.Response: The (possibly cache rebuilt) response.
+    """
+    cache = get_response_cache()
+    if cache is None:
+        return get_session().get(url, headers=headers, timeout=timeout, stream=stream)
+    return cache.get(get_session(), url, headers, timeout, stream=stream, min_bytes=min_bytes)
+
+
+def _iter_lines(chunks: Iterable[bytes], raw: List[bytes]) -> Iterator[bytes]:
+    """Split a byte stream into lines (keeping line endings), recording the raw chunks."""
+    buffer = b""
+    for chunk in chunks:
+        raw.append(chunk)
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line + b"\n"
+    if buffer:
+        yield buffer
+
+
+def read_diff_within_budget(
+    chunks: Iterable[bytes], max_bytes: int
+) -> Tuple[str, dict, bytes]:
+    """Read a unified diff from a byte stream, stopping at a byte budget.
+
+    The diff is cut only on file or hunk boundaries. A file header is kept only
+    together with its first hunk (or alone, for files without hunks such as
+    binary files or pure renames). Reading stops at the first file header or hunk
+    that no longer fits, so the rest of the stream is never downloaded.
+
+    Args:
+        chunks: The raw diff bytes, e.g. from Response.iter_content().
+        max_bytes: The budget of the returned diff in bytes. 0 or less means unlimited.
+
+    Returns:
+        Tuple[str, dict, bytes]: The diff text within budget; a manifest with the
+            'included', 'truncated' and 'skipped' file paths, the diff 'bytes', the
+            'max_bytes' budget and whether the diff is 'complete'; and the raw bytes
+            read from the stream.
+    """
+    budget = max_bytes if max_bytes > 0 else None
+    manifest: dict = {
+        "complete": True,
+        "max_bytes": max_bytes,
+        "bytes": 0,
+        "included": [],
+        "truncated": [],
+        "skipped": [],
+    }
+    output: List[bytes] = []
+    raw: List[bytes] = []
+    header: List[bytes] = []  # Header lines of the current file, not yet committed.
+    hunk: List[bytes] = []  # Lines of the current hunk, not yet committed.
+    state = {"size": 0, "path": None, "hunks": 0}
+
+    def flush() -> bool:
+        """Commit the pending header and hunk; False if they don't fit the budget."""
+        pending_size = sum(len(line) for line in header) + sum(len(line) for line in hunk)
+        if budget is not None and state["size"] + pending_size > budget:
+            return False
+        output.extend(header)
+        output.extend(hunk)
+        state["size"] += pending_size
+        if hunk:
+            state["hunks"] += 1
+        header.clear()
+        hunk.clear()
+        return True
+
+    def finish(complete: bool) -> Tuple[str, dict, bytes]:
+        path = state["path"]
+        if path is not None:
+            if complete:
+                manifest["included"].append(path)
+            else:
+                manifest["truncated" if state["hunks"] else "skipped"].append(path)
+        manifest["complete"] = complete
+        manifest["bytes"] = state["size"]
+        return b"".join(output).decode("utf-8", errors="replace"), manifest, b"".join(raw)
+
+    for line in _iter_lines(chunks, raw):
+        if line.startswith(b"diff --git "):
+            if not flush():
+                return finish(False)
+            if state["path"] is not None:
+                manifest["included"].append(state["path"])
+            paths = parse_diff_git_line(line.decode("utf-8", errors="replace"))
+            state["path"] = paths[1] if paths else None
+            state["hunks"] = 0
+            header.append(line)
+        elif line.startswith(b"@@") and state["path"] is not None:
+            if hunk and not flush():
+                return finish(False)
+            hunk.append(line)
+        elif hunk:
+            hunk.append(line)
+        else:
+            header.append(line)
+
+    return finish(flush())
+
+
+class DiffFile:
+    """One file of a unified diff, described by offsets into the diff buffer.
+
+    Hunk texts are not copied; they are sliced from the buffer on demand.
+    """
+
+    __slots__ = (
+        "path",
+        "old_path",
+        "change_type",
+        "binary",
+        "start",
+        "end",
+        "hunk_offsets",
+        "additions",
+        "deletions",
+    )
+
+    def __init__(self, diff: str, start: int, end: int):
+        """Parse the header and hunk offsets of the file spanning diff[start:end].
+
+        Args:
+            diff: The whole diff buffer.
+            start: Offset of the file's 'diff --git' line.
+            end: Offset just past the file's last line.
+        """
+        self.start = start
+        self.end = end
+        self.hunk_offsets = [m.start() for m in _HUNK_START_RE.finditer(diff, start, end)]
+        header_end = self.hunk_offsets[0] if self.hunk_offsets else end
+        header = diff[start:header_end]
+        first_line = header.split("\n", 1)[0]
+        paths = parse_diff_git_line(first_line)
+        self.old_path = paths[0] if paths else first_line[len("diff --git ") :]
+        self.path = paths[1] if paths else self.old_path
+        if "\nnew file mode" in header:
+            self.change_type = "added"
+        elif "\ndeleted file mode" in header:
+            self.change_type = "deleted"
+        elif "\nrename from " in header:
+            self.change_type = "renamed"
+        else:
+            self.change_type = "modified"
+        self.binary = "\nBinary files " in header or "\nGIT binary patch" in header
+        # Every added/removed line of a hunk starts right after a newline.
+        self.additions = diff.count("\n+", header_end, end)
+        self.deletions = diff.count("\n-", header_end, end)
+
+    def summary(self) -> dict:
+        """Return the index entry of the file.
+
+        Returns:
+            dict: The file 'path', 'old_path' (renames only), 'change_type', 'binary',
+                'additions', 'deletions', number of 'hunks' and size in 'bytes'.
+        """
+        entry = {
+            "path": self.path,
+            "change_type": self.change_type,
+            "binary": self.binary,
+            "additions": self.additions,
+            "deletions": self.deletions,
+            "hunks": len(self.hunk_offsets),
+            "bytes": self.end - self.start,
+        }
+        if self.old_path != self.path:
+            entry["old_path"] = self.old_path
+        return entry
+
+
+class DiffIndex:
+    """Lazily parsed, paged view over a unified diff.
+
+    The diff is parsed into a per-file index on first use. File headers and
+    hunks are then served by page, so a reader only pays for the files it asks
+    for instead of the whole diff.
+    """
+
+    def __init__(self, diff: str, manifest: Optional[dict] = None):
+        """Initialize the index.
+
+        Args:
+            diff: The unified diff text.
+            manifest: The download manifest, see read_diff_within_budget().
+        """
+        self.diff = diff or ""
+        self.manifest = manifest or {}
+        self._files: Optional[List[DiffFile]] = None
+        self._by_path: Dict[str, DiffFile] = {}
+
+    @property
+    def files(self) -> List[DiffFile]:
+        """The parsed files of the diff, in diff order."""
+        if self._files is None:
+            starts = [m.start() for m in _FILE_START_RE.finditer(self.diff)]
+            ends = starts[1:] + [len(self.diff)]
+            self._files = [DiffFile(self.diff, start, end) for start, end in zip(starts, ends)]
+            self._by_path = {}
+            for diff_file in self._files:
+                self._by_path.setdefault(diff_file.path, diff_file)
+                self._by_path.setdefault(diff_file.old_path, diff_file)
+        return self._files
+
+    def summary(self) -> List[dict]:
+        """Return the per-file index of the diff.
+
+        Returns:
+            List[dict]: One DiffFile.summary() entry per file, in diff order.
+        """
+        return [diff_file.summary() for diff_file in self.files]
+
+    def get_file(self, path: str) -> DiffFile:
+        """Return the file of the diff with the given new or old path.
+
+        Raises:
+            KeyError: If the diff has no such file.
+        """
+        if self._files is None:
+            _ = self.files
+        return self._by_path[path]
+
+    def hunk(self, path: str, number: int) -> str:
+        """Return a single hunk of a file.
+
+        Args:
+            path: The file path.
+            number: The 1-based hunk number.
+
+        Returns:
+            str: The hunk text, starting with its '@@' line.
+
+        Raises:
+            KeyError: If the diff has no such file.
+            IndexError: If the file has no such hunk.
+        """
+        diff_file = self.get_file(path)
+        if not 1 <= number <= len(diff_file.hunk_offsets):
+            raise IndexError(f"{path} has no hunk {number}")
+        start = diff_file.hunk_offsets[number - 1]
+        end = (
+            diff_file.hunk_offsets[number]
+            if number < len(diff_file.hunk_offsets)
+            else diff_file.end
+        )
+        return self.diff[start:end]
+
+    def _pages(self, diff_file: DiffFile, page_bytes: int) -> List[Tuple[int, int]]:
+        """Group the file's hunks into (first, last) hunk index pages of page_bytes.
+
+        A hunk larger than page_bytes gets a page of its own.
+        """
+        pages: List[Tuple[int, int]] = []
+        bounds = diff_file.hunk_offsets + [diff_file.end]
+        first = 0
+        for last in range(len(diff_file.hunk_offsets)):
+            if last > first and bounds[last + 1] - bounds[first] > page_bytes:
+                pages.append((first, last - 1))
+                first = last
+        if diff_file.hunk_offsets:
+            pages.append((first, len(diff_file.hunk_offsets) - 1))
+        return pages
+
+    def page(self, path: str, page: int = 1, page_bytes: Optional[int] = None) -> dict:
+        """Return a page of a file's hunks, preceded by the file header.
+
+        Args:
+            path: The file path.
+            page: The 1-based page number. Defaults to 1.
+            page_bytes: The page size in bytes. Defaults to the DIFF_PAGE_SIZE setting.
+
+        Returns:
+            dict: The file 'path', the 'page' number, the number of 'pages', the
+                1-based range of 'hunks' on the page and the page 'diff' text.
+
+        Raises:
+            KeyError: If the diff has no such file.
+            IndexError: If the file has no such page.
+        """
+        if page_bytes is None:
+            page_bytes = get_int_config("DIFF_PAGE_SIZE", 12000)
+        diff_file = self.get_file(path)
+        header_end = diff_file.hunk_offsets[0] if diff_file.hunk_offsets else diff_file.end
+        header = self.diff[diff_file.start : header_end]
+        pages = self._pages(diff_file, page_bytes)
+        if not pages:
+            if page != 1:
+                raise IndexError(f"{path} has no page {page}")
+            return {"path": diff_file.path, "page": 1, "pages": 1, "hunks": [], "diff": header}
+        if not 1 <= page <= len(pages):
+            raise IndexError(f"{path} has no page {page}, it has {len(pages)}")
+        first, last = pages[page - 1]
+        end = (
+            diff_file.hunk_offsets[last + 1]
+            if last + 1 < len(diff_file.hunk_offsets)
+            else diff_file.end
+        )
+        return {
+            "path": diff_file.path,
+            "page": page,
+            "pages": len(pages),
+            "hunks": [first + 1, last + 1],
+            "diff": header + self.diff[diff_file.hunk_offsets[first] : end],
+        }
+
+
+# Recently fetched diffs, so that paging through a diff doesn't refetch it, with
+# the head SHA they were fetched at and when that head was last checked.
+_DIFF_INDEX_CACHE_SIZE = 8
+_diff_indexes: "OrderedDict[Tuple[str, str, int], Tuple[DiffIndex, str, float]]" = OrderedDict()
+_diff_indexes_lock = threading.Lock()
 
 
 class GitHubAPIError(Exception):
@@ -20,6 +670,70 @@ class GitHubAPIError(Exception):
         self.status_code = status_code
 
 
+def fetch_list(url: str, token: str, what: str = "list") -> List[dict]:
+    """Fetch every page of a GitHub list endpoint.
+
+    Args:
+        url: The endpoint URL, without query string.
+        token: The GitHub token.
+        what: What is being listed, for error messages.
+
+    Returns:
+        List[dict]: The items of all pages, up to MAX_LIST_PAGES pages.
+
+    Raises:
+        GitHubAPIError: If a request fails or returns non-200 status.
+    """
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Accept": "application/vnd.github.v3+json",
+    }
+    separator = "&" if "?" in url else "?"
+    items: List[dict] = []
+    for page in range(1, MAX_LIST_PAGES + 1):
+        page_url = f"{url}{separator}per_page={LIST_PAGE_SIZE}&page={page}"
+        try:
+            response = github_get(page_url, headers=headers, timeout=10)
+        except requests.RequestException as e:
+            raise GitHubAPIError(f"Network error while fetching {what}") from e
+        if response.status_code != 200:
+            raise GitHubAPIError(
+                f"Failed to fetch {what}: {response.status_code} - {response.text[:200]}",
+                status_code=response.status_code,
+            )
+        page_items = response.json()
+        items.extend(page_items)
+        if len(page_items) < LIST_PAGE_SIZE:
+            break
+    return items
+
+
+def list_open_pull_requests(repo_name: str, owner: str = "netSkope") -> List[int]:
+    """List the numbers of the open pull requests of a repository.
+
+    Args:
+        repo_name: The name of the GitHub repository.
+        owner: The owner of the repository. Defaults to "netSkope".
+
+    Returns:
+        List[int]: The open pull request numbers, oldest first.
+
+    Raises:
+        ValueError: If GITHUB_TOKEN is not found in environment variables.
+        GitHubAPIError: If the request fails or returns non-200 status.
+    """
+    token = get_config("GITHUB_TOKEN")
+    if not token:
+        raise ValueError("GITHUB_TOKEN not found in environment variables.")
+    pulls = fetch_list(
+        f"https://api.github.com/repos/{owner}/{repo_name}/pulls?state=open&sort=created"
+        "&direction=asc",
+        token,
+        f"open pull requests of {repo_name}",
+    )
+    return [pull["number"] for pull in pulls]
+
+
 class GitHubHandler:
     """Handler for GitHub operations.
 
@@ -38,7 +752,11 @@ class GitHubHandler:
         Raises:
             ValueError: If GITHUB_TOKEN is not found in environment variables.
         """
-        self.pr_url = f"https://api.github.com/repos/{owner}/{repo_name}/pulls/{pull_number}"
+        self.owner = owner
+        self.repo_name = repo_name
+        self.pull_number = pull_number
+        self.repo_url = f"https://api.github.com/repos/{owner}/{repo_name}"
+        self.pr_url = f"{self.repo_url}/pulls/{pull_number}"
         self.token = get_config("GITHUB_TOKEN")
         if not self.token:
             raise ValueError("GITHUB_TOKEN not found in environment variables.")
@@ -55,16 +773,21 @@ class GitHubHandler:
             "Accept": "application/vnd.github.v3+json",
         }
         try:
-            response = requests.get(self.pr_url, headers=headers, timeout=10)
+            response = github_get(self.pr_url, headers=headers, timeout=10)
             if response.status_code == 200:
                 # Extract title and body
                 pr_data = response.json()
                 title = pr_data.get("title", "")
                 body = pr_data.get("body", "")
+                head = pr_data.get("head") or {}
+                branch = head.get("ref", "")
                 return {
                     "title": title,
                     "body": body,
-                    "jira_tickets": self.extract_jira_tickets(title, body),
+                    "branch": branch,
+                    "head_sha": head.get("sha", ""),
+                    "base_sha": (pr_data.get("base") or {}).get("sha", ""),
+                    "jira_tickets": self.extract_jira_tickets(title, body, branch),
                 }
             return {
                 "error": f"Fetch PR details failed: {response.status_code}:{response.text[:200]}",
@@ -81,46 +804,366 @@ class GitHubHandler:
                 "status_code": None,
             }
 
-    def fetch_pr_diff(self) -> str:
+    def fetch_head_sha(self) -> str:
+        """Fetch the SHA of the pull request's current head commit.
+
+        Returns:
+            str: The head commit SHA.
+
+        Raises:
+            GitHubAPIError: If the pull request details cannot be fetched.
+        """
+        details = self.fetch_pr_details()
+        if "error" in details or not details.get("head_sha"):
+            raise GitHubAPIError(
+                details.get("error", "Pull request head SHA not found"),
+                status_code=details.get("status_code"),
+            )
+        return details["head_sha"]
+
+    def compare_commits(self, base_sha: str, head_sha: str) -> dict:
+        """Compare two commits of the repository.
+
+        Args:
+            base_sha: The base commit SHA.
+            head_sha: The head commit SHA.
+
+        Returns:
+            dict: The comparison 'status' ('ahead' when head descends from base,
+                'identical', 'behind' or 'diverged'), 'ahead_by' and 'behind_by'.
+
+        Raises:
+            GitHubAPIError: If the request fails or returns non-200 status.
+        """
+        headers = {
+            "Authorization": f"Bearer {self.token}",
+            "Accept": "application/vnd.github.v3+json",
+        }
+        url = f"{self.repo_url}/compare/{base_sha}...{head_sha}?per_page=1"
+        try:
+            response = github_get(url, headers=headers, timeout=10)
+        except requests.RequestException as e:
+            raise GitHubAPIError("Network error while comparing commits") from e
+        if response.status_code != 200:
+            raise GitHubAPIError(
+                f"Failed to compare commits: {response.status_code} - {response.text[:200]}",
+                status_code=response.status_code,
+            )
+        data = response.json()
+        return {
+            "status": data.get("status", ""),
+            "ahead_by": data.get("ahead_by", 0),
+            "behind_by": data.get("behind_by", 0),
+        }
+
+    def fetch_pr_diff(self, max_bytes: Optional[int] = None) -> str:
         """Fetch pull request diff from GitHub API.
 
+        Args:
+            max_bytes: The diff budget in bytes, see fetch_pr_diff_with_manifest().
+
         Returns:
             str: The diff content in unified diff format if successful.
 
         Raises:
             GitHubAPIError: If the request fails or returns non-200 status.
         """
+        diff, _ = self.fetch_pr_diff_with_manifest(max_bytes)
+        return diff
+
+    def fetch_pr_diff_with_manifest(
+        self,
+        max_bytes: Optional[int] = None,
+        since_sha: Optional[str] = None,
+        head_sha: Optional[str] = None,
+    ) -> Tuple[str, dict]:
+        """Stream the pull request diff from GitHub API within a byte budget.
+
+        The response is read incrementally and reading stops once the budget is
+        reached, cutting the diff on a file or hunk boundary.
+
+        Args:
+            max_bytes: The diff budget in bytes. Defaults to the MAX_DIFF_SIZE setting;
+                0 or less means unlimited.
+            since_sha: Return only the changes between this commit and the current
+                head (the compare diff) instead of the whole pull request diff.
+            head_sha: The current head, when the caller already fetched it for a
+                since_sha diff.
+
+        Returns:
+            Tuple[str, dict]: The diff content in unified diff format and a manifest of
+                the files that were included, truncated or skipped.
+
+        Raises:
+            GitHubAPIError: If the request fails or returns non-200 status.
+        """
+        if max_bytes is None:
+            max_bytes = get_int_config("MAX_DIFF_SIZE", 50000)
         headers = {
             "Authorization": f"Bearer {self.token}",
             "Accept": "application/vnd.github.v3.diff",
         }
         try:
-            response = requests.get(f"{self.pr_url}", headers=headers, timeout=10)
-            if response.status_code == 200:
-                return response.text
-            raise GitHubAPIError(
-                f"Failed to fetch PR diff: {response.status_code} - {response.text[:200]}",
-                status_code=response.status_code,
+            url = self.pr_url
+            if since_sha:
+                url = f"{self.repo_url}/compare/{since_sha}...{head_sha or self.fetch_head_sha()}"
+            response = github_get(
+                url,
+                headers=headers,
+                timeout=10,
+                stream=True,
+                min_bytes=max_bytes if max_bytes > 0 else None,
             )
+            try:
+                if response.status_code != 200:
+                    raise GitHubAPIError(
+                        f"Failed to fetch PR diff: {response.status_code} - {response.text[:200]}",
+                        status_code=response.status_code,
+                    )
+                diff, manifest, raw = read_diff_within_budget(
+                    response.iter_content(chunk_size=16 * 1024), max_bytes
+                )
+            finally:
+                response.close()
+            cache = get_response_cache()
+            if cache is not None:
+                cache.store_streamed(url, headers, response, raw, complete=manifest["complete"])
+            manifest["since_sha"] = since_sha
+            return diff, manifest
+        except GitHubAPIError:
+            raise
         except requests.RequestException as e:
             raise GitHubAPIError("Network error while fetching PR diff") from e
         except Exception as e:  # pylint: disable=broad-exception-caught
             raise GitHubAPIError("Unexpected error while fetching PR diff") from e
 
-    def extract_jira_tickets(self, title: str, body: str) -> list[str]:
-        """Extract JIRA tickets from PR title and body
+    def _fetch_list(self, endpoint: str) -> List[dict]:
+        """Fetch every page of a pull request list endpoint, e.g. 'files'."""
+        return fetch_list(f"{self.pr_url}/{endpoint}", self.token, f"PR {endpoint}")
+
+    def fetch_pr_files(self) -> List[dict]:
+        """Fetch the list of files changed by the pull request.
+
+        Unlike the diff, the list is not cut by MAX_DIFF_SIZE.
+
+        Returns:
+            List[dict]: The 'path', 'status', 'additions' and 'deletions' of each file,
+                plus 'old_path' for renamed files.
+
+        Raises:
+            GitHubAPIError: If the request fails or returns non-200 status.
+        """
+        files = []
+        for item in self._fetch_list("files"):
+            entry = {
+                "path": item.get("filename", ""),
+                "status": item.get("status", ""),
+                "additions": item.get("additions", 0),
+                "deletions": item.get("deletions", 0),
+            }
+            if item.get("previous_filename"):
+                entry["old_path"] = item["previous_filename"]
+            files.append(entry)
+        return files
+
+    def fetch_pr_commits(self) -> List[dict]:
+        """Fetch the commits of the pull request.
 
-        Searches for RBI JIRA ticket patterns (e.g., RBI-1234) in the provided title and body.
+        Returns:
+            List[dict]: The 'sha' and 'message' of each commit, oldest first.
+
+        Raises:
+            GitHubAPIError: If the request fails or returns non-200 status.
+        """
+        return [
+            {
+                "sha": item.get("sha", ""),
+                "message": (item.get("commit") or {}).get("message", ""),
+            }
+            for item in self._fetch_list("commits")
+        ]
+
+    def fetch_pr_bundle(self, since_sha: Optional[str] = None) -> dict:
+        """Fetch the PR details, diff, changed files and commits concurrently.
+
+        The four requests run in parallel over the shared connection pool, so the
+        wall-clock time is close to that of the slowest request. Files and commits
+        are optional: their failures are reported under 'errors' instead of raised.
+
+        Args:
+            since_sha: Index only the changes since this commit, see
+                fetch_pr_diff_with_manifest(). Files and commits cover the whole PR.
+
+        Returns:
+            dict: 'pr_details' (see fetch_pr_details()) with 'jira_tickets' extended
+                from the commit messages, 'diff_index' (a DiffIndex whose manifest also
+                lists the files beyond the diff budget as skipped), 'files', 'commits'
+                and 'errors'. Backends may add more keys, e.g. 'query_cost'.
+
+        Raises:
+            GitHubAPIError: If the diff cannot be fetched.
+        """
+        with ThreadPoolExecutor(max_workers=4, thread_name_prefix="github") as executor:
+            diff_future = executor.submit(self.fetch_pr_diff_index, since_sha=since_sha)
+            bundle = self._fetch_metadata(executor)
+            diff_index = diff_future.result()
+
+        pr_details = bundle["pr_details"]
+        manifest = diff_index.manifest
+        if bundle["files"] and not manifest.get("complete", True):
+            listed = set(manifest["included"] + manifest["truncated"] + manifest["skipped"])
+            manifest["skipped"].extend(
+                entry["path"] for entry in bundle["files"] if entry["path"] not in listed
+            )
+
+        if pr_details.get("head_sha") and not since_sha:
+            # The details were fetched next to the diff; their head lets the cached
+            # index be revalidated instead of downloaded again once it gets old.
+            key = self._diff_index_key(since_sha)
+            with _diff_indexes_lock:
+                entry = _diff_indexes.get(key)
+                if entry is not None and entry[0] is diff_index and not entry[1]:
+                    _diff_indexes[key] = (diff_index, pr_details["head_sha"], entry[2])
+        if "error" not in pr_details:
+            messages = " ".join(commit["message"] for commit in bundle["commits"])
+            pr_details["jira_tickets"] = sorted(
+                set(pr_details["jira_tickets"]) | set(self.extract_jira_tickets(messages))
+            )
+        bundle["diff_index"] = diff_index
+        return bundle
+
+    def _fetch_metadata(self, executor: ThreadPoolExecutor) -> dict:
+        """Fetch the PR details, files and commits for fetch_pr_bundle().
+
+        Args:
+            executor: The pool to run the requests on, next to the diff download.
+
+        Returns:
+            dict: The 'pr_details', 'files', 'commits' and 'errors' of the bundle.
+        """
+        details_future = executor.submit(self.fetch_pr_details)
+        files_future = executor.submit(self.fetch_pr_files)
+        commits_future = executor.submit(self.fetch_pr_commits)
+
+        bundle: dict = {"errors": {}}
+        for name, future in (("files", files_future), ("commits", commits_future)):
+            try:
+                bundle[name] = future.result()
+            except GitHubAPIError as e:
+                bundle["errors"][name] = str(e)
+                bundle[name] = []
+        bundle["pr_details"] = details_future.result()
+        return bundle
+
+    def fetch_pr_diff_index(
+        self, refresh: bool = False, since_sha: Optional[str] = None
+    ) -> DiffIndex:
+        """Return the pull request diff as a paged DiffIndex.
+
+        The index of the last few pull requests is kept in memory, so that the
+        diff is downloaded once however many pages are read from it. An index older
+        than DIFF_INDEX_TTL_SECONDS is only reused if the pull request head is known
+        and did not move since it was fetched.
+
+        Args:
+            refresh: Download the diff again even if it is in memory. Defaults to False.
+            since_sha: Index only the changes since this commit, see
+                fetch_pr_diff_with_manifest().
+
+        Returns:
+            DiffIndex: The indexed diff, with the download manifest.
+
+        Raises:
+            GitHubAPIError: If the request fails or returns non-200 status.
+        """
+        key = self._diff_index_key(since_sha)
+        with _diff_indexes_lock:
+            entry = None if refresh else _diff_indexes.get(key)
+        head_sha = ""
+        if entry is not None:
+            index, indexed_head_sha, checked_at = entry
+            if time.monotonic() - checked_at <= get_float_config("DIFF_INDEX_TTL_SECONDS", 60):
+                with _diff_indexes_lock:
+                    if key in _diff_indexes:
+                        _diff_indexes.move_to_end(key)
+                return index
+            if indexed_head_sha:
+                try:
+                    head_sha = self.fetch_head_sha()
+                except GitHubAPIError:
+                    head_sha = ""
+                if head_sha == indexed_head_sha:
+                    self._remember_diff_index(key, index, head_sha)
+                    return index
+        if since_sha and not head_sha:
+            head_sha = self.fetch_head_sha()
+        diff, manifest = self.fetch_pr_diff_with_manifest(
+            since_sha=since_sha, head_sha=head_sha or None
+        )
+        index = DiffIndex(diff, manifest)
+        self._remember_diff_index(key, index, head_sha)
+        return index
+
+    def _diff_index_key(self, since_sha: Optional[str]) -> Tuple[str, str, int]:
+        """Return the key of a diff in the in-memory diff index cache."""
+        return (self.pr_url, since_sha or "", get_int_config("MAX_DIFF_SIZE", 50000))
+
+    @staticmethod
+    def _remember_diff_index(key: Tuple[str, str, int], index: DiffIndex, head_sha: str) -> None:
+        """Keep a diff index in memory, checked at head_sha ('' when unknown) now."""
+        with _diff_indexes_lock:
+            _diff_indexes[key] = (index, head_sha, time.monotonic())
+            _diff_indexes.move_to_end(key)
+            while len(_diff_indexes) > _DIFF_INDEX_CACHE_SIZE:
+                _diff_indexes.popitem(last=False)
+
+    def extract_jira_tickets(self, title: str, body: str = "", branch: str = "") -> list[str]:
+        """Extract JIRA tickets from PR title, body and branch name
+
+        Searches for RBI JIRA ticket patterns (e.g., RBI-1234) in the provided title, body
+        and branch name. Branch names are matched case-insensitively (e.g. rbi-1234-fix).
 
         Args:
             title: The pull request title to search for JIRA tickets.
             body: The pull request body to search for JIRA tickets.
+            branch: The pull request head branch name.
 
         Returns:
-            list[str]: A list of JIRA ticket identifiers found in the title and body
+            list[str]: A list of JIRA ticket identifiers found in the title, body and branch
         """
         pattern = r"\bRBI-\d+\b"
-        tickets = re.findall(pattern, title)
-        tickets.extend(re.findall(pattern, body))
+        tickets = re.findall(pattern, title or "")
+        tickets.extend(re.findall(pattern, body or ""))
+        branch_pattern = r"(?<![A-Za-z0-9])RBI-\d+(?!\d)"
+        tickets.extend(
+            ticket.upper() for ticket in re.findall(branch_pattern, branch or "", re.IGNORECASE)
+        )
         tickets = list(set(tickets))  # use set to avoid duplicates
         return tickets
+
+
+def create_github_handler(
+    pull_number: int, repo_name: str, owner: str = "netSkope"
+) -> GitHubHandler:
+    """Create the GitHub handler of the configured GITHUB_BACKEND.
+
+    Args:
+        pull_number: The pull request number to fetch.
+        repo_name: The name of the GitHub repository.
+        owner: The owner of the repository. Defaults to "netSkope".
+
+    Returns:
+        GitHubHandler: A REST handler, or a GitHubGraphQLHandler for the "graphql" backend.
+
+    Raises:
+        ValueError: If GITHUB_TOKEN is missing or GITHUB_BACKEND is unknown.
+    """
+    backend = (get_config("GITHUB_BACKEND") or "rest").lower()
+    if backend == "rest":
+        return GitHubHandler(pull_number, repo_name, owner)
+    if backend == "graphql":
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from src.agent_torero.handlers.github_graphql import GitHubGraphQLHandler
+
+        return GitHubGraphQLHandler(pull_number, repo_name, owner)
+    raise ValueError(f"Unknown GITHUB_BACKEND '{backend}', expected 'rest' or 'graphql'.")
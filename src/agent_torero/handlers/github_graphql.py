@@ -0,0 +1,322 @@
+"""GitHub GraphQL backend for the GitHub handler.
+
+This module fetches pull request metadata, changed files, commits and linked
+issues with a single GraphQL query instead of one REST call per resource.
+The diff itself is not available over GraphQL and is still downloaded with
+the REST API.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import requests
+
+from src.agent_torero.handlers.github import (GitHubAPIError, GitHubHandler,
+                                              get_session)
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+# Connection page size; GraphQL allows at most 100 nodes per page.
+GRAPHQL_PAGE_SIZE = 100
+# Upper bound on follow-up queries for large PRs (3000 files, 250 commits).
+MAX_GRAPHQL_PAGES = 30
+
+PR_QUERY = """
+query PullRequest(
+  $owner: String!, $name: String!, $number: Int!, $pageSize: Int!,
+  $filesCursor: String, $commitsCursor: String,
+  $withDetails: Boolean!, $withFiles: Boolean!, $withCommits: Boolean!
+) {
+  rateLimit { cost remaining resetAt }
+  repository(owner: $owner, name: $name) {
+    pullRequest(number: $number) {
+      title @include(if: $withDetails)
+      body @include(if: $withDetails)
+      headRefName @include(if: $withDetails)
+      baseRefName @include(if: $withDetails)
+      headRefOid @include(if: $withDetails)
+      baseRefOid @include(if: $withDetails)
+      closingIssuesReferences(first: 20) @include(if: $withDetails) {
+        nodes { number title url }
+      }
+      files(first: $pageSize, after: $filesCursor) @include(if: $withFiles) {
+        pageInfo { hasNextPage endCursor }
+        nodes { path additions deletions changeType }
+      }
+      commits(first: $pageSize, after: $commitsCursor) @include(if: $withCommits) {
+        pageInfo { hasNextPage endCursor }
+        nodes { commit { oid message } }
+      }
+    }
+  }
+}
+"""
+
+# GraphQL PatchStatus values mapped to the REST file 'status' values.
+_CHANGE_TYPES = {
+    "ADDED": "added",
+    "DELETED": "removed",
+    "MODIFIED": "modified",
+    "RENAMED": "renamed",
+    "COPIED": "copied",
+    "CHANGED": "changed",
+}
+
+
+class GitHubGraphQLHandler(GitHubHandler):
+    """GitHub handler fetching PR metadata over the GraphQL API.
+
+    Details, files and commits come from one query, followed only by the pages
+    of files or commits that did not fit the first one. The rate limit cost of
+    the queries is recorded in 'query_cost'.
+    """
+
+    def __init__(self, pull_number: int, repo_name: str, owner: str = "netSkope"):
+        """Initialize the GitHub GraphQL handler.
+
+        Args:
+            pull_number: The pull request number to fetch.
+            repo_name: The name of the GitHub repository.
+            owner: The owner of the repository. Defaults to "netSkope".
+
+        Raises:
+            ValueError: If GITHUB_TOKEN is not found in environment variables.
+        """
+        super().__init__(pull_number, repo_name, owner)
+        self.graphql_url = GRAPHQL_URL
+        self.query_cost: Dict[str, Optional[int]] = {
+            "requests": 0,
+            "cost": 0,
+            "remaining": None,
+            "reset_at": None,
+        }
+
+    def _query(self, variables: dict) -> dict:
+        """Run the pull request query and return its 'pullRequest' object.
+
+        Args:
+            variables: The query variables besides the pull request coordinates.
+
+        Returns:
+            dict: The pull request fields selected by the variables.
+
+        Raises:
+            GitHubAPIError: If the request fails or the query returns errors.
+        """
+        payload = {
+            "query": PR_QUERY,
+            "variables": dict(
+                variables,
+                owner=self.owner,
+                name=self.repo_name,
+                number=int(self.pull_number),
+                pageSize=GRAPHQL_PAGE_SIZE,
+            ),
+        }
+        headers = {"Authorization": f"Bearer {self.token}"}
+        try:
+            response = get_session().post(
+                self.graphql_url, json=payload, headers=headers, timeout=10
+            )
+        except requests.RequestException as e:
+            raise GitHubAPIError("Network error while querying GitHub GraphQL API") from e
+        if response.status_code != 200:
+            raise GitHubAPIError(
+                f"GitHub GraphQL query failed: {response.status_code} - {response.text[:200]}",
+                status_code=response.status_code,
+            )
+        result = response.json()
+        if result.get("errors"):
+            messages = "; ".join(error.get("message", "") for error in result["errors"])
+            raise GitHubAPIError(f"GitHub GraphQL query failed: {messages}")
+
+        data = result.get("data") or {}
+        rate_limit = data.get("rateLimit") or {}
+        self.query_cost["requests"] += 1
+        self.query_cost["cost"] += rate_limit.get("cost", 0)
+        self.query_cost["remaining"] = rate_limit.get("remaining")
+        self.query_cost["reset_at"] = rate_limit.get("resetAt")
+
+        pull_request = (data.get("repository") or {}).get("pullRequest")
+        if pull_request is None:
+            raise GitHubAPIError(
+                f"Pull request {self.repo_name}#{self.pull_number} not found", status_code=404
+            )
+        return pull_request
+
+    def fetch_pr_graph(
+        self, details: bool = True, files: bool = True, commits: bool = True
+    ) -> dict:
+        """Fetch the selected parts of the pull request, following cursor pagination.
+
+        Args:
+            details: Fetch the title, body, branches, head/base SHAs and linked issues.
+            files: Fetch every changed file.
+            commits: Fetch every commit.
+
+        Returns:
+            dict: The 'pull_request' fields and the complete 'files' and 'commits' nodes.
+
+        Raises:
+            GitHubAPIError: If a query fails.
+        """
+        variables = {"withDetails": details, "withFiles": files, "withCommits": commits}
+        pull_request = self._query(variables)
+        nodes: Dict[str, List[dict]] = {"files": [], "commits": []}
+        cursors = {}
+        for name in ("files", "commits"):
+            connection = pull_request.get(name)
+            if connection:
+                nodes[name].extend(connection["nodes"])
+                if connection["pageInfo"]["hasNextPage"]:
+                    cursors[name] = connection["pageInfo"]["endCursor"]
+
+        for _ in range(MAX_GRAPHQL_PAGES):
+            if not cursors:
+                break
+            page = self._query(
+                {
+                    "withDetails": False,
+                    "withFiles": "files" in cursors,
+                    "withCommits": "commits" in cursors,
+                    "filesCursor": cursors.get("files"),
+                    "commitsCursor": cursors.get("commits"),
+                }
+            )
+            for name in list(cursors):
+                connection = page[name]
+                nodes[name].extend(connection["nodes"])
+                if connection["pageInfo"]["hasNextPage"]:
+                    cursors[name] = connection["pageInfo"]["endCursor"]
+                else:
+                    del cursors[name]
+        return {"pull_request": pull_request, "files": nodes["files"], "commits": nodes["commits"]}
+
+    def _details(self, pull_request: dict, commits: List[dict]) -> dict:
+        """Build the fetch_pr_details() result from the queried fields."""
+        title = pull_request.get("title") or ""
+        body = pull_request.get("body") or ""
+        branch = pull_request.get("headRefName") or ""
+        messages = " ".join(commit["message"] for commit in commits)
+        return {
+            "title": title,
+            "body": body,
+            "branch": branch,
+            "base_branch": pull_request.get("baseRefName") or "",
+            "head_sha": pull_request.get("headRefOid") or "",
+            "base_sha": pull_request.get("baseRefOid") or "",
+            "linked_issues": [
+                {"number": issue["number"], "title": issue["title"], "url": issue["url"]}
+                for issue in (pull_request.get("closingIssuesReferences") or {}).get("nodes", [])
+            ],
+            "jira_tickets": sorted(
+                set(self.extract_jira_tickets(title, body, branch))
+                | set(self.extract_jira_tickets(messages))
+            ),
+        }
+
+    @staticmethod
+    def _files(nodes: List[dict]) -> List[dict]:
+        """Convert file nodes to the fetch_pr_files() format."""
+        return [
+            {
+                "path": node["path"],
+                "status": _CHANGE_TYPES.get(node.get("changeType", ""), "modified"),
+                "additions": node.get("additions", 0),
+                "deletions": node.get("deletions", 0),
+            }
+            for node in nodes
+        ]
+
+    @staticmethod
+    def _commits(nodes: List[dict]) -> List[dict]:
+        """Convert commit nodes to the fetch_pr_commits() format."""
+        return [
+            {"sha": node["commit"]["oid"], "message": node["commit"]["message"]}
+            for node in nodes
+        ]
+
+    def fetch_pr_details(self) -> dict:
+        """Fetch pull request details from GitHub GraphQL API.
+
+        Besides the REST details, the result has the 'base_branch', 'head_sha',
+        'base_sha' and 'linked_issues', and 'jira_tickets' includes the keys found
+        in commit messages.
+
+        Returns:
+            dict: The pull request details if successful, OR error information if
+                  the request fails.
+        """
+        try:
+            graph = self.fetch_pr_graph(files=False)
+            return self._details(graph["pull_request"], self._commits(graph["commits"]))
+        except GitHubAPIError as e:
+            return {"error": str(e), "status_code": e.status_code}
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            return {
+                "error": f"Unexpected error while fetching PR details: {str(e)}",
+                "status_code": None,
+            }
+
+    def fetch_head_sha(self) -> str:
+        """Fetch the SHA of the pull request's current head commit.
+
+        Returns:
+            str: The head commit SHA.
+
+        Raises:
+            GitHubAPIError: If the query fails.
+        """
+        pull_request = self.fetch_pr_graph(files=False, commits=False)["pull_request"]
+        return pull_request["headRefOid"]
+
+    def fetch_pr_files(self) -> List[dict]:
+        """Fetch the list of files changed by the pull request.
+
+        Returns:
+            List[dict]: The 'path', 'status', 'additions' and 'deletions' of each file.
+
+        Raises:
+            GitHubAPIError: If a query fails.
+        """
+        return self._files(self.fetch_pr_graph(details=False, commits=False)["files"])
+
+    def fetch_pr_commits(self) -> List[dict]:
+        """Fetch the commits of the pull request.
+
+        Returns:
+            List[dict]: The 'sha' and 'message' of each commit, oldest first.
+
+        Raises:
+            GitHubAPIError: If a query fails.
+        """
+        return self._commits(self.fetch_pr_graph(details=False, files=False)["commits"])
+
+    def _fetch_metadata(self, executor: ThreadPoolExecutor) -> dict:
+        """Fetch the PR details, files and commits with one query (plus pagination).
+
+        Args:
+            executor: Unused, the query runs next to the diff download.
+
+        Returns:
+            dict: The 'pr_details', 'files', 'commits', 'errors' and 'query_cost' of
+                the bundle.
+        """
+        try:
+            graph = self.fetch_pr_graph()
+        except GitHubAPIError as e:
+            error = {"error": str(e), "status_code": e.status_code}
+            return {
+                "pr_details": error,
+                "files": [],
+                "commits": [],
+                "errors": {"files": str(e), "commits": str(e)},
+                "query_cost": dict(self.query_cost),
+            }
+        commits = self._commits(graph["commits"])
+        return {
+            "pr_details": self._details(graph["pull_request"], commits),
+            "files": self._files(graph["files"]),
+            "commits": commits,
+            "errors": {},
+            "query_cost": dict(self.query_cost),
+        }
@@ -2,14 +2,195 @@
 JIRA handler to interact with JIRA API
 
 This module provides a JIRAHandler class that allows interaction with the JIRA API
-to fetch issue details based on JIRA ticket identifiers.
+to fetch issue details based on JIRA ticket identifiers, a normalization of the
+ticket texts to compact plain text, and a persistent cache of the fetched tickets.
 """
 
-from typing import Optional
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
+import requests
 from atlassian import Jira
+from urllib3.util.retry import Retry
 
-from src.agent_torero.config import get_config
+from src.agent_torero.cache import DiskLRUCache
+from src.agent_torero.config import (get_bool_config, get_config,
+                                     get_float_config, get_int_config)
+from src.agent_torero.ratelimit import RateLimitedAdapter
+
+# Transient statuses worth retrying for idempotent requests.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Fields requested by ticket searches; everything else is left on the server.
+TICKET_FIELDS = ["summary", "description", "status", "comment", "updated"]
+# Issues per search page, and keys per JQL query to keep the query string short.
+JQL_PAGE_SIZE = 50
+JQL_MAX_KEYS = 100
+# Fields needed to follow the links of an issue in the linked-issue graph.
+GRAPH_FIELDS = ["summary", "status", "issuetype", "parent", "subtasks", "issuelinks"]
+
+# Ticket the reviews are posted to; replace with actual logic as needed.
+REVIEW_TICKET_ID = "RBI-38719"
+# Line appended to review comments to find them again, e.g. to edit them on a re-run.
+REVIEW_MARKER = "agent-torero-review: {marker}"
+# Code and log blocks longer than this are replaced by a one-line note.
+CODE_BLOCK_MAX_LINES = 8
+
+_TICKET_KEY_RE = re.compile(r"^[A-Z][A-Z0-9_]*-\d+$")
+_WIKI_BLOCK_RE = re.compile(r"\{(code|noformat|quote)(?::[^}]*)?\}")
+_WIKI_IMAGE_RE = re.compile(r"![^!\s][^!\n]*!")
+_WIKI_LINK_RE = re.compile(r"\[(?:([^|\]]*)\|)?([^\]]+)\]")
+_WIKI_MACRO_RE = re.compile(r"\{(?:color|panel|anchor)(?::[^}]*)?\}")
+_WIKI_HEADING_RE = re.compile(r"^\s*h[1-6]\.\s+")
+_WIKI_QUOTE_LINE_RE = re.compile(r"^\s*(?:bq\.\s|>)")
+_WHITESPACE_RE = re.compile(r"[ \t\r\f\v]+")
+# ADF nodes that carry no reviewable text.
+_ADF_SKIPPED = {"media", "mediaSingle", "mediaGroup", "mediaInline", "blockquote", "rule"}
+
+
+def _code_block_lines(lines: List[str]) -> Iterator[str]:
+    """Yield a code or log block, or a note in its place if it is long."""
+    if len(lines) <= CODE_BLOCK_MAX_LINES:
+        yield from lines
+    else:
+        yield f"[{len(lines)} lines of code or logs omitted]"
+
+
+def _iter_wiki_lines(text: str) -> Iterator[str]:
+    """
+    Yield the plain text lines of Jira wiki markup.
+
+    Images, quotes and macros are dropped, links are reduced to their text and
+    long {code} / {noformat} blocks are replaced by a note.
+    """
+    block: Optional[str] = None
+    block_lines: List[str] = []
+    for line in text.splitlines():
+        if block is not None:
+            closing = "{" + block + "}"
+            end = line.find(closing)
+            if end < 0:
+                block_lines.append(line)
+                continue
+            block_lines.append(line[:end])
+            if block != "quote":
+                yield from _code_block_lines([part for part in block_lines if part.strip()])
+            block, block_lines = None, []
+            line = line[end + len(closing) :]
+            if not line.strip():
+                continue
+        match = _WIKI_BLOCK_RE.search(line)
+        if match:
+            before, after = line[: match.start()], line[match.end() :]
+            closing = after.find("{" + match.group(1) + "}")
+            if closing >= 0:  # One-line block.
+                if match.group(1) != "quote":
+                    yield from _code_block_lines([after[:closing]])
+                yield from _iter_wiki_lines(before + after[closing + len(match.group(1)) + 2 :])
+                continue
+            block, block_lines = match.group(1), [after]
+            line = before
+            if not line.strip():
+                continue
+        if _WIKI_QUOTE_LINE_RE.match(line):
+            continue
+        line = _WIKI_IMAGE_RE.sub("", line)
+        line = _WIKI_MACRO_RE.sub("", line).replace("{color}", "").replace("{panel}", "")
+        line = _WIKI_LINK_RE.sub(lambda m: m.group(1) or m.group(2), line)
+        yield _WIKI_HEADING_RE.sub("", line)
+    if block is not None and block != "quote":
+        yield from _code_block_lines([part for part in block_lines if part.strip()])
+
+
+def _adf_inline_text(node: Dict[str, Any]) -> str:
+    """Return the text of an inline ADF node."""
+    attrs = node.get("attrs") or {}
+    node_type = node.get("type")
+    if node_type == "text":
+        return node.get("text", "")
+    if node_type == "hardBreak":
+        return "\n"
+    if node_type == "mention":
+        return attrs.get("text", "")
+    if node_type == "emoji":
+        return attrs.get("text") or attrs.get("shortName", "")
+    if node_type == "inlineCard":
+        return attrs.get("url", "")
+    return "".join(_adf_inline_text(child) for child in node.get("content") or [])
+
+
+def _iter_adf_lines(node: Dict[str, Any]) -> Iterator[str]:
+    """
+    Yield the plain text lines of an Atlassian Document Format (ADF) document.
+
+    Media and quotes are dropped and long code blocks are replaced by a note.
+    """
+    node_type = node.get("type")
+    children = node.get("content") or []
+    if node_type in _ADF_SKIPPED:
+        return
+    if node_type == "codeBlock":
+        text = "".join(_adf_inline_text(child) for child in children)
+        yield from _code_block_lines([line for line in text.splitlines() if line.strip()])
+    elif node_type in ("paragraph", "heading"):
+        yield from "".join(_adf_inline_text(child) for child in children).splitlines()
+    else:
+        for child in children:
+            yield from _iter_adf_lines(child)
+
+
+def _source_length(content: Any) -> int:
+    """Return the number of text characters of wiki markup or an ADF document."""
+    if isinstance(content, str):
+        return len(content)
+    if isinstance(content, dict):
+        return len(content.get("text", "")) + sum(
+            _source_length(child) for child in content.get("content") or []
+        )
+    return 0
+
+
+def normalize_jira_text(content: Any, max_chars: int) -> Tuple[str, int]:
+    """
+    Convert Jira wiki markup or an ADF document to compact plain text.
+
+    Lines are converted one at a time and the conversion stops as soon as the
+    budget is used up. Blank lines and runs of spaces are collapsed.
+
+    Args:
+        content (Any): A wiki markup string (REST API v2) or an ADF dict (v3).
+        max_chars (int): The maximum length of the result.
+
+    Returns:
+        Tuple[str, int]: The plain text, and the number of source characters that
+        were dropped as noise or for exceeding the budget.
+    """
+    if isinstance(content, dict):
+        lines = _iter_adf_lines(content)
+    elif isinstance(content, str):
+        lines = _iter_wiki_lines(content)
+    else:
+        return "", 0
+    kept: List[str] = []
+    size = 0
+    for line in lines:
+        line = _WHITESPACE_RE.sub(" ", line).strip()
+        if not line and (not kept or not kept[-1]):
+            continue
+        if size + len(line) > max_chars:
+            if max_chars - size > 1:
+                kept.append(line[: max_chars - size - 1].rstrip() + "…")
+            break
+        kept.append(line)
+        size += len(line) + 1
+    text = "\n".join(kept).strip()
+    return text, max(0, _source_length(content) - len(text))
 
 
 class JIRAAPIError(Exception):
@@ -20,6 +201,269 @@ class JIRAAPIError(Exception):
         self.ticket_id = ticket_id
 
 
+def _build_client(server: str, user_email: str, api_token: str) -> Jira:
+    """
+    Build a Jira client over a pooled, keep-alive session with transport retries.
+
+    Args:
+        server (str): The Jira server URL.
+        user_email (str): The user to authenticate as.
+        api_token (str): The API token of the user.
+
+    Returns:
+        Jira: A client retrying idempotent requests with exponential backoff,
+        honouring Retry-After headers, and pacing requests through the shared rate
+        limit scheduler.
+    """
+    retry = Retry(
+        total=get_int_config("JIRA_MAX_RETRIES", 3),
+        backoff_factor=get_float_config("JIRA_BACKOFF_FACTOR", 0.5),
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = RateLimitedAdapter(
+        "jira",
+        pool_connections=1,
+        pool_maxsize=get_int_config("JIRA_POOL_SIZE", 8),
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return Jira(url=server, username=user_email, password=api_token, session=session)
+
+
+_client: Optional[Jira] = None
+_client_identity: Optional[str] = None
+_client_lock = threading.Lock()
+
+
+def _identity(server: str, user_email: str, api_token: str) -> str:
+    """Digest of the server and credentials a client was built for."""
+    return hashlib.sha256("\n".join((server, user_email, api_token)).encode("utf-8")).hexdigest()
+
+
+def get_jira_client(server: str, user_email: str, api_token: str) -> Jira:
+    """
+    Return the process-wide Jira client, creating it on first use.
+
+    The client keeps its connections to the Jira server alive and is shared by all
+    JIRAHandler instances and tool invocations. It is rebuilt when the server or
+    the credentials differ from the ones it was built with.
+
+    Args:
+        server (str): The Jira server URL.
+        user_email (str): The user to authenticate as.
+        api_token (str): The API token of the user.
+
+    Returns:
+        Jira: The shared client.
+    """
+    global _client, _client_identity  # pylint: disable=global-statement
+    identity = _identity(server, user_email, api_token)
+    with _client_lock:
+        if _client is None or _client_identity != identity:
+            # Handlers holding the previous client keep using it until they are done.
+            _client = _build_client(server, user_email, api_token)
+            _client_identity = identity
+        return _client
+
+
+def check_jira_client() -> bool:
+    """
+    Check that the shared Jira client can still authenticate against the server.
+
+    A failing client is dropped, so that the next get_jira_client() call builds a
+    new one with fresh connections.
+
+    Returns:
+        bool: True if the client answered, False if it failed or was never built.
+    """
+    global _client, _client_identity  # pylint: disable=global-statement
+    with _client_lock:
+        client = _client
+    if client is None:
+        return False
+    try:
+        client.myself()
+        return True
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        print(f"Jira health check failed, rebuilding the client: {str(e)}")
+        with _client_lock:
+            if _client is client:
+                _client = None
+                _client_identity = None
+        return False
+
+
+class JIRATicketCache:
+    """
+    Cache of ticket details, with an in-memory LRU in front of a SQLite store.
+
+    Every entry remembers the ticket's 'updated' time. Before an entry is served,
+    the caller compares it with the current 'updated' time from a lightweight
+    search, so only changed tickets are fetched again. Entries older than the TTL
+    are dropped regardless, as comment edits do not always bump 'updated'.
+    """
+
+    def __init__(self, store: DiskLRUCache, ttl_seconds: float, memory_entries: int = 256):
+        """
+        Initialize the cache.
+
+        Args:
+            store (DiskLRUCache): The persistent store of ticket details.
+            ttl_seconds (float): The maximum age of an entry since its ticket was fetched.
+            memory_entries (int): The number of tickets kept in memory. Defaults to 256.
+        """
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, Tuple[dict, str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.memory_hits = 0
+        self.stale = 0
+        self.misses = 0
+
+    def _remember(self, key: str, entry: Tuple[dict, str, float]) -> None:
+        """Put an entry in the memory LRU, evicting the least recently used one."""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Tuple[dict, str]]:
+        """
+        Return a cached ticket and its 'updated' time, without revalidating it.
+
+        Args:
+            key (str): The ticket key.
+
+        Returns:
+            Optional[Tuple[dict, str]]: The ticket details and 'updated' time, or None
+            if the ticket is not cached or its entry expired.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[2] <= self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[0], entry[1]
+            self._memory.pop(key, None)
+        cached = self.store.get(key)
+        if cached is None:
+            return None
+        body, meta = cached
+        entry = (json.loads(body), meta.get("updated", ""), meta.get("fetched_at", now))
+        if now - entry[2] > self.ttl_seconds:
+            return None
+        with self._lock:
+            self._remember(key, entry)
+        return entry[0], entry[1]
+
+    def set(self, key: str, ticket: dict, updated: str) -> None:
+        """
+        Store freshly fetched ticket details.
+
+        Args:
+            key (str): The ticket key.
+            ticket (dict): The ticket details.
+            updated (str): The ticket's 'updated' time.
+        """
+        entry = (ticket, updated, time.time())
+        with self._lock:
+            self._remember(key, entry)
+        self.store.set(
+            key,
+            json.dumps(ticket).encode("utf-8"),
+            {"updated": updated, "fetched_at": entry[2]},
+        )
+
+    def invalidate(self, key: str) -> None:
+        """
+        Drop a ticket from the cache.
+
+        Args:
+            key (str): The ticket key.
+        """
+        with self._lock:
+            self._memory.pop(key, None)
+        self.store.delete(key)
+
+    def record(self, hits: int = 0, stale: int = 0, misses: int = 0) -> None:
+        """
+        Count the outcome of a lookup.
+
+        Args:
+            hits (int): Tickets served from the cache after revalidation.
+            stale (int): Cached tickets refetched because they changed.
+            misses (int): Tickets that were not cached.
+        """
+        with self._lock:
+            self.hits += hits
+            self.stale += stale
+            self.misses += misses
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Return the lookup counters, the hit rate and the store statistics.
+
+        Returns:
+            Dict[str, float]: 'hits', 'stale' and 'misses' tickets, the 'hit_rate' over
+            all three, the 'memory_hits' (cached tickets read from the memory LRU
+            rather than the store), the 'memory_entries' and the store 'entries',
+            'bytes' and 'evictions'.
+        """
+        with self._lock:
+            counters = {"hits": self.hits, "stale": self.stale, "misses": self.misses}
+            memory_hits = self.memory_hits
+            memory_entries = len(self._memory)
+        lookups = sum(counters.values())
+        store_stats = self.store.stats()
+        counters.update(
+            {
+                "hit_rate": round(counters["hits"] / lookups, 3) if lookups else 0.0,
+                "memory_hits": memory_hits,
+                "memory_entries": memory_entries,
+                "entries": store_stats["entries"],
+                "bytes": store_stats["bytes"],
+                "evictions": store_stats["evictions"],
+            }
+        )
+        return counters
+
+
+_ticket_cache: Optional[JIRATicketCache] = None
+_ticket_cache_lock = threading.Lock()
+
+
+def get_ticket_cache() -> Optional[JIRATicketCache]:
+    """
+    Return the process-wide ticket cache, creating it on first use.
+
+    Returns:
+        Optional[JIRATicketCache]: The shared cache, or None if JIRA_CACHE is off.
+    """
+    global _ticket_cache  # pylint: disable=global-statement
+    if not get_bool_config("JIRA_CACHE", True):
+        return None
+    with _ticket_cache_lock:
+        if _ticket_cache is None:
+            ttl_seconds = get_float_config("JIRA_CACHE_TTL_SECONDS", 24 * 60 * 60)
+            store = DiskLRUCache(
+                Path(get_config("CACHE_DIR", ".cache")) / "jira_tickets.sqlite3",
+                max_bytes=get_int_config("JIRA_CACHE_MAX_BYTES", 20 * 1024 * 1024),
+                ttl_seconds=ttl_seconds,
+            )
+            _ticket_cache = JIRATicketCache(
+                store, ttl_seconds, get_int_config("JIRA_CACHE_MEMORY_ENTRIES", 256)
+            )
+        return _ticket_cache
+
+
 class JIRAHandler:
     """Handler for JIRA operations.
 
@@ -43,10 +487,8 @@ class JIRAHandler:
             raise ValueError("One or more JIRA environment variables are missing.")
 
         try:
-            self.jira = Jira(
-                url=self.server,  # type: ignore
-                username=self.user_email,
-                password=self.api_token,
+            self.jira = get_jira_client(
+                self.server, self.user_email, self.api_token  # type: ignore[arg-type]
             )
         except Exception as e:  # pylint: disable=broad-exception-caught
             raise JIRAAPIError("Failed to initialize JIRA connection") from e
@@ -68,41 +510,322 @@ class JIRAHandler:
             return {"error": error_msg}
 
         try:
-            issue = self.jira.issue(ticket_id)
+            issue = self.jira.issue(ticket_id, fields=",".join(TICKET_FIELDS))
             comments = self.jira.issue_get_comments(ticket_id)
-
-            # Extracting relevant fields - issue is already a dict with 'fields' key
-            fields = issue.get("fields", {}) if isinstance(issue, dict) else {}
-            status = (
-                fields.get("status", {})
-                if isinstance(fields.get("status"), dict)
-                else {}
-            )
-
-            # Handle comments safely
-            safe_comments = comments if comments is not None else {}
-            safe_comments = safe_comments.get("comments", [])
-
-            ticket_info = {
-                "id": ticket_id,
-                "summary": fields.get("summary", "No summary available"),
-                "description": fields.get("description", "No description available"),
-                "status": status.get("name", "Unknown status"),
-                "comments": [
-                    comment.get("body", "")
-                    for comment in safe_comments
-                    if isinstance(comment, dict)
-                ],
-            }
-            return ticket_info
+            return self._to_ticket_info(ticket_id, issue, comments)
         except Exception as e:  # pylint: disable=broad-exception-caught
             error_msg = f"Failed to fetch details for {ticket_id}: {str(e)}"
             return {"id": ticket_id, "error": error_msg}
 
+    @staticmethod
+    def _to_ticket_info(ticket_id: str, issue: dict, comments: Optional[dict] = None) -> dict:
+        """
+        Build the ticket details dict from an issue and its comments.
+
+        The description and comments are normalized to plain text within the
+        JIRA_TICKET_CHAR_BUDGET setting, the description taking at most half of it.
+        Only the newest JIRA_MAX_COMMENTS comments that fit the rest are kept.
+
+        Args:
+            ticket_id: The requested ticket identifier.
+            issue: The issue JSON, with a 'fields' key.
+            comments: The comments JSON, with a 'comments' key. Defaults to the
+                comments embedded in the issue 'comment' field.
+        Returns:
+            dict: The ticket details (id, summary, description, status, comments, oldest
+                first), and the number of 'dropped' comments and characters if any.
+        """
+        # Extracting relevant fields - issue is already a dict with 'fields' key
+        fields = issue.get("fields", {}) if isinstance(issue, dict) else {}
+        status = fields.get("status", {}) if isinstance(fields.get("status"), dict) else {}
+
+        # Handle comments safely
+        if comments is None:
+            comments = fields.get("comment")
+        safe_comments = comments if isinstance(comments, dict) else {}
+        safe_comments = safe_comments.get("comments", [])
+        bodies = [comment.get("body", "") for comment in safe_comments if isinstance(comment, dict)]
+
+        budget = get_int_config("JIRA_TICKET_CHAR_BUDGET", 8000)
+        max_comments = max(0, get_int_config("JIRA_MAX_COMMENTS", 10))
+        description, dropped_chars = normalize_jira_text(fields.get("description"), budget // 2)
+        remaining = budget - len(description)
+        newest = bodies[len(bodies) - max_comments :] if max_comments else []
+        dropped_comments = len(bodies) - len(newest)
+        dropped_chars += sum(_source_length(body) for body in bodies[: dropped_comments])
+        kept: List[str] = []
+        for body in reversed(newest):
+            # Only the newest comment may be cut; older ones fit entirely or are dropped.
+            text, dropped = normalize_jira_text(body, budget if kept else max(remaining, 0))
+            if text and len(text) <= remaining:
+                kept.append(text)
+                dropped_chars += dropped
+                remaining -= len(text)
+                continue
+            dropped_comments += 1
+            dropped_chars += _source_length(body)
+            if text:
+                remaining = 0
+        kept.reverse()
+
+        ticket = {
+            "id": ticket_id,
+            "summary": fields.get("summary", "No summary available"),
+            "description": description or "No description available",
+            "status": status.get("name", "Unknown status"),
+            "comments": kept,
+        }
+        if dropped_comments or dropped_chars:
+            ticket["dropped"] = {"comments": dropped_comments, "characters": dropped_chars}
+        return ticket
+
+    def _search_issues(self, keys: List[str], fields: List[str]) -> Dict[str, dict]:
+        """
+        Run paged 'key in (...)' JQL searches for the given ticket keys.
+
+        Args:
+            keys: Valid, upper-case ticket keys.
+            fields: The issue fields to return.
+        Returns:
+            Dict[str, dict]: The found issues by key; missing keys are left out.
+
+        Raises:
+            JIRAAPIError: If a search request fails.
+        """
+        issues: Dict[str, dict] = {}
+        for offset in range(0, len(keys), JQL_MAX_KEYS):
+            jql = f"key in ({', '.join(keys[offset : offset + JQL_MAX_KEYS])})"
+            start = 0
+            while True:
+                try:
+                    page = self.jira.jql(
+                        jql,
+                        fields=fields,
+                        start=start,
+                        limit=JQL_PAGE_SIZE,
+                        validate_query="warn",  # Missing keys must not fail the search.
+                    )
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    raise JIRAAPIError(f"JQL search failed: {str(e)}") from e
+                page_issues = (page or {}).get("issues", [])
+                for issue in page_issues:
+                    issues[issue.get("key", "").upper()] = issue
+                start += len(page_issues)
+                if not page_issues or start >= (page or {}).get("total", 0):
+                    break
+        return issues
+
+    def search_tickets(
+        self, ticket_ids: List[str], cache: Optional[JIRATicketCache] = None
+    ) -> List[dict]:
+        """
+        Fetch several JIRA tickets with paged 'key in (...)' JQL searches.
+
+        Only the summary, description, status, comment and updated fields are
+        requested. Tickets whose embedded comments are incomplete get their comments
+        fetched separately. With a cache, cached tickets are first revalidated with a
+        search for their 'updated' field only, and just the changed or uncached
+        tickets are fetched in full.
+
+        Args:
+            ticket_ids: JIRA ticket identifiers (e.g., ['RBI-1234', 'RBI-5678']).
+            cache: The ticket cache to serve and store tickets with. Defaults to None.
+        Returns:
+            List[dict]: The ticket details, one per distinct ticket ID in input order,
+                  with {"id": <id>, "error": <error_message>} for invalid or missing keys.
+
+        Raises:
+            JIRAAPIError: If a search request fails.
+        """
+        requested = list(dict.fromkeys(ticket_id.strip().upper() for ticket_id in ticket_ids))
+        keys = [key for key in requested if _TICKET_KEY_RE.match(key)]
+
+        tickets: Dict[str, dict] = {}
+        if cache is not None:
+            cached = {key: entry for key in keys if (entry := cache.get(key)) is not None}
+            current = self._search_issues(list(cached), ["updated"]) if cached else {}
+            for key, (ticket, updated) in cached.items():
+                issue = current.get(key)
+                if issue is not None and (issue.get("fields") or {}).get("updated") == updated:
+                    tickets[key] = ticket
+                else:
+                    cache.invalidate(key)
+            cache.record(
+                hits=len(tickets),
+                stale=len(cached) - len(tickets),
+                misses=len(keys) - len(cached),
+            )
+
+        missing = [key for key in keys if key not in tickets]
+        issues = self._search_issues(missing, TICKET_FIELDS) if missing else {}
+
+        results = []
+        for key in requested:
+            if key in tickets:
+                results.append(tickets[key])
+                continue
+            if not _TICKET_KEY_RE.match(key):
+                results.append({"id": key, "error": f"Invalid ticket ID: {key}"})
+                continue
+            issue = issues.get(key)
+            if issue is None:
+                results.append({"id": key, "error": f"Ticket {key} not found"})
+                continue
+            fields = issue.get("fields") or {}
+            embedded = fields.get("comment") or {}
+            comments = None
+            if embedded.get("total", 0) > len(embedded.get("comments", [])):
+                try:
+                    comments = self.jira.issue_get_comments(key)
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    results.append(
+                        {"id": key, "error": f"Failed to fetch comments for {key}: {str(e)}"}
+                    )
+                    continue
+            ticket = self._to_ticket_info(key, issue, comments)
+            if cache is not None and fields.get("updated"):
+                cache.set(key, ticket, fields["updated"])
+            results.append(ticket)
+        return results
+
+    @staticmethod
+    def _issue_links(issue: dict) -> List[Tuple[str, str]]:
+        """
+        Return the (relation, key) pairs of the parent, sub-tasks and issue links of an issue.
+
+        Args:
+            issue: The issue JSON with the GRAPH_FIELDS.
+        Returns:
+            List[Tuple[str, str]]: The relation, read from the issue's side (e.g.
+                'parent', 'subtask', 'blocks', 'is blocked by'), and the linked key.
+        """
+        fields = issue.get("fields") or {}
+        links = []
+        if (fields.get("parent") or {}).get("key"):
+            links.append(("parent", fields["parent"]["key"]))
+        for subtask in fields.get("subtasks") or []:
+            if subtask.get("key"):
+                links.append(("subtask", subtask["key"]))
+        for link in fields.get("issuelinks") or []:
+            link_type = link.get("type") or {}
+            if (link.get("outwardIssue") or {}).get("key"):
+                relation = link_type.get("outward") or link_type.get("name", "links")
+                links.append((relation, link["outwardIssue"]["key"]))
+            elif (link.get("inwardIssue") or {}).get("key"):
+                relation = link_type.get("inward") or link_type.get("name", "links")
+                links.append((relation, link["inwardIssue"]["key"]))
+        return [(relation, key.upper()) for relation, key in links]
+
+    def expand_issue_graph(
+        self,
+        ticket_ids: List[str],
+        max_depth: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        max_workers: Optional[int] = None,
+    ) -> dict:
+        """
+        Expand the parent, sub-task and issue links of tickets breadth-first.
+
+        Each level of the graph is fetched with JQL searches of at most
+        JQL_PAGE_SIZE keys, run concurrently. Keys are visited once, and the
+        expansion stops at max_depth hops or max_nodes issues.
+
+        Args:
+            ticket_ids: The seed ticket identifiers (e.g., ['RBI-1234']).
+            max_depth: The number of link hops to follow from the seeds. Defaults to
+                the JIRA_GRAPH_DEPTH setting.
+            max_nodes: The maximum number of issues in the graph. Defaults to the
+                JIRA_GRAPH_MAX_NODES setting.
+            max_workers: The number of concurrent searches. Defaults to the
+                JIRA_GRAPH_WORKERS setting.
+        Returns:
+            dict: The 'nodes' (key, summary, status, type and depth from the seeds),
+                the 'edges' ([from, relation, to], between nodes of the graph only),
+                the 'missing' keys, and 'truncated' if max_nodes cut the expansion.
+
+        Raises:
+            JIRAAPIError: If a search request fails.
+        """
+        if max_depth is None:
+            max_depth = get_int_config("JIRA_GRAPH_DEPTH", 2)
+        if max_nodes is None:
+            max_nodes = get_int_config("JIRA_GRAPH_MAX_NODES", 40)
+        if max_workers is None:
+            max_workers = get_int_config("JIRA_GRAPH_WORKERS", 4)
+
+        seeds = list(dict.fromkeys(ticket_id.strip().upper() for ticket_id in ticket_ids))
+        frontier = [key for key in seeds if _TICKET_KEY_RE.match(key)][:max_nodes]
+        depths = {key: 0 for key in frontier}
+        nodes: Dict[str, dict] = {}
+        links: Dict[str, List[Tuple[str, str]]] = {}
+        missing = [key for key in seeds if not _TICKET_KEY_RE.match(key)]
+        truncated = len(depths) < len(seeds) - len(missing)
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="jira-graph"
+        ) as executor:
+            for depth in range(max_depth + 1):
+                if not frontier:
+                    break
+                chunks = [
+                    frontier[offset : offset + JQL_PAGE_SIZE]
+                    for offset in range(0, len(frontier), JQL_PAGE_SIZE)
+                ]
+                issues: Dict[str, dict] = {}
+                for found in executor.map(
+                    lambda chunk: self._search_issues(chunk, GRAPH_FIELDS), chunks
+                ):
+                    issues.update(found)
+
+                next_frontier = []
+                for key in frontier:
+                    issue = issues.get(key)
+                    if issue is None:
+                        missing.append(key)
+                        continue
+                    fields = issue.get("fields") or {}
+                    nodes[key] = {
+                        "key": key,
+                        "summary": fields.get("summary", ""),
+                        "status": (fields.get("status") or {}).get("name", "Unknown status"),
+                        "type": (fields.get("issuetype") or {}).get("name", ""),
+                        "depth": depth,
+                    }
+                    links[key] = self._issue_links(issue)
+                    if depth == max_depth:
+                        continue
+                    for _, linked in links[key]:
+                        if linked in depths:
+                            continue
+                        if len(depths) >= max_nodes:
+                            truncated = True
+                            continue
+                        depths[linked] = depth + 1
+                        next_frontier.append(linked)
+                frontier = next_frontier
+
+        edges = []
+        seen = set()
+        for key, relations in links.items():
+            for relation, linked in relations:
+                # Both ends of a link list it; keep the first direction seen.
+                if linked in nodes and (linked, key) not in seen:
+                    seen.add((key, linked))
+                    edges.append([key, relation, linked])
+        return {
+            "nodes": list(nodes.values()),
+            "edges": edges,
+            "missing": missing,
+            "truncated": truncated,
+        }
+
     def fetch_tickets_details(self, ticket_ids: list[str]) -> list[dict]:
         """
         Fetch details of multiple JIRA tickets.
 
+        The tickets are fetched with a bulk JQL search through the ticket cache,
+        falling back to one request per ticket if the search fails.
+
         Args:
             ticket_ids: A list of JIRA ticket identifiers (e.g., ['RBI-1234', 'RBI-5678']).
         Returns:
@@ -112,6 +835,11 @@ class JIRAHandler:
         if not ticket_ids:
             return [{"error": "No ticket IDs provided."}]
 
+        try:
+            return self.search_tickets(ticket_ids, cache=get_ticket_cache())
+        except JIRAAPIError as e:
+            print(f"Bulk ticket search failed, fetching tickets one by one: {str(e)}")
+
         results = []
         for ticket_id in ticket_ids:
             result = self.fetch_ticket_details(ticket_id)
@@ -119,6 +847,54 @@ class JIRAHandler:
 
         return results
 
+    def upsert_comments(self, ticket_id: str, comments: Dict[str, str]) -> Dict[str, str]:
+        """
+        Post comments to a ticket, editing the comments posted before with the same marker.
+
+        The existing comments of the ticket are fetched once for all the markers, and
+        each body is posted with its REVIEW_MARKER line appended.
+
+        Args:
+            ticket_id: The JIRA ticket identifier (e.g., 'RBI-1234').
+            comments: The comment bodies by marker (e.g., {'repo#123': <review>}).
+        Returns:
+            Dict[str, str]: The comment ID of each marker.
+
+        Raises:
+            JIRAAPIError: If fetching, adding or editing a comment fails.
+        """
+        try:
+            existing = (self.jira.issue_get_comments(ticket_id) or {}).get("comments", [])
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            raise JIRAAPIError(
+                f"Failed to fetch comments of {ticket_id}: {str(e)}", ticket_id
+            ) from e
+
+        comment_ids = {}
+        for marker, body in comments.items():
+            # The delimited token, so that 'repo#12' does not match 'repo#123'.
+            token = "{{" + REVIEW_MARKER.format(marker=marker) + "}}"
+            comment_id = next(
+                (
+                    str(comment["id"])
+                    for comment in existing
+                    if token in str(comment.get("body", "")) and "id" in comment
+                ),
+                None,
+            )
+            text = f"{body}\n\n----\n{token}"
+            try:
+                if comment_id is None:
+                    comment_id = str(self.jira.issue_add_comment(ticket_id, text)["id"])
+                else:
+                    self.jira.issue_edit_comment(ticket_id, comment_id, text, notify_users=False)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                raise JIRAAPIError(
+                    f"Failed to post comment to {ticket_id}: {str(e)}", ticket_id
+                ) from e
+            comment_ids[marker] = comment_id
+        return comment_ids
+
     def add_comment_to_ticket(self, comment: str) -> bool:
         """
         Add a comment to a JIRA ticket.
@@ -129,9 +905,7 @@ class JIRAHandler:
             bool: True if the comment was added successfully, False otherwise.
 
         """
-        ticket_id = (
-            "RBI-38719"  # Example ticket ID; replace with actual logic as needed
-        )
+        ticket_id = REVIEW_TICKET_ID
 
         try:
             self.jira.issue_add_comment(ticket_id, comment)
@@ -2,13 +2,142 @@
 Handler for keyword-based test case search.
 """
 
+import hashlib
+import re
+import threading
+import time
+from collections import Counter, defaultdict
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
+import numpy as np
 import pandas as pd
-import re
 
 from src.agent_torero.config import get_config
+from src.agent_torero.handlers.keywords_db import TestCasesDB
+
+_WORD_RE = re.compile(r"\w+")
+_ALNUM_RE = re.compile(r"[^\W_]+")
+
+# BM25 parameters and per-column weights used for ranked retrieval.
+BM25_K1 = 1.2
+BM25_B = 0.75
+BM25_FIELD_WEIGHTS = {"Title": 2.0, "Summary": 1.0, "SearchKeywords": 3.0}
+
+
+def _default_paths() -> Tuple[Path, Path]:
+    """
+    Resolve the default test cases CSV and keywords file locations.
+
+    Returns:
+        Tuple[Path, Path]: The test cases CSV path and the all keywords file path.
+    """
+    root_dir = Path(get_config("AGENT_TORERO_ROOT_DIR", "."))
+    return (
+        root_dir / "knowledge" / "test_cases.csv",
+        root_dir / "knowledge" / "all_keywords.txt",
+    )
+
+
+class KeywordResolver:
+    """
+    Resolves free-form terms to canonical keywords using a character trigram index.
+
+    Similarity is the Jaccard index of the trigram sets, in the style of PostgreSQL
+    pg_trgm: every word is padded with two leading blanks and one trailing blank.
+    """
+
+    def __init__(self, keywords: List[str]) -> None:
+        """
+        Build the trigram index.
+
+        Args:
+            keywords (List[str]): The canonical keywords.
+        """
+        self.keywords = list(keywords)
+        self._exact: Dict[str, int] = {}
+        self._sizes: List[int] = []
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for idx, keyword in enumerate(self.keywords):
+            self._exact.setdefault(self._normalize(keyword), idx)
+            trigrams = self._trigrams(keyword)
+            self._sizes.append(len(trigrams))
+            for trigram in trigrams:
+                postings[trigram].append(idx)
+        self._postings = dict(postings)
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """
+        Lower-case the text and collapse punctuation and underscores to single spaces.
+        """
+        return " ".join(_ALNUM_RE.findall(text.lower()))
+
+    @classmethod
+    def _trigrams(cls, text: str) -> Set[str]:
+        """
+        Return the set of padded character trigrams of every word in the text.
+        """
+        trigrams = set()
+        for word in cls._normalize(text).split():
+            padded = f"  {word} "
+            trigrams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+        return trigrams
+
+    def resolve(
+        self, term: str, limit: int = 5, min_similarity: float = 0.3
+    ) -> List[Tuple[str, float]]:
+        """
+        Find the canonical keywords most similar to a term.
+
+        Args:
+            term (str): The term to resolve.
+            limit (int): The maximum number of keywords to return. Defaults to 5.
+            min_similarity (float): The minimum similarity to keep. Defaults to 0.3.
+
+        Returns:
+            List[Tuple[str, float]]: (keyword, similarity) pairs, best first. An exact
+            match (ignoring case and punctuation) always comes first with a score of 1.0.
+        """
+        trigrams = self._trigrams(term)
+        if not trigrams:
+            return []
+
+        shared: Counter = Counter()
+        for trigram in trigrams:
+            shared.update(self._postings.get(trigram, ()))
+
+        scores = {
+            idx: count / (len(trigrams) + self._sizes[idx] - count)
+            for idx, count in shared.items()
+        }
+        exact = self._exact.get(self._normalize(term))
+        if exact is not None:
+            scores[exact] = 1.0
+
+        ranked = sorted(
+            (idx for idx, score in scores.items() if score >= min_similarity),
+            key=lambda idx: (-scores[idx], self.keywords[idx]),
+        )
+        return [(self.keywords[idx], round(scores[idx], 3)) for idx in ranked[:limit]]
+
+
+def db_path_for_csv(csv_path: Path) -> Path:
+    """
+    Return the path of the FTS5 database of a test cases CSV file.
+
+    Each CSV file gets its own database in CACHE_DIR, named after a hash of its
+    resolved path, so that searches over different files don't re-import each
+    other's rows.
+
+    Args:
+        csv_path (Path): Path to the test cases CSV file.
+
+    Returns:
+        Path: The database path.
+    """
+    digest = hashlib.sha256(str(Path(csv_path).resolve()).encode("utf-8")).hexdigest()[:12]
+    return Path(get_config("CACHE_DIR", ".cache")) / f"test_cases_{digest}.sqlite3"
 
 
 # pylint: disable=too-few-public-methods
@@ -17,23 +146,64 @@ class SearchTestCases:
     A class to search test cases based on keywords.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        csv_path: Optional[Path] = None,
+        keywords_path: Optional[Path] = None,
+        backend: Optional[str] = None,
+    ) -> None:
         """
         Initialize the SearchTestCases class by loading the test cases CSV file.
+
+        Args:
+            csv_path (Optional[Path]): Path to the test cases CSV file.
+                Defaults to knowledge/test_cases.csv under the root directory.
+            keywords_path (Optional[Path]): Path to the all keywords file.
+                Defaults to knowledge/all_keywords.txt under the root directory.
+            backend (Optional[str]): "pandas" to hold the test cases in memory or
+                "sqlite" to import them into a local SQLite FTS5 database.
+                Defaults to the TEST_CASES_BACKEND setting.
+
+        Raises:
+            FileNotFoundError: If the test cases CSV file does not exist.
+            ValueError: If the CSV has no 'SearchKeywords' column or the backend is unknown.
         """
-        root_dir = Path(get_config("AGENT_TORERO_ROOT_DIR", "."))
-        csv_path = root_dir / "knowledge" / "test_cases.csv"
-        self.all_keywords_file_path = root_dir / "knowledge" / "all_keywords.txt"
+        default_csv_path, default_keywords_path = _default_paths()
+        csv_path = Path(csv_path) if csv_path else default_csv_path
+        self.all_keywords_file_path = (
+            Path(keywords_path) if keywords_path else default_keywords_path
+        )
         if not csv_path.exists():
             raise FileNotFoundError(
                 f"The test cases CSV file was not found at: {csv_path}"
             )
 
-        self._df = pd.read_csv(csv_path, sep=";", dtype=str)
-        # Ensure 'SearchKeywords' column exists and handle potential NaN values
-        if "SearchKeywords" not in self._df.columns:
-            raise ValueError("CSV file must contain a 'SearchKeywords' column.")
-        self._df["SearchKeywords"] = self._df["SearchKeywords"].fillna("").astype(str)
+        self.backend = backend or get_config("TEST_CASES_BACKEND", "pandas")
+        self._db: Optional[TestCasesDB] = None
+        if self.backend == "sqlite":
+            self._db = TestCasesDB(db_path_for_csv(csv_path), csv_path)
+            self._db.sync()
+        elif self.backend == "pandas":
+            self._df = pd.read_csv(csv_path, sep=";", dtype=str)
+            # Ensure 'SearchKeywords' column exists and handle potential NaN values
+            if "SearchKeywords" not in self._df.columns:
+                raise ValueError("CSV file must contain a 'SearchKeywords' column.")
+            self._df["SearchKeywords"] = self._df["SearchKeywords"].fillna("").astype(str)
+            self._search_keywords: List[str] = self._df["SearchKeywords"].tolist()
+            self._postings = self._build_postings(self._search_keywords)
+            self._build_bm25()
+        else:
+            raise ValueError(
+                f"Unsupported test cases backend '{self.backend}', use 'pandas' or 'sqlite'."
+            )
+
+        with open(self.all_keywords_file_path, "r", encoding="utf-8") as f:
+            contents = f.read()
+        # One keyword per line; commas are accepted as separators too.
+        self._all_keywords = sorted(
+            {kw.strip() for kw in re.split(r"[,\n]", contents) if kw.strip()}
+        )
+        self._resolver = KeywordResolver(self._all_keywords)
         print("Test Case Search Tool initialized successfully.")
 
     def get_all_keywords(self) -> List[str]:
@@ -43,32 +213,367 @@ class SearchTestCases:
         Returns:
             List[str]: A sorted list of unique keywords.
         """
-        with open(self.all_keywords_file_path, "r", encoding="utf-8") as f:
-            contents = f.read()
-        return [kw.strip() for kw in contents.split(",") if kw.strip()]
+        return list(self._all_keywords)
+
+    def get_test_case_keywords(self) -> List[str]:
+        """
+        Returns the distinct comma separated keyword phrases used in 'SearchKeywords'.
+
+        Returns:
+            List[str]: A sorted list of unique keyword phrases found in the test cases.
+        """
+        if self._db is not None:
+            texts: Iterable[str] = self._db.search_keywords()
+        else:
+            texts = self._search_keywords
+        return sorted({kw.strip() for text in texts for kw in text.split(",") if kw.strip()})
 
-    def filter_by_keywords(self, keywords: List[str]) -> List[dict]:
+    def resolve_keywords(
+        self, terms: List[str], limit: int = 5, min_similarity: float = 0.3
+    ) -> Dict[str, List[Tuple[str, float]]]:
         """
-        Filters the test cases to find matching cases with any of the provided keywords.
+        Map free-form terms to the closest canonical keywords.
+
+        Args:
+            terms (List[str]): Terms proposed by the agent, e.g. '3rd party auth'.
+            limit (int): The maximum number of keywords per term. Defaults to 5.
+            min_similarity (float): The minimum trigram similarity to keep. Defaults to 0.3.
+
+        Returns:
+            Dict[str, List[Tuple[str, float]]]: For every term, the matching keywords and
+            their similarity scores, best first.
+        """
+        return {
+            term: self._resolver.resolve(term, limit=limit, min_similarity=min_similarity)
+            for term in terms
+        }
+
+    @staticmethod
+    def _build_postings(texts: Iterable[str]) -> Dict[str, Set[int]]:
+        """
+        Build the inverted index mapping each lower-cased word token to row positions.
+
+        Args:
+            texts (Iterable[str]): The 'SearchKeywords' value of every row, in row order.
+
+        Returns:
+            Dict[str, Set[int]]: Posting sets keyed by word token.
+        """
+        postings: Dict[str, Set[int]] = defaultdict(set)
+        for row, text in enumerate(texts):
+            for token in _WORD_RE.findall(text.lower()):
+                postings[token].add(row)
+        return dict(postings)
+
+    def _build_bm25(self) -> None:
+        """
+        Precompute BM25 contributions of every (term, row) pair.
+
+        Field term frequencies are combined with BM25_FIELD_WEIGHTS into one weighted
+        frequency per row. The contributions are stored sorted by term, in CSR
+        layout, so a query only slices and sums arrays.
+        """
+        n_rows = len(self._df)
+        columns = {
+            field: (
+                self._df[field].fillna("").astype(str).tolist()
+                if field in self._df.columns
+                else [""] * n_rows
+            )
+            for field in BM25_FIELD_WEIGHTS
+        }
+
+        vocabulary: Dict[str, int] = {}
+        term_ids: List[int] = []
+        rows: List[int] = []
+        frequencies: List[float] = []
+        lengths = np.zeros(n_rows, dtype=np.float32)
+
+        for row in range(n_rows):
+            weighted: Counter = Counter()
+            for field, weight in BM25_FIELD_WEIGHTS.items():
+                for token in _WORD_RE.findall(columns[field][row].lower()):
+                    weighted[token] += weight
+            lengths[row] = sum(weighted.values())
+            for token, frequency in weighted.items():
+                term_ids.append(vocabulary.setdefault(token, len(vocabulary)))
+                rows.append(row)
+                frequencies.append(frequency)
+
+        term_array = np.asarray(term_ids, dtype=np.int64)
+        row_array = np.asarray(rows, dtype=np.int32)
+        tf = np.asarray(frequencies, dtype=np.float32)
+
+        document_frequency = np.bincount(term_array, minlength=len(vocabulary))
+        idf = np.log1p((n_rows - document_frequency + 0.5) / (document_frequency + 0.5))
+        average_length = float(lengths.mean()) if n_rows and lengths.any() else 1.0
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[row_array] / average_length)
+        contributions = idf[term_array] * tf * (BM25_K1 + 1) / (tf + norm)
+
+        order = np.argsort(term_array, kind="stable")
+        self._bm25_vocabulary = vocabulary
+        self._bm25_rows = row_array[order]
+        self._bm25_weights = contributions[order].astype(np.float32)
+        self._bm25_indptr = np.concatenate(([0], np.cumsum(document_frequency)))
+
+    def _match_keyword(self, keyword: str) -> Set[int]:
+        """
+        Find the rows whose 'SearchKeywords' contain the keyword as a whole word or phrase.
+
+        Every word token of a whole-word match is also a token of the row, so the
+        intersection of the token postings is a superset of the matching rows.
+        Candidates are then confirmed with the same case-insensitive \\b...\\b
+        pattern the regex scan used, which keeps the results identical to it.
+
+        Args:
+            keyword (str): The keyword or phrase to look up.
+
+        Returns:
+            Set[int]: Positions of the matching rows.
+        """
+        if self._db is not None:
+            return self._db.match_keyword(keyword)
+
+        keyword = keyword.strip()
+        tokens = _WORD_RE.findall(keyword.lower())
+
+        # A plain ASCII word needs no confirmation: the posting is the exact answer.
+        if keyword.isascii() and len(tokens) == 1 and tokens[0] == keyword.lower():
+            return set(self._postings.get(tokens[0], ()))
+
+        if tokens:
+            postings = sorted(
+                (self._postings.get(token, set()) for token in set(tokens)), key=len
+            )
+            candidates: Iterable[int] = set.intersection(*postings)
+        else:
+            candidates = range(len(self._search_keywords))
+
+        pattern = re.compile(r"\b" + re.escape(keyword) + r"\b", re.IGNORECASE)
+        return {row for row in candidates if pattern.search(self._search_keywords[row])}
+
+    def keyword_hit_counts(self, keywords: List[str]) -> Dict[str, int]:
+        """
+        Count how many test cases match each of the provided keywords.
+
+        Args:
+            keywords (List[str]): A list of keywords to count matches for.
+
+        Returns:
+            Dict[str, int]: The number of matching test cases per keyword.
+        """
+        return {keyword: len(self._match_keyword(keyword)) for keyword in keywords}
+
+    def filter_by_keywords(self, keywords: List[str], match: str = "any") -> List[dict]:
+        """
+        Filters the test cases to find matching cases with the provided keywords.
+
+        Keywords are matched as whole words or phrases, case-insensitively.
 
         Args:
             keywords (List[str]): A list of keywords to search for.
+            match (str): "any" to return cases matching at least one keyword (OR),
+                "all" to return cases matching every keyword (AND). Defaults to "any".
 
         Returns:
             List[dict]: A list of dictionaries representing the matching test cases.
             If no keywords are provided, returns an empty list.
             If no matches are found, returns an empty list.
 
+        Raises:
+            ValueError: If match is not "any" or "all".
         """
+        if match not in ("any", "all"):
+            raise ValueError(f"Unsupported match mode '{match}', use 'any' or 'all'.")
         if not keywords:
             return []
 
-        # Use re.escape to handle special characters in keywords and \b for whole-word matching.
-        pattern = "|".join([r"\b" + re.escape(k.strip()) + r"\b" for k in keywords])
+        matches = [self._match_keyword(keyword) for keyword in keywords]
+        if match == "all":
+            rows = set.intersection(*matches)
+        else:
+            rows = set.union(*matches)
+
+        if self._db is not None:
+            return self._db.fetch_rows(sorted(rows))
+        filtered_df = self._df.iloc[sorted(rows)]
+        return filtered_df.to_dict(orient="records")
+
+    def rank_by_keywords(
+        self, keywords: List[str], top_k: int = 10, min_score: float = 0.0
+    ) -> List[dict]:
+        """
+        Rank test cases by BM25 relevance over the Title, Summary and SearchKeywords columns.
+
+        Args:
+            keywords (List[str]): A list of keywords or phrases describing the change.
+            top_k (int): The maximum number of test cases to return. Defaults to 10.
+            min_score (float): Drop test cases scoring at or below this value. Defaults to 0.0.
+
+        Returns:
+            List[dict]: The best matching test cases, highest score first, each with an
+            added 'Score' key. Returns an empty list if nothing matches.
+        """
+        tokens = list(dict.fromkeys(_WORD_RE.findall(" ".join(keywords or []).lower())))
+        if not tokens or top_k <= 0:
+            return []
+
+        if self._db is not None:
+            return self._db.rank(tokens, top_k, min_score, BM25_FIELD_WEIGHTS)
 
-        mask = self._df["SearchKeywords"].str.contains(
-            pattern, case=False, na=False, regex=True
+        term_ids = [self._bm25_vocabulary[t] for t in tokens if t in self._bm25_vocabulary]
+        if not term_ids:
+            return []
+        slices = [
+            np.arange(self._bm25_indptr[term], self._bm25_indptr[term + 1])
+            for term in term_ids
+        ]
+        entries = np.concatenate(slices)
+        scores = np.bincount(
+            self._bm25_rows[entries],
+            weights=self._bm25_weights[entries],
+            minlength=len(self._df),
         )
-        filtered_df = self._df[mask]
 
-        return filtered_df.to_dict(orient="records")
+        candidates = np.flatnonzero(scores > max(min_score, 0.0))
+        if len(candidates) > top_k:
+            best = np.argpartition(-scores[candidates], top_k - 1)[:top_k]
+            candidates = candidates[best]
+        # Highest score first, ties broken by CSV order.
+        candidates = candidates[np.lexsort((candidates, -scores[candidates]))]
+
+        results = self._df.iloc[candidates].to_dict(orient="records")
+        for record, row in zip(results, candidates):
+            record["Score"] = round(float(scores[row]), 4)
+        return results
+
+
+class TestCaseIndex:
+    """
+    Thread-safe, process-wide holder of a loaded SearchTestCases instance.
+
+    The test cases CSV and keywords file are parsed once and reused by every
+    caller. The data is reloaded only when either file changes on disk
+    (modification time or size), so repeated tool calls don't pay the parse cost.
+    """
+
+    __test__ = False  # Not a pytest test class despite the name.
+
+    def __init__(
+        self,
+        csv_path: Optional[Path] = None,
+        keywords_path: Optional[Path] = None,
+        backend: Optional[str] = None,
+    ) -> None:
+        """
+        Initialize the index without loading any data.
+
+        Args:
+            csv_path (Optional[Path]): Path to the test cases CSV file.
+            keywords_path (Optional[Path]): Path to the all keywords file.
+            backend (Optional[str]): The SearchTestCases storage backend to use.
+        """
+        default_csv_path, default_keywords_path = _default_paths()
+        self.csv_path = Path(csv_path) if csv_path else default_csv_path
+        self.keywords_path = Path(keywords_path) if keywords_path else default_keywords_path
+        self.backend = backend
+
+        self._lock = threading.Lock()
+        self._search: Optional[SearchTestCases] = None
+        self._signature: Optional[tuple] = None
+        self._hits = 0
+        self._misses = 0
+        self._loads = 0
+        self._last_load_seconds = 0.0
+        self._total_load_seconds = 0.0
+        self._loaded_at: Optional[float] = None
+
+    def _file_signature(self) -> tuple:
+        """
+        Build a cheap change signature of the source files.
+
+        Returns:
+            tuple: (mtime_ns, size) for each source file, or None for missing files.
+        """
+        signature = []
+        for path in (self.csv_path, self.keywords_path):
+            try:
+                stat = path.stat()
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def get(self) -> SearchTestCases:
+        """
+        Return the loaded SearchTestCases, (re)loading it if the files changed.
+
+        Returns:
+            SearchTestCases: The shared search instance.
+
+        Raises:
+            FileNotFoundError: If the test cases CSV file does not exist.
+            ValueError: If the CSV file has no 'SearchKeywords' column.
+        """
+        with self._lock:
+            signature = self._file_signature()
+            if self._search is not None and signature == self._signature:
+                self._hits += 1
+                return self._search
+
+            self._misses += 1
+            start = time.perf_counter()
+            search = SearchTestCases(self.csv_path, self.keywords_path, self.backend)
+            elapsed = time.perf_counter() - start
+
+            self._search = search
+            self._signature = signature
+            self._loads += 1
+            self._last_load_seconds = elapsed
+            self._total_load_seconds += elapsed
+            self._loaded_at = time.time()
+            return search
+
+    def invalidate(self) -> None:
+        """
+        Drop the loaded data so the next call to get() reloads it.
+        """
+        with self._lock:
+            self._search = None
+            self._signature = None
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Return load and cache statistics for the index.
+
+        Returns:
+            Dict[str, float]: Number of loads, hits and misses, and load timings in seconds.
+        """
+        with self._lock:
+            return {
+                "loads": self._loads,
+                "hits": self._hits,
+                "misses": self._misses,
+                "last_load_seconds": self._last_load_seconds,
+                "total_load_seconds": self._total_load_seconds,
+                "loaded_at": self._loaded_at,
+            }
+
+
+_shared_index: Optional[TestCaseIndex] = None
+_shared_index_lock = threading.Lock()
+
+
+def get_test_case_index() -> TestCaseIndex:
+    """
+    Return the process-wide TestCaseIndex, creating it on first use.
+
+    Returns:
+        TestCaseIndex: The shared test case index.
+    """
+    global _shared_index  # pylint: disable=global-statement
+    if _shared_index is None:
+        with _shared_index_lock:
+            if _shared_index is None:
+                _shared_index = TestCaseIndex()
+    return _shared_index
@@ -0,0 +1,375 @@
+"""
+SQLite FTS5 storage backend for test cases.
+
+This module imports the test cases CSV into a local SQLite database with an FTS5
+index so that keyword lookups don't require holding the whole CSV in memory.
+Later loads re-import only the rows whose content hash changed.
+"""
+
+import csv
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+_WORD_RE = re.compile(r"\w+")
+
+# SQLite limits the number of bound parameters per statement.
+_MAX_PARAMS = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS test_cases (
+    id INTEGER PRIMARY KEY,
+    row_key TEXT UNIQUE NOT NULL,
+    position INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    data TEXT NOT NULL,
+    search_keywords TEXT NOT NULL,
+    title_tokens TEXT NOT NULL,
+    summary_tokens TEXT NOT NULL,
+    keyword_tokens TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS test_cases_position ON test_cases(position);
+CREATE VIRTUAL TABLE IF NOT EXISTS test_cases_fts USING fts5(
+    title_tokens,
+    summary_tokens,
+    keyword_tokens,
+    content='test_cases',
+    content_rowid='id',
+    tokenize="unicode61 remove_diacritics 0 tokenchars '_'"
+);
+CREATE TRIGGER IF NOT EXISTS test_cases_ai AFTER INSERT ON test_cases BEGIN
+    INSERT INTO test_cases_fts(rowid, title_tokens, summary_tokens, keyword_tokens)
+    VALUES (new.id, new.title_tokens, new.summary_tokens, new.keyword_tokens);
+END;
+CREATE TRIGGER IF NOT EXISTS test_cases_ad AFTER DELETE ON test_cases BEGIN
+    INSERT INTO test_cases_fts(test_cases_fts, rowid, title_tokens, summary_tokens, keyword_tokens)
+    VALUES ('delete', old.id, old.title_tokens, old.summary_tokens, old.keyword_tokens);
+END;
+CREATE TRIGGER IF NOT EXISTS test_cases_au
+AFTER UPDATE OF title_tokens, summary_tokens, keyword_tokens ON test_cases BEGIN
+    INSERT INTO test_cases_fts(test_cases_fts, rowid, title_tokens, summary_tokens, keyword_tokens)
+    VALUES ('delete', old.id, old.title_tokens, old.summary_tokens, old.keyword_tokens);
+    INSERT INTO test_cases_fts(rowid, title_tokens, summary_tokens, keyword_tokens)
+    VALUES (new.id, new.title_tokens, new.summary_tokens, new.keyword_tokens);
+END;
+"""
+
+
+def _tokens(text: str) -> str:
+    """
+    Normalize text to the space separated, lower-cased word tokens stored in FTS.
+
+    Tokenizing in Python keeps FTS tokens identical to the regex \\w+ word
+    boundaries used by the in-memory backend.
+
+    Args:
+        text (str): The text to normalize.
+
+    Returns:
+        str: The normalized token stream.
+    """
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+def _chunks(values: List[int]) -> Iterable[List[int]]:
+    """
+    Split a list of values into chunks that fit into one SQL statement.
+    """
+    for start in range(0, len(values), _MAX_PARAMS):
+        yield values[start : start + _MAX_PARAMS]
+
+
+class TestCasesDBError(Exception):
+    """Custom exception for test cases database errors."""
+
+
+class TestCasesDB:
+    """
+    Test cases stored in SQLite with an FTS5 index over Title, Summary and SearchKeywords.
+
+    Rows are identified by their position in the CSV, the same identifier the
+    in-memory backend uses, so both backends return results in CSV order.
+    """
+
+    __test__ = False  # Not a pytest test class despite the name.
+
+    def __init__(self, db_path: Path, csv_path: Path) -> None:
+        """
+        Open (or create) the database.
+
+        Args:
+            db_path (Path): Path of the SQLite database file.
+            csv_path (Path): Path of the test cases CSV file to import.
+
+        Raises:
+            TestCasesDBError: If SQLite lacks FTS5 support or the database cannot be opened.
+        """
+        self.db_path = Path(db_path)
+        self.csv_path = Path(csv_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        try:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+        except sqlite3.Error as e:
+            raise TestCasesDBError(
+                f"Failed to open test cases database at {self.db_path}: {e}"
+            ) from e
+        self.columns: List[str] = json.loads(self._get_meta("columns") or "[]")
+        self.last_sync: Dict[str, int] = {}
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self._conn.execute(
+            "INSERT INTO meta(key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value),
+        )
+
+    def _csv_signature(self) -> str:
+        stat = self.csv_path.stat()
+        return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+    def sync(self) -> Dict[str, int]:
+        """
+        Import the CSV, re-indexing only rows whose content changed.
+
+        The sync is skipped entirely when the CSV modification time and size are
+        unchanged since the last import.
+
+        Returns:
+            Dict[str, int]: Counts of inserted, updated, moved, deleted and unchanged rows.
+
+        Raises:
+            FileNotFoundError: If the CSV file does not exist.
+            ValueError: If the CSV file has no 'SearchKeywords' column.
+        """
+        if not self.csv_path.exists():
+            raise FileNotFoundError(
+                f"The test cases CSV file was not found at: {self.csv_path}"
+            )
+        signature = self._csv_signature()
+        stats = {"inserted": 0, "updated": 0, "moved": 0, "deleted": 0, "unchanged": 0}
+
+        with self._lock:
+            if signature == self._get_meta("csv_signature"):
+                stats["unchanged"] = self.count()
+                self.last_sync = stats
+                return stats
+
+            existing = {
+                row_key: (row_id, content_hash, position)
+                for row_key, row_id, content_hash, position in self._conn.execute(
+                    "SELECT row_key, id, content_hash, position FROM test_cases"
+                )
+            }
+            seen: Set[str] = set()
+
+            with self._conn, open(self.csv_path, "r", encoding="utf-8", newline="") as f:
+                reader = csv.DictReader(f, delimiter=";")
+                columns = list(reader.fieldnames or [])
+                if "SearchKeywords" not in columns:
+                    raise ValueError("CSV file must contain a 'SearchKeywords' column.")
+
+                for position, row in enumerate(reader):
+                    values = [row.get(column) or None for column in columns]
+                    row_key = row.get("ID") or f"#{position}"
+                    if row_key in seen:
+                        row_key = f"{row_key}#{position}"
+                    seen.add(row_key)
+
+                    data = json.dumps(values, ensure_ascii=False)
+                    content_hash = hashlib.sha1(data.encode("utf-8")).hexdigest()
+                    current = existing.get(row_key)
+
+                    if current is None:
+                        self._conn.execute(
+                            "INSERT INTO test_cases(row_key, position, content_hash, data, "
+                            "search_keywords, title_tokens, summary_tokens, keyword_tokens) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            (row_key, position, content_hash, data, *self._fields(row)),
+                        )
+                        stats["inserted"] += 1
+                    elif current[1] != content_hash:
+                        self._conn.execute(
+                            "UPDATE test_cases SET position = ?, content_hash = ?, data = ?, "
+                            "search_keywords = ?, title_tokens = ?, summary_tokens = ?, "
+                            "keyword_tokens = ? WHERE id = ?",
+                            (position, content_hash, data, *self._fields(row), current[0]),
+                        )
+                        stats["updated"] += 1
+                    elif current[2] != position:
+                        self._conn.execute(
+                            "UPDATE test_cases SET position = ? WHERE id = ?",
+                            (position, current[0]),
+                        )
+                        stats["moved"] += 1
+                    else:
+                        stats["unchanged"] += 1
+
+                removed = [existing[key][0] for key in existing.keys() - seen]
+                for chunk in _chunks(removed):
+                    self._conn.execute(
+                        f"DELETE FROM test_cases WHERE id IN ({','.join('?' * len(chunk))})",
+                        chunk,
+                    )
+                stats["deleted"] = len(removed)
+
+                self.columns = columns
+                self._set_meta("columns", json.dumps(columns))
+                self._set_meta("csv_signature", signature)
+
+        self.last_sync = stats
+        return stats
+
+    @staticmethod
+    def _fields(row: Dict[str, Optional[str]]) -> tuple:
+        """
+        Build the raw keywords and normalized FTS column values of a CSV row.
+        """
+        search_keywords = row.get("SearchKeywords") or ""
+        return (
+            search_keywords,
+            _tokens(row.get("Title") or ""),
+            _tokens(row.get("Summary") or ""),
+            _tokens(search_keywords),
+        )
+
+    def count(self) -> int:
+        """
+        Return the number of stored test cases.
+        """
+        return self._conn.execute("SELECT COUNT(*) FROM test_cases").fetchone()[0]
+
+    def search_keywords(self) -> List[str]:
+        """
+        Return the raw 'SearchKeywords' value of every stored test case.
+        """
+        with self._lock:
+            return [
+                text
+                for (text,) in self._conn.execute("SELECT search_keywords FROM test_cases")
+            ]
+
+    def match_keyword(self, keyword: str) -> Set[int]:
+        """
+        Find the positions of rows whose 'SearchKeywords' contain the keyword.
+
+        The FTS phrase query returns a superset of the whole-word matches; rows are
+        then confirmed with the case-insensitive \\b...\\b pattern unless the
+        keyword is a single plain ASCII word, for which the FTS match is exact.
+
+        Args:
+            keyword (str): The keyword or phrase to look up.
+
+        Returns:
+            Set[int]: Positions of the matching rows.
+        """
+        keyword = keyword.strip()
+        tokens = _WORD_RE.findall(keyword.lower())
+
+        with self._lock:
+            if tokens:
+                rows = self._conn.execute(
+                    "SELECT position, search_keywords FROM test_cases WHERE id IN "
+                    "(SELECT rowid FROM test_cases_fts WHERE test_cases_fts MATCH ?)",
+                    (f'keyword_tokens : "{" ".join(tokens)}"',),
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT position, search_keywords FROM test_cases"
+                ).fetchall()
+
+        if keyword.isascii() and len(tokens) == 1 and tokens[0] == keyword.lower():
+            return {position for position, _ in rows}
+
+        pattern = re.compile(r"\b" + re.escape(keyword) + r"\b", re.IGNORECASE)
+        return {position for position, text in rows if pattern.search(text)}
+
+    def rank(
+        self,
+        tokens: List[str],
+        top_k: int,
+        min_score: float,
+        field_weights: Dict[str, float],
+    ) -> List[dict]:
+        """
+        Rank test cases with the FTS5 bm25() function.
+
+        Args:
+            tokens (List[str]): Normalized query tokens, any of which may match.
+            top_k (int): The maximum number of test cases to return.
+            min_score (float): Drop test cases scoring at or below this value.
+            field_weights (Dict[str, float]): Weights of the Title, Summary and
+                SearchKeywords columns.
+
+        Returns:
+            List[dict]: The best matching test cases, highest score first, each with
+            an added 'Score' key.
+        """
+        weights = (
+            field_weights.get("Title", 1.0),
+            field_weights.get("Summary", 1.0),
+            field_weights.get("SearchKeywords", 1.0),
+        )
+        query = " OR ".join(f'"{token}"' for token in tokens)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT test_cases.data, -bm25(test_cases_fts, ?, ?, ?) AS score "
+                "FROM test_cases_fts JOIN test_cases ON test_cases.id = test_cases_fts.rowid "
+                "WHERE test_cases_fts MATCH ? AND -bm25(test_cases_fts, ?, ?, ?) > ? "
+                "ORDER BY score DESC, test_cases.position LIMIT ?",
+                (*weights, query, *weights, max(min_score, 0.0), top_k),
+            ).fetchall()
+
+        results = []
+        for data, score in rows:
+            record = self._to_record(data)
+            record["Score"] = round(float(score), 4)
+            results.append(record)
+        return results
+
+    def fetch_rows(self, positions: List[int]) -> List[dict]:
+        """
+        Return the test cases at the given positions, in CSV order.
+
+        Args:
+            positions (List[int]): Row positions to fetch.
+
+        Returns:
+            List[dict]: One dictionary per test case keyed by CSV column.
+        """
+        results = []
+        with self._lock:
+            for chunk in _chunks(sorted(positions)):
+                results.extend(
+                    self._conn.execute(
+                        f"SELECT data FROM test_cases WHERE position IN "
+                        f"({','.join('?' * len(chunk))}) ORDER BY position",
+                        chunk,
+                    ).fetchall()
+                )
+        return [self._to_record(data) for (data,) in results]
+
+    def _to_record(self, data: str) -> dict:
+        record = dict(zip(self.columns, json.loads(data)))
+        record["SearchKeywords"] = record.get("SearchKeywords") or ""
+        return record
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._conn.close()
@@ -2,14 +2,268 @@
 This module sets up the Gemini LLM using the crewai library.
 """
 
-from typing import Any
+import hashlib
+import json
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
 
 from crewai import LLM
 
-from src.agent_torero.config import get_config
+from src.agent_torero.cache import DiskLRUCache
+from src.agent_torero.config import (get_bool_config, get_config,
+                                     get_float_config, get_int_config)
+from src.agent_torero.ratelimit import get_scheduler
 
 gemini_api_key = get_config("GEMINI_API_KEY")
 
+# Retry delay suggested in Gemini errors, e.g. '"retryDelay": "27s"' or 'retry in 27.5s'.
+_RETRY_DELAY_RE = re.compile(r"retry(?:_?delay| in)\W+(\d+(?:\.\d+)?)s", re.IGNORECASE)
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    """
+    Tell whether an LLM call failed because of a rate limit (HTTP 429).
+    """
+    if getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError":
+        return True
+    message = str(error)
+    return "429" in message or "RESOURCE_EXHAUSTED" in message
+
+
+class RateLimitedLLM(LLM):
+    """
+    LLM whose calls go through the shared rate limit scheduler.
+
+    Calls wait for a token of the 'gemini' bucket. A rate limited call slows the
+    bucket down for every caller, honours the retry delay suggested by the API and
+    is retried up to GEMINI_RATE_LIMIT_RETRIES times.
+    """
+
+    def call(self, *args: Any, **kwargs: Any) -> Any:
+        """
+        Call the LLM through the 'gemini' bucket, retrying rate limited calls.
+        """
+        bucket = get_scheduler().bucket("gemini")
+        retries = get_int_config("GEMINI_RATE_LIMIT_RETRIES", 4)
+        attempt = 0
+        while True:
+            bucket.acquire()
+            try:
+                result = super().call(*args, **kwargs)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                if not _is_rate_limit_error(e) or attempt >= retries:
+                    raise
+                delay = _RETRY_DELAY_RE.search(str(e))
+                bucket.update(
+                    retry_after=float(delay.group(1)) if delay else 2.0**attempt,
+                    throttled=True,
+                )
+                attempt += 1
+                continue
+            bucket.update()
+            return result
+
+
+# LLM attributes that change the response to a prompt.
+CACHE_KEY_PARAMS = (
+    "model",
+    "temperature",
+    "top_p",
+    "n",
+    "stop",
+    "max_tokens",
+    "max_completion_tokens",
+    "presence_penalty",
+    "frequency_penalty",
+    "seed",
+    "response_format",
+    "reasoning_effort",
+)
+
+
+class LLMResponseCache:
+    """
+    Content-addressed cache of LLM responses.
+
+    Responses are stored on disk under a hash of the model, its parameters, the
+    messages and the tool schemas, with the latency of the call that produced them.
+    """
+
+    def __init__(self, store: DiskLRUCache):
+        """
+        Initialize the cache.
+
+        Args:
+            store (DiskLRUCache): The persistent store holding the responses.
+        """
+        self.store = store
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.seconds_saved = 0.0
+
+    @staticmethod
+    def cache_key(llm: LLM, messages: Any, tools: Optional[list] = None) -> str:
+        """
+        Build the cache key of a call.
+
+        Args:
+            llm (LLM): The called LLM.
+            messages (Any): The prompt string or messages.
+            tools (Optional[list]): The tool schemas of the call.
+
+        Returns:
+            str: The hex digest identifying the call.
+        """
+        payload = {
+            "params": {name: getattr(llm, name, None) for name in CACHE_KEY_PARAMS},
+            "messages": messages,
+            "tools": tools,
+        }
+        serialized = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Return a cached response.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[str]: The response, or None if it is not cached or expired.
+        """
+        entry = self.store.get(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.seconds_saved += entry[1].get("seconds", 0.0)
+        return entry[0].decode("utf-8")
+
+    def set(self, key: str, response: str, seconds: float) -> None:
+        """
+        Store a response.
+
+        Args:
+            key (str): The cache key.
+            response (str): The response text.
+            seconds (float): The latency of the call that produced it.
+        """
+        self.store.set(key, response.encode("utf-8"), {"seconds": round(seconds, 3)})
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Return the hit, miss and latency-saved counters with the store statistics.
+
+        Returns:
+            Dict[str, float]: 'hits', 'misses', 'seconds_saved' (the latency of the
+            calls answered from the cache), and the store 'entries', 'bytes' and
+            'evictions'.
+        """
+        with self._lock:
+            counters = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "seconds_saved": round(self.seconds_saved, 3),
+            }
+        store_stats = self.store.stats()
+        counters.update(
+            {
+                "entries": store_stats["entries"],
+                "bytes": store_stats["bytes"],
+                "evictions": store_stats["evictions"],
+            }
+        )
+        return counters
+
+
+_llm_cache: Optional[LLMResponseCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """
+    Return the process-wide LLM response cache, creating it on first use.
+
+    Returns:
+        Optional[LLMResponseCache]: The shared cache, or None unless LLM_CACHE is on.
+    """
+    global _llm_cache  # pylint: disable=global-statement
+    if not get_bool_config("LLM_CACHE", False):
+        return None
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            store = DiskLRUCache(
+                Path(get_config("CACHE_DIR", ".cache")) / "llm_responses.sqlite3",
+                max_bytes=get_int_config("LLM_CACHE_MAX_BYTES", 200 * 1024 * 1024),
+                ttl_seconds=get_float_config("LLM_CACHE_TTL_SECONDS", 7 * 24 * 60 * 60),
+            )
+            _llm_cache = LLMResponseCache(store)
+        return _llm_cache
+
+
+class CachedLLM(RateLimitedLLM):
+    """
+    Rate limited LLM answering repeated prompts from the LLM response cache.
+
+    With the LLM_CACHE setting on, a call with the same model, parameters,
+    messages and tool schemas as an earlier one returns the earlier text response
+    without calling the API. Calls that execute tools (available_functions) are
+    never cached.
+    """
+
+    # pylint: disable=arguments-differ
+    def call(
+        self,
+        messages: Any,
+        tools: Optional[list] = None,
+        callbacks: Optional[list] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+        from_task: Optional[Any] = None,
+        from_agent: Optional[Any] = None,
+        use_cache: bool = True,
+    ) -> Any:
+        """
+        Call the LLM, or return the cached response to the same call.
+
+        Args:
+            messages (Any): The prompt string or messages.
+            tools (Optional[list]): The tool schemas.
+            callbacks (Optional[list]): The LLM callbacks.
+            available_functions (Optional[Dict[str, Any]]): Functions the LLM may call.
+            from_task (Optional[Any]): The calling task.
+            from_agent (Optional[Any]): The calling agent.
+            use_cache (bool): Set to False to bypass the cache for this call.
+                Defaults to True.
+
+        Returns:
+            Any: The LLM response.
+        """
+        cache = get_llm_cache() if use_cache and not available_functions else None
+        key = LLMResponseCache.cache_key(self, messages, tools) if cache is not None else ""
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+        started = time.perf_counter()
+        result = super().call(
+            messages,
+            tools=tools,
+            callbacks=callbacks,
+            available_functions=available_functions,
+            from_task=from_task,
+            from_agent=from_agent,
+        )
+        if cache is not None and isinstance(result, str) and result:
+            cache.set(key, result, time.perf_counter() - started)
+        return result
+
 
 # pylint: disable=too-few-public-methods
 class GeminiProLLM:
@@ -27,13 +281,13 @@ class GeminiProLLM:
         if cls.gemini_pro_llm is None:
             if not gemini_api_key:
                 raise ValueError("GEMINI_API_KEY environment variable is not set.")
-            cls.gemini_pro_llm = LLM(
+            cls.gemini_pro_llm = CachedLLM(
                 model="gemini/gemini-2.5-pro",
                 api_key=gemini_api_key,
                 reasoning_effort="high",
                 temperature=0.0,  # Lower temperature for more consistent results.
-                # stream=True,
-                max_retries=6,
+                stream=get_bool_config("LLM_STREAM", True),
+                max_retries=2,  # Rate limits are retried by RateLimitedLLM
             )
         return cls.gemini_pro_llm
 
@@ -53,12 +307,12 @@ class GeminiFlashLLM:
         if cls.gemini_flash_llm is None:
             if not gemini_api_key:
                 raise ValueError("GEMINI_API_KEY environment variable is not set.")
-            cls.gemini_flash_llm = LLM(
+            cls.gemini_flash_llm = CachedLLM(
                 model="gemini/gemini-2.5-flash",
                 api_key=gemini_api_key,
                 reasoning_effort="medium",
                 temperature=0.0,  # Lower temperature for more consistent results.
-                # stream=True,
-                max_retries=6,
+                stream=get_bool_config("LLM_STREAM", True),
+                max_retries=2,  # Rate limits are retried by RateLimitedLLM
             )
         return cls.gemini_flash_llm
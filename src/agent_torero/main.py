@@ -3,6 +3,7 @@ import sys
 import warnings
 from datetime import datetime
 
+from agent_torero import batch
 from agent_torero.crew import AgentTorero
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
@@ -25,6 +26,19 @@ def run():
         raise RuntimeError(f"An error occurred while running the crew: {e}") from e
 
 
+def run_batch():
+    """
+    Review many pull requests in one process.
+
+    Arguments are 'repo#123' for a single pull request or 'repo' for all of its
+    open pull requests, e.g. `run_batch rbi-provider-linux#7758 other-repo`.
+    """
+    try:
+        batch.main(sys.argv[1:])
+    except Exception as e:
+        raise RuntimeError(f"An error occurred while running the batch: {e}") from e
+
+
 def train():
     """
     Train the crew for a given number of iterations.
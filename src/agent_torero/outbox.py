@@ -0,0 +1,289 @@
+"""
+Persistent outbox of Jira comments.
+
+This module queues the review comments in a local SQLite database and posts
+them from a background thread, so that the crew does not wait for Jira. Each
+comment is identified by its ticket and a marker, so that a re-run edits the
+comment it posted before instead of adding a duplicate, and failed posts are
+retried with exponential backoff, also by later runs.
+"""
+
+import atexit
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.agent_torero.config import get_config, get_float_config, get_int_config
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS comments (
+    ticket_id TEXT NOT NULL,
+    marker TEXT NOT NULL,
+    body TEXT NOT NULL,
+    body_hash TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    comment_id TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (ticket_id, marker)
+);
+CREATE INDEX IF NOT EXISTS comments_pending ON comments(status, next_attempt_at);
+"""
+
+# Longest pause between two attempts to post a comment.
+MAX_BACKOFF_SECONDS = 600.0
+
+
+def _default_poster(ticket_id: str, comments: Dict[str, str]) -> Dict[str, str]:
+    """Post comments with a JIRAHandler; see JIRAHandler.upsert_comments()."""
+    # pylint: disable=import-outside-toplevel
+    from src.agent_torero.handlers.jira import JIRAHandler
+
+    return JIRAHandler().upsert_comments(ticket_id, comments)
+
+
+class CommentOutbox:
+    """
+    SQLite-backed queue of Jira comments with a background flusher thread.
+
+    A comment is 'pending' until it is posted ('sent'), or until it failed
+    max_attempts times ('failed'). Enqueuing the same ticket and marker again
+    replaces the queued body; enqueuing a body that was already sent does nothing.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        poster: Callable[[str, Dict[str, str]], Dict[str, str]] = _default_poster,
+        max_attempts: int = 6,
+        backoff_seconds: float = 2.0,
+    ) -> None:
+        """
+        Open (or create) the outbox database.
+
+        Args:
+            path (Path): Path of the SQLite database file.
+            poster (Callable[[str, Dict[str, str]], Dict[str, str]]): Posts the comments
+                of one ticket, given by marker, and returns their comment IDs by
+                marker. Defaults to JIRAHandler.upsert_comments().
+            max_attempts (int): The number of attempts before a comment is given up.
+                Defaults to 6.
+            backoff_seconds (float): The pause after the first failed attempt, doubled
+                after each further one. Defaults to 2.0.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.poster = poster
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._idle = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def enqueue(self, ticket_id: str, marker: str, body: str) -> bool:
+        """
+        Queue a comment for a ticket and wake the flusher.
+
+        Args:
+            ticket_id (str): The JIRA ticket identifier.
+            marker (str): Identifies the comment on the ticket, e.g. 'repo#123'.
+            body (str): The comment text.
+
+        Returns:
+            bool: True if the comment was queued, False if the same body was already
+            posted with this marker.
+        """
+        body_hash = hashlib.sha256(body.encode("utf-8")).hexdigest()
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT body_hash, status FROM comments WHERE ticket_id = ? AND marker = ?",
+                (ticket_id, marker),
+            ).fetchone()
+            if row is not None and row[0] == body_hash and row[1] == "sent":
+                return False
+            self._conn.execute(
+                "INSERT INTO comments"
+                "(ticket_id, marker, body, body_hash, status, next_attempt_at, updated_at) "
+                "VALUES (?, ?, ?, ?, 'pending', ?, ?) ON CONFLICT(ticket_id, marker) DO UPDATE "
+                "SET body = excluded.body, body_hash = excluded.body_hash, status = 'pending', "
+                "attempts = 0, next_attempt_at = excluded.next_attempt_at, last_error = NULL, "
+                "updated_at = excluded.updated_at",
+                (ticket_id, marker, body, body_hash, now, now),
+            )
+        self.start()
+        self._wake.set()
+        return True
+
+    def flush(self) -> int:
+        """
+        Post the pending comments that are due, one request batch per ticket.
+
+        Returns:
+            int: The number of comments posted.
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT ticket_id, marker, body, body_hash, attempts FROM comments "
+                "WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY updated_at",
+                (now,),
+            ).fetchall()
+        tickets: Dict[str, List[tuple]] = {}
+        for row in rows:
+            tickets.setdefault(row[0], []).append(row)
+
+        posted = 0
+        for ticket_id, items in tickets.items():
+            try:
+                comment_ids = self.poster(ticket_id, {item[1]: item[2] for item in items})
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                self._record_failure(items, str(e))
+                continue
+            with self._lock, self._conn:
+                for _, marker, _, body_hash, _ in items:
+                    # A body enqueued while posting stays pending for the next flush.
+                    self._conn.execute(
+                        "UPDATE comments SET status = 'sent', comment_id = ?, last_error = NULL, "
+                        "updated_at = ? WHERE ticket_id = ? AND marker = ? AND body_hash = ?",
+                        (comment_ids.get(marker), time.time(), ticket_id, marker, body_hash),
+                    )
+            posted += len(items)
+        return posted
+
+    def _record_failure(self, items: List[tuple], error: str) -> None:
+        """Schedule the next attempt of failed comments, or give them up."""
+        now = time.time()
+        with self._lock, self._conn:
+            for ticket_id, marker, _, body_hash, attempts in items:
+                attempts += 1
+                delay = min(MAX_BACKOFF_SECONDS, self.backoff_seconds * 2 ** (attempts - 1))
+                status = "failed" if attempts >= self.max_attempts else "pending"
+                self._conn.execute(
+                    "UPDATE comments SET status = ?, attempts = ?, next_attempt_at = ?, "
+                    "last_error = ?, updated_at = ? "
+                    "WHERE ticket_id = ? AND marker = ? AND body_hash = ?",
+                    (status, attempts, now + delay, error, now, ticket_id, marker, body_hash),
+                )
+        print(f"Failed to post {len(items)} Jira comment(s), will retry: {error}")
+
+    def _next_due(self) -> Optional[float]:
+        """Return the time of the next pending attempt, or None if nothing is pending."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(next_attempt_at) FROM comments WHERE status = 'pending'"
+            ).fetchone()
+        return row[0]
+
+    def _run(self) -> None:
+        """Flush due comments until stopped, sleeping until the next one is due."""
+        while not self._stopping.is_set():
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                print(f"Jira comment outbox flush failed: {str(e)}")
+            due = self._next_due()
+            if due is None:
+                with self._idle:
+                    self._idle.notify_all()
+            self._wake.wait(None if due is None else max(0.0, due - time.time()))
+
+    def start(self) -> None:
+        """
+        Start the background flusher if it is not running.
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="jira-outbox", daemon=True)
+            self._thread.start()
+
+    def drain(self, timeout: float) -> bool:
+        """
+        Wait for the queued comments to be posted or given up.
+
+        Args:
+            timeout (float): The maximum number of seconds to wait.
+
+        Returns:
+            bool: True if no comment is pending anymore.
+        """
+        deadline = time.time() + timeout
+        self._wake.set()
+        with self._idle:
+            while self._next_due() is not None:
+                remaining = deadline - time.time()
+                if remaining <= 0 or self._thread is None or not self._thread.is_alive():
+                    return False
+                self._idle.wait(min(remaining, 0.5))
+        return True
+
+    def stop(self) -> None:
+        """
+        Stop the background flusher. Pending comments are kept for the next run.
+        """
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def status(self) -> Dict[str, int]:
+        """
+        Return the number of comments in each status.
+
+        Returns:
+            Dict[str, int]: The 'pending', 'sent' and 'failed' counts.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM comments GROUP BY status"
+            ).fetchall()
+        return dict({"pending": 0, "sent": 0, "failed": 0}, **dict(rows))
+
+    def close(self) -> None:
+        """
+        Stop the flusher and close the database connection.
+        """
+        self.stop()
+        with self._lock:
+            self._conn.close()
+
+
+_outbox: Optional[CommentOutbox] = None
+_outbox_lock = threading.Lock()
+
+
+def get_comment_outbox() -> CommentOutbox:
+    """
+    Return the process-wide comment outbox, creating it on first use.
+
+    The flusher starts right away, so that comments left pending by a previous run
+    are retried. At exit, the process waits up to JIRA_OUTBOX_DRAIN_SECONDS for the
+    queued comments to be posted.
+
+    Returns:
+        CommentOutbox: The outbox in CACHE_DIR.
+    """
+    global _outbox  # pylint: disable=global-statement
+    with _outbox_lock:
+        if _outbox is None:
+            _outbox = CommentOutbox(
+                Path(get_config("CACHE_DIR", ".cache")) / "jira_outbox.sqlite3",
+                max_attempts=get_int_config("JIRA_OUTBOX_MAX_ATTEMPTS", 6),
+                backoff_seconds=get_float_config("JIRA_OUTBOX_BACKOFF_SECONDS", 2.0),
+            )
+            _outbox.start()
+            atexit.register(_outbox.drain, get_float_config("JIRA_OUTBOX_DRAIN_SECONDS", 30.0))
+        return _outbox
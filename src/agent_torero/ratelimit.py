@@ -0,0 +1,338 @@
+"""
+Shared, rate-limit-aware request scheduler.
+
+This module provides token buckets, one per external service (GitHub, Jira,
+Gemini), that every outgoing call goes through. Callers are served in FIFO
+order. The buckets learn the real budget from rate limit response headers and
+slow down on 429 responses instead of letting each client retry blindly.
+"""
+
+import email.utils
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Mapping, Optional
+
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError
+
+from src.agent_torero.config import get_float_config
+
+# Requests per second of each service until its responses tell otherwise.
+DEFAULT_RATES = {"github": 10.0, "github_graphql": 2.0, "jira": 5.0, "gemini": 1.0}
+# Fraction of the configured rate recovered after each successful response.
+RECOVERY_STEP = 0.1
+# Fraction of the window's limit below which the remaining budget is spread
+# evenly until the reset instead of being spent at the configured rate.
+LOW_BUDGET_FRACTION = 0.1
+
+
+class TokenBucket:
+    """
+    Token bucket with a FIFO queue of waiting callers and an adaptive refill rate.
+
+    The rate is halved on every throttled response and recovers step by step
+    afterwards. When the service reports that its remaining budget fell below
+    LOW_BUDGET_FRACTION of its limit, the rate is set to spread that budget evenly
+    until the reset time.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: Optional[float] = None) -> None:
+        """
+        Initialize the bucket full.
+
+        Args:
+            name (str): The service name.
+            rate (float): The maximum number of requests per second.
+            capacity (Optional[float]): The maximum burst size. Defaults to max(1, rate).
+        """
+        self.name = name
+        self.max_rate = rate
+        self.min_rate = rate / 64
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.blocked_until = 0.0
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self._next_ticket = 0
+        self._serving = 0
+        self.acquired = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.throttled = 0
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens earned since the last refill."""
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """
+        Take a token, waiting in line behind earlier callers if none is available.
+
+        Returns:
+            float: The number of seconds waited.
+        """
+        started = time.monotonic()
+        with self._cond:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            while ticket != self._serving:
+                self._cond.wait()
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    wait = self.blocked_until - now
+                    if wait <= 0:
+                        if self.tokens >= 1:
+                            self.tokens -= 1
+                            break
+                        wait = (1 - self.tokens) / self.rate
+                    self._cond.wait(wait)
+            finally:
+                self._serving += 1
+                self._cond.notify_all()
+
+            waited = time.monotonic() - started
+            self.acquired += 1
+            if waited > 0.001:
+                self.waits += 1
+                self.wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        return waited
+
+    def update(
+        self,
+        remaining: Optional[int] = None,
+        reset_at: Optional[float] = None,
+        retry_after: Optional[float] = None,
+        throttled: bool = False,
+        limit: Optional[int] = None,
+    ) -> None:
+        """
+        Adjust the bucket to what the service reported.
+
+        Args:
+            remaining (Optional[int]): The requests left in the current window.
+            reset_at (Optional[float]): The epoch time at which the window resets.
+            retry_after (Optional[float]): Seconds to pause every caller for.
+            throttled (bool): Whether the request was rejected for exceeding the limit.
+            limit (Optional[int]): The requests allowed per window. Without it, a
+                reported budget only pauses callers once it is exhausted.
+        """
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            if retry_after is not None:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+            budget_known = remaining is not None and reset_at is not None
+            seconds = max(1.0, reset_at - time.time()) if budget_known else 0.0
+            if budget_known and remaining <= 0:
+                # An exhausted budget pauses every caller until the reset, also when
+                # the response was rejected without a Retry-After header.
+                self.blocked_until = max(self.blocked_until, now + seconds)
+            if throttled:
+                self.throttled += 1
+                self.rate = max(self.min_rate, self.rate / 2)
+                self.tokens = min(self.tokens, 0.0)
+            elif budget_known and limit is not None and remaining < limit * LOW_BUDGET_FRACTION:
+                self.rate = min(self.max_rate, max(self.min_rate, remaining / seconds))
+                self.tokens = min(self.tokens, float(max(remaining, 0)))
+            else:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_STEP)
+            self._cond.notify_all()
+
+    def metrics(self) -> Dict[str, float]:
+        """
+        Return the current budget and the wait-time counters of the bucket.
+
+        Returns:
+            Dict[str, float]: The available 'tokens', current 'rate' per second, number
+            of 'queued' callers, seconds until the pause ends ('blocked_for'), and the
+            'acquired', 'waits', 'wait_seconds', 'max_wait_seconds' and 'throttled'
+            counters.
+        """
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                "tokens": round(self.tokens, 3),
+                "rate": round(self.rate, 3),
+                "queued": self._next_ticket - self._serving,
+                "blocked_for": round(max(0.0, self.blocked_until - now), 3),
+                "acquired": self.acquired,
+                "waits": self.waits,
+                "wait_seconds": round(self.wait_seconds, 3),
+                "max_wait_seconds": round(self.max_wait_seconds, 3),
+                "throttled": self.throttled,
+            }
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_int(value: Optional[str]) -> Optional[int]:
+    """Parse an integer rate limit header."""
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def _parse_reset(value: Optional[str]) -> Optional[float]:
+    """Parse a rate limit reset header given as epoch seconds or an ISO timestamp."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def observe_response(bucket: TokenBucket, status_code: int, headers: Mapping[str, str]) -> None:
+    """
+    Feed the rate limit information of an HTTP response to a bucket.
+
+    Understands the X-RateLimit-Limit / X-RateLimit-Remaining / X-RateLimit-Reset
+    headers of GitHub and Jira, Retry-After, and 429 (or rate limited 403) responses.
+
+    Args:
+        bucket (TokenBucket): The bucket of the service that answered.
+        status_code (int): The response status code.
+        headers (Mapping[str, str]): The response headers (case-insensitive).
+    """
+    remaining = _parse_int(headers.get("X-RateLimit-Remaining"))
+    retry_after = _parse_retry_after(headers.get("Retry-After"))
+    throttled = status_code == 429 or (
+        status_code == 403 and (retry_after is not None or remaining == 0)
+    )
+    bucket.update(
+        remaining=remaining,
+        reset_at=_parse_reset(headers.get("X-RateLimit-Reset")),
+        retry_after=retry_after,
+        throttled=throttled,
+        limit=_parse_int(headers.get("X-RateLimit-Limit")),
+    )
+
+
+class RateLimitScheduler:
+    """
+    Registry of the token buckets of all external services.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize an empty scheduler; buckets are created on first use.
+        """
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, name: str) -> TokenBucket:
+        """
+        Return the bucket of a service, creating it on first use.
+
+        The rate comes from the <NAME>_RATE_PER_SECOND setting, e.g.
+        GITHUB_RATE_PER_SECOND, falling back to DEFAULT_RATES.
+
+        Args:
+            name (str): The service name, e.g. 'github', 'jira' or 'gemini'.
+
+        Returns:
+            TokenBucket: The bucket of the service.
+        """
+        with self._lock:
+            if name not in self._buckets:
+                rate = get_float_config(
+                    f"{name.upper()}_RATE_PER_SECOND", DEFAULT_RATES.get(name, 5.0)
+                )
+                self._buckets[name] = TokenBucket(name, rate)
+            return self._buckets[name]
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """
+        Return the metrics of every bucket.
+
+        Returns:
+            Dict[str, Dict[str, float]]: TokenBucket.metrics() per service name.
+        """
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {name: bucket.metrics() for name, bucket in buckets.items()}
+
+
+_scheduler = RateLimitScheduler()
+
+
+def get_scheduler() -> RateLimitScheduler:
+    """
+    Return the process-wide scheduler.
+
+    Returns:
+        RateLimitScheduler: The shared scheduler.
+    """
+    return _scheduler
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """
+    requests transport adapter sending every request through a service's bucket.
+
+    Retries on response statuses (e.g. 429) are made here rather than by urllib3,
+    so that every attempt waits for a token of the bucket; urllib3 only retries
+    connection errors.
+    """
+
+    __attrs__ = HTTPAdapter.__attrs__ + ["bucket_name", "status_retries"]
+
+    def __init__(self, bucket_name: str, *args, **kwargs) -> None:
+        """
+        Initialize the adapter.
+
+        Args:
+            bucket_name (str): The service whose bucket the requests go through.
+            *args, **kwargs: Passed on to HTTPAdapter. The status retries of
+                max_retries are made by send().
+        """
+        self.bucket_name = bucket_name
+        super().__init__(*args, **kwargs)
+        self.status_retries = self.max_retries
+        self.max_retries = self.max_retries.new(
+            status_forcelist=None, respect_retry_after_header=False
+        )
+
+    def send(self, request, *args, **kwargs):  # pylint: disable=arguments-differ
+        bucket = get_scheduler().bucket(self.bucket_name)
+        retries = self.status_retries
+        while True:
+            bucket.acquire()
+            response = super().send(request, *args, **kwargs)
+            observe_response(bucket, response.status_code, response.headers)
+            has_retry_after = bool(response.headers.get("Retry-After"))
+            if not retries.is_retry(request.method, response.status_code, has_retry_after):
+                return response
+            try:
+                retries = retries.increment(request.method, request.url, response=response.raw)
+            except MaxRetryError:
+                return response
+            retries.sleep(response.raw)
+            response.close()
@@ -0,0 +1,126 @@
+"""
+Persistent review state per pull request.
+
+This module records, for every reviewed (repo, pull_number), the head commit
+SHA that was reviewed and the resulting report, so that a later run can review
+only the commits pushed since.
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from src.agent_torero.config import get_config
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    repo_name TEXT NOT NULL,
+    pull_number INTEGER NOT NULL,
+    head_sha TEXT NOT NULL,
+    report TEXT NOT NULL,
+    reviewed_at REAL NOT NULL,
+    PRIMARY KEY (repo_name, pull_number)
+);
+"""
+
+
+class ReviewStateStore:
+    """
+    SQLite-backed store of the last reviewed head SHA and report of each pull request.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """
+        Open (or create) the review state database.
+
+        Args:
+            path (Path): Path of the SQLite database file.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def get(self, repo_name: str, pull_number: int) -> Optional[dict]:
+        """
+        Return the last review of a pull request.
+
+        Args:
+            repo_name (str): The repository name.
+            pull_number (int): The pull request number.
+
+        Returns:
+            Optional[dict]: The 'head_sha', 'report' and 'reviewed_at' (epoch seconds)
+            of the last review, or None if the pull request was never reviewed.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT head_sha, report, reviewed_at FROM reviews "
+                "WHERE repo_name = ? AND pull_number = ?",
+                (repo_name, int(pull_number)),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"head_sha": row[0], "report": row[1], "reviewed_at": row[2]}
+
+    def save(self, repo_name: str, pull_number: int, head_sha: str, report: str) -> None:
+        """
+        Record the review of a pull request at a head SHA, replacing the previous one.
+
+        Args:
+            repo_name (str): The repository name.
+            pull_number (int): The pull request number.
+            head_sha (str): The reviewed head commit SHA.
+            report (str): The review report.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO reviews"
+                "(repo_name, pull_number, head_sha, report, reviewed_at) VALUES (?, ?, ?, ?, ?)",
+                (repo_name, int(pull_number), head_sha, report, time.time()),
+            )
+
+    def delete(self, repo_name: str, pull_number: int) -> None:
+        """
+        Forget the review of a pull request.
+
+        Args:
+            repo_name (str): The repository name.
+            pull_number (int): The pull request number.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM reviews WHERE repo_name = ? AND pull_number = ?",
+                (repo_name, int(pull_number)),
+            )
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[ReviewStateStore] = None
+_store_lock = threading.Lock()
+
+
+def get_review_state_store() -> ReviewStateStore:
+    """
+    Return the process-wide review state store, creating it on first use.
+
+    Returns:
+        ReviewStateStore: The store in CACHE_DIR.
+    """
+    global _store  # pylint: disable=global-statement
+    with _store_lock:
+        if _store is None:
+            _store = ReviewStateStore(
+                Path(get_config("CACHE_DIR", ".cache")) / "review_state.sqlite3"
+            )
+        return _store
@@ -0,0 +1,365 @@
+"""
+Model routing between Gemini Flash and Gemini Pro.
+
+This module picks the model and reasoning effort of every LLM call from the
+declared class of its task, the size of its input and a cheap complexity
+signal. Calls answered by Flash are checked, and escalated to Pro when the
+answer is unusable. Every call is recorded so that a run can report which model
+served it and the latency and cost saved.
+"""
+
+import re
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from crewai import LLM
+
+from src.agent_torero.budget import count_tokens
+from src.agent_torero.config import get_bool_config, get_config, get_int_config
+from src.agent_torero.llm import CachedLLM
+
+FLASH_MODEL = "gemini/gemini-2.5-flash"
+PRO_MODEL = "gemini/gemini-2.5-pro"
+
+# Declared class of each task: 'fetch' tasks call tools and summarize their
+# results, 'analysis' tasks reason over the context, 'synthesis' writes the review.
+TASK_CLASSES = {
+    "github_pull_request_details_task": "fetch",
+    "jira_tickets_info_task": "fetch",
+    "knowledge_retrieval_task": "analysis",
+    "test_cases_retrieval_task": "analysis",
+    "review_and_synthesis_task": "synthesis",
+    "jira_add_comment_task": "fetch",
+}
+# USD per million input and output tokens, used to estimate the cost saved.
+PRICES = {FLASH_MODEL: (0.30, 2.50), PRO_MODEL: (1.25, 10.00)}
+
+_HUNK_RE = re.compile(r"^@@ ", re.MULTILINE)
+_CODE_FENCE_RE = re.compile(r"^```", re.MULTILINE)
+
+# LLM of each (model, reasoning effort, stop words), shared by the routers of all runs.
+_route_llms: Dict[Tuple[str, str, Tuple[str, ...]], LLM] = {}
+_route_llms_lock = threading.Lock()
+
+
+class Route(NamedTuple):
+    """The model and reasoning effort serving a call, and why."""
+
+    model: str
+    reasoning_effort: str
+    reason: str
+
+
+def complexity_score(text: str) -> int:
+    """
+    Return a cheap complexity signal of a prompt: its diff hunks and code blocks.
+
+    Args:
+        text (str): The prompt text.
+
+    Returns:
+        int: The number of diff hunks plus the number of fenced code blocks.
+    """
+    return len(_HUNK_RE.findall(text)) + len(_CODE_FENCE_RE.findall(text)) // 2
+
+
+def is_valid_response(prompt: str, response: Any) -> bool:
+    """
+    Tell whether a response can be used by the agent that asked for it.
+
+    The response must not be empty, and must follow the 'Action:' / 'Final Answer:'
+    format when the prompt asks for it.
+
+    Args:
+        prompt (str): The prompt text.
+        response (Any): The LLM response.
+
+    Returns:
+        bool: False if the call should be escalated to a stronger model.
+    """
+    if not isinstance(response, str):
+        return response is not None
+    if not response.strip():
+        return False
+    if "Final Answer:" in prompt:
+        return "Final Answer:" in response or "Action:" in response
+    return True
+
+
+def get_route_llm(route: Route, stop: Optional[List[str]] = None) -> LLM:
+    """
+    Return the process-wide LLM serving a route, creating it on first use.
+
+    The LLMs are never modified after creation, so agents with different stop
+    words get different LLMs.
+
+    Args:
+        route (Route): The route.
+        stop (Optional[List[str]]): The stop words of the calling agent.
+
+    Returns:
+        LLM: A rate limited, cached LLM for the route's model, reasoning effort and
+        stop words.
+    """
+    stop_words = tuple(sorted(set(stop or [])))
+    key = (route.model, route.reasoning_effort, stop_words)
+    with _route_llms_lock:
+        if key not in _route_llms:
+            _route_llms[key] = CachedLLM(
+                model=route.model,
+                api_key=get_config("GEMINI_API_KEY"),
+                reasoning_effort=route.reasoning_effort,
+                temperature=0.0,
+                stop=list(stop_words),
+                stream=get_bool_config("LLM_STREAM", True),
+                max_retries=2,  # Rate limits are retried by RateLimitedLLM
+            )
+        return _route_llms[key]
+
+
+def _prompt_text(messages: Any) -> str:
+    """Join the contents of the messages of a call."""
+    if isinstance(messages, str):
+        return messages
+    return "\n".join(str(message.get("content", "")) for message in messages or [])
+
+
+class ModelRouter:
+    """
+    Per-run router choosing Flash or Pro for each LLM call and recording the calls.
+    """
+
+    def __init__(
+        self, pro_min_tokens: Optional[int] = None, pro_min_complexity: Optional[int] = None
+    ) -> None:
+        """
+        Initialize the router.
+
+        Args:
+            pro_min_tokens (Optional[int]): Input tokens from which analysis calls go
+                to Pro. Defaults to the ROUTER_PRO_MIN_TOKENS setting.
+            pro_min_complexity (Optional[int]): Complexity score from which analysis
+                calls go to Pro. Defaults to the ROUTER_PRO_MIN_COMPLEXITY setting.
+        """
+        self.pro_min_tokens = (
+            pro_min_tokens
+            if pro_min_tokens is not None
+            else get_int_config("ROUTER_PRO_MIN_TOKENS", 24000)
+        )
+        self.pro_min_complexity = (
+            pro_min_complexity
+            if pro_min_complexity is not None
+            else get_int_config("ROUTER_PRO_MIN_COMPLEXITY", 20)
+        )
+        self._lock = threading.Lock()
+        self.calls: List[Dict[str, Any]] = []
+
+    def route(self, task_class: str, input_tokens: int, complexity: int) -> Route:
+        """
+        Choose the model and reasoning effort of a call.
+
+        Args:
+            task_class (str): The declared task class, see TASK_CLASSES.
+            input_tokens (int): The estimated input tokens of the call.
+            complexity (int): The complexity score of the prompt.
+
+        Returns:
+            Route: The chosen route.
+        """
+        if task_class == "fetch":
+            return Route(FLASH_MODEL, "low", "fetch task")
+        if task_class == "analysis":
+            if input_tokens >= self.pro_min_tokens:
+                return Route(PRO_MODEL, "high", f"{input_tokens} input tokens")
+            if complexity >= self.pro_min_complexity:
+                return Route(PRO_MODEL, "high", f"complexity {complexity}")
+            return Route(FLASH_MODEL, "medium", "small analysis task")
+        return Route(PRO_MODEL, "high", f"{task_class} task")
+
+    def call(
+        self,
+        task_name: str,
+        task_class: str,
+        messages: Any,
+        stop: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Route a call, escalating it to Pro if Flash fails or answers unusably.
+
+        Args:
+            task_name (str): The name of the calling task, for the report.
+            task_class (str): The declared task class.
+            messages (Any): The prompt string or messages.
+            stop (Optional[List[str]]): Stop words the agent set on its LLM, used by
+                the serving LLM.
+            **kwargs: Passed on to LLM.call().
+
+        Returns:
+            Any: The LLM response.
+        """
+        prompt = _prompt_text(messages)
+        input_tokens = count_tokens(prompt)
+        route = self.route(task_class, input_tokens, complexity_score(prompt))
+        while True:
+            started = time.perf_counter()
+            try:
+                response = get_route_llm(route, stop).call(messages, **kwargs)
+                error = None if is_valid_response(prompt, response) else "invalid response"
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                if route.model == PRO_MODEL:
+                    raise
+                response, error = None, str(e)
+            escalate = error is not None and route.model != PRO_MODEL
+            self._record(task_name, route, input_tokens, response, started, escalate)
+            if not escalate:
+                return response
+            route = Route(PRO_MODEL, "high", f"escalated: {error[:80]}")
+
+    def _record(
+        self,
+        task_name: str,
+        route: Route,
+        input_tokens: int,
+        response: Any,
+        started: float,
+        escalated: bool,
+    ) -> None:
+        """Record a served call."""
+        call = {
+            "task": task_name,
+            "model": route.model,
+            "reasoning_effort": route.reasoning_effort,
+            "reason": route.reason,
+            "input_tokens": input_tokens,
+            "output_tokens": count_tokens(response) if isinstance(response, str) else 0,
+            "seconds": round(time.perf_counter() - started, 3),
+            "escalated": escalated,
+        }
+        with self._lock:
+            self.calls.append(call)
+
+    @staticmethod
+    def _cost(model: str, call: Dict[str, Any]) -> float:
+        """Estimate the cost of a call on a model in USD."""
+        input_price, output_price = PRICES[model]
+        return (call["input_tokens"] * input_price + call["output_tokens"] * output_price) / 1e6
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize the routed calls of the run.
+
+        Returns:
+            Dict[str, Any]: The 'calls', 'seconds' and 'cost' per model in 'models',
+            the number of 'escalations', and the estimated 'cost_saved' and
+            'seconds_saved' compared with serving every call with Pro. The latency
+            saved is estimated from the mean Pro latency of the run, and is None
+            when no call went to Pro.
+        """
+        with self._lock:
+            calls = list(self.calls)
+        models: Dict[str, Dict[str, float]] = {}
+        for call in calls:
+            stats = models.setdefault(call["model"], {"calls": 0, "seconds": 0.0, "cost": 0.0})
+            stats["calls"] += 1
+            stats["seconds"] += call["seconds"]
+            stats["cost"] += self._cost(call["model"], call)
+
+        flash_calls = [call for call in calls if call["model"] == FLASH_MODEL]
+        cost_saved = sum(
+            (0.0 if call["escalated"] else self._cost(PRO_MODEL, call))
+            - self._cost(FLASH_MODEL, call)
+            for call in flash_calls
+        )
+        seconds_saved = None
+        pro = models.get(PRO_MODEL)
+        if pro and flash_calls:
+            pro_mean = pro["seconds"] / pro["calls"]
+            seconds_saved = sum(
+                (0.0 if call["escalated"] else pro_mean) - call["seconds"] for call in flash_calls
+            )
+        return {
+            "models": {
+                model: {key: round(value, 4) for key, value in stats.items()}
+                for model, stats in models.items()
+            },
+            "escalations": sum(1 for call in calls if call["escalated"]),
+            "cost_saved": round(cost_saved, 4),
+            "seconds_saved": None if seconds_saved is None else round(seconds_saved, 3),
+        }
+
+    def format_summary(self) -> str:
+        """
+        Format the routed calls and the summary for the run log.
+
+        Returns:
+            str: One line per call, then the totals.
+        """
+        with self._lock:
+            calls = list(self.calls)
+        lines = [
+            f"Model routing {call['task']}: {call['model']} ({call['reasoning_effort']}, "
+            f"{call['reason']}), {call['input_tokens']} tokens in, {call['seconds']:.1f}s"
+            + (", escalated" if call["escalated"] else "")
+            for call in calls
+        ]
+        summary = self.summary()
+        seconds_saved = summary["seconds_saved"]
+        lines.append(
+            f"Model routing: {len(calls)} calls, {summary['escalations']} escalated, "
+            f"${summary['cost_saved']:.4f} saved"
+            + (f", {seconds_saved:.1f}s saved." if seconds_saved is not None else ".")
+        )
+        return "\n".join(lines)
+
+
+class RoutedLLM(LLM):
+    """
+    LLM handing every call to a ModelRouter.
+
+    The task class comes from the calling task when it is known, and from the
+    class declared for the agent otherwise (e.g. for reasoning calls).
+    """
+
+    def __init__(self, router: ModelRouter, task_class: str, **kwargs: Any) -> None:
+        """
+        Initialize the LLM.
+
+        Args:
+            router (ModelRouter): The router of the run.
+            task_class (str): The default task class of the agent using this LLM.
+            **kwargs: Passed on to LLM. The model defaults to Gemini Pro, whose
+                context window bounds every route.
+        """
+        kwargs.setdefault("model", PRO_MODEL)
+        kwargs.setdefault("api_key", get_config("GEMINI_API_KEY"))
+        super().__init__(**kwargs)
+        self.router = router
+        self.task_class = task_class
+
+    # pylint: disable=arguments-differ
+    def call(
+        self,
+        messages: Any,
+        tools: Optional[list] = None,
+        callbacks: Optional[list] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+        from_task: Optional[Any] = None,
+        from_agent: Optional[Any] = None,
+    ) -> Any:
+        """
+        Call the model the router picks for this call.
+        """
+        task_name = getattr(from_task, "name", None) or self.task_class
+        return self.router.call(
+            task_name,
+            TASK_CLASSES.get(task_name, self.task_class),
+            messages,
+            stop=self.stop,
+            tools=tools,
+            callbacks=callbacks,
+            available_functions=available_functions,
+            from_task=from_task,
+            from_agent=from_agent,
+        )
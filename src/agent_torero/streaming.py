@@ -0,0 +1,296 @@
+"""
+Streaming of LLM output to task output files and progress callbacks.
+
+With LLM_STREAM on, the LLMs emit their output chunk by chunk on the crewai
+event bus. This module follows the chunks of the tasks of a crew run: the final
+answer of a task with an output file is written to that file as it is
+generated, every chunk is passed to an optional progress callback, and the
+time to first token and total latency of each call are recorded.
+"""
+
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from crewai.events import LLMStreamChunkEvent, crewai_event_bus
+from crewai.events.types.llm_events import (LLMCallCompletedEvent,
+                                            LLMCallFailedEvent,
+                                            LLMCallStartedEvent)
+
+# Marker of the final answer in the ReAct format used by crewai agents.
+FINAL_ANSWER = "Final Answer:"
+
+ProgressCallback = Callable[[str, str], None]
+
+
+def print_progress(task_name: str, chunk: str) -> None:  # pylint: disable=unused-argument
+    """
+    Progress callback echoing the streamed chunks to the console.
+
+    Args:
+        task_name (str): The name of the task generating the chunk.
+        chunk (str): The generated text.
+    """
+    print(chunk, end="", flush=True)
+
+
+class TaskStreams:
+    """
+    Streaming state of the tasks of one crew run.
+
+    Each LLM call of a task is recorded with its model, time to first token,
+    total latency and number of chunks. Once the answer of a call reaches the
+    'Final Answer:' marker, the rest of it is appended to the task's output file
+    as it arrives; crewai writes the complete output to the file when the task
+    ends.
+    """
+
+    def __init__(self, tasks: Iterable[Any], progress: Optional[ProgressCallback] = None) -> None:
+        """
+        Initialize the streams.
+
+        Args:
+            tasks (Iterable[Any]): The tasks of the run. Their output files are read
+                when their calls start, after the crew inputs were interpolated.
+            progress (Optional[ProgressCallback]): Called with the task name and
+                every streamed chunk.
+        """
+        self.tasks = {str(task.id): task for task in tasks}
+        self.progress = progress
+        self._lock = threading.Lock()
+        self._active: Dict[str, Dict[str, Any]] = {}
+        self.calls: List[Dict[str, Any]] = []
+
+    def started(self, task_id: str, model: Optional[str]) -> None:
+        """
+        Start recording a call of a task.
+
+        Args:
+            task_id (str): The task ID.
+            model (Optional[str]): The model serving the call.
+        """
+        task = self.tasks[task_id]
+        with self._lock:
+            self._active[task_id] = {
+                "task": task.name,
+                "model": model,
+                "started": time.perf_counter(),
+                "first_token": None,
+                "chunks": 0,
+                "text": "",
+                "output_file": task.output_file,
+                "written": None,
+            }
+
+    def chunk(self, task_id: str, text: str) -> None:
+        """
+        Record a streamed chunk, write it to the output file and report progress.
+
+        Args:
+            task_id (str): The task ID.
+            text (str): The generated text.
+        """
+        with self._lock:
+            call = self._active.get(task_id)
+            if call is None or not text:
+                return
+            if call["first_token"] is None:
+                call["first_token"] = time.perf_counter()
+            call["chunks"] += 1
+            call["text"] += text
+            if call["output_file"]:
+                self._write(call)
+            task_name = call["task"]
+        if self.progress is not None:
+            self.progress(task_name, text)
+
+    @staticmethod
+    def _write(call: Dict[str, Any]) -> None:
+        """Append the final answer generated since the last chunk to the output file."""
+        path = Path(call["output_file"])
+        if call["written"] is None:
+            marker = call["text"].find(FINAL_ANSWER)
+            if marker < 0:
+                return
+            start = marker + len(FINAL_ANSWER)
+            answer = call["text"][start:]
+            if not answer.strip():
+                return
+            call["written"] = start + len(answer) - len(answer.lstrip())
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("", encoding="utf-8")
+        with path.open("a", encoding="utf-8") as file:
+            file.write(call["text"][call["written"] :])
+        call["written"] = len(call["text"])
+
+    def finished(self, task_id: str, failed: bool = False) -> None:
+        """
+        Stop recording a call of a task.
+
+        Args:
+            task_id (str): The task ID.
+            failed (bool): Whether the call failed.
+        """
+        ended = time.perf_counter()
+        with self._lock:
+            call = self._active.pop(task_id, None)
+            if call is None:
+                return
+            ttft = None
+            if call["first_token"] is not None:
+                ttft = round(call["first_token"] - call["started"], 3)
+            self.calls.append(
+                {
+                    "task": call["task"],
+                    "model": call["model"],
+                    "ttft": ttft,
+                    "seconds": round(ended - call["started"], 3),
+                    "chunks": call["chunks"],
+                    "failed": failed,
+                }
+            )
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Summarize the recorded calls per task.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: The number of 'calls', the 'streamed' calls
+            (those that produced chunks), their mean and max time to first token
+            ('ttft_mean', 'ttft_max', None without streamed calls) and the total
+            latency 'seconds' of each task.
+        """
+        with self._lock:
+            calls = list(self.calls)
+        tasks: Dict[str, Dict[str, Any]] = {}
+        for call in calls:
+            stats = tasks.setdefault(call["task"], {"calls": 0, "seconds": 0.0, "ttfts": []})
+            stats["calls"] += 1
+            stats["seconds"] += call["seconds"]
+            if call["ttft"] is not None:
+                stats["ttfts"].append(call["ttft"])
+        return {
+            task: {
+                "calls": stats["calls"],
+                "streamed": len(stats["ttfts"]),
+                "ttft_mean": (
+                    round(sum(stats["ttfts"]) / len(stats["ttfts"]), 3) if stats["ttfts"] else None
+                ),
+                "ttft_max": max(stats["ttfts"]) if stats["ttfts"] else None,
+                "seconds": round(stats["seconds"], 3),
+            }
+            for task, stats in tasks.items()
+        }
+
+    def format_summary(self) -> str:
+        """
+        Format the summary for the run log.
+
+        Returns:
+            str: One line per task, or a note that no call was recorded.
+        """
+        lines = []
+        for task, stats in self.summary().items():
+            ttft = (
+                f"first token after {stats['ttft_mean']:.1f}s on average "
+                f"(max {stats['ttft_max']:.1f}s)"
+                if stats["streamed"]
+                else "nothing streamed"
+            )
+            lines.append(
+                f"Streaming {task}: {stats['calls']} calls, {ttft}, "
+                f"{stats['seconds']:.1f}s in total."
+            )
+        return "\n".join(lines) or "Streaming: no LLM call recorded."
+
+
+class StreamListener:
+    """
+    Event bus listener dispatching the LLM events of tasks to their TaskStreams.
+
+    The handlers are registered once per process; the runs register their tasks
+    while they are running, so that concurrent crews only see their own calls.
+    """
+
+    def __init__(self, event_bus: Any = crewai_event_bus) -> None:
+        """
+        Register the handlers on the event bus.
+
+        Args:
+            event_bus (Any): The crewai event bus. Defaults to the global one.
+        """
+        self._lock = threading.Lock()
+        self._streams: Dict[str, TaskStreams] = {}
+        event_bus.register_handler(LLMCallStartedEvent, self._on_started)
+        event_bus.register_handler(LLMStreamChunkEvent, self._on_chunk)
+        event_bus.register_handler(LLMCallCompletedEvent, self._on_completed)
+        event_bus.register_handler(LLMCallFailedEvent, self._on_failed)
+
+    def register(self, streams: TaskStreams) -> None:
+        """
+        Start dispatching the events of the tasks of a run.
+
+        Args:
+            streams (TaskStreams): The streams of the run.
+        """
+        with self._lock:
+            self._streams.update(dict.fromkeys(streams.tasks, streams))
+
+    def unregister(self, streams: TaskStreams) -> None:
+        """
+        Stop dispatching the events of the tasks of a run.
+
+        Args:
+            streams (TaskStreams): The streams of the run.
+        """
+        with self._lock:
+            for task_id in streams.tasks:
+                if self._streams.get(task_id) is streams:
+                    del self._streams[task_id]
+
+    def _streams_of(self, event: Any) -> Optional[TaskStreams]:
+        """Return the streams of the task of an event, if it is registered."""
+        with self._lock:
+            return self._streams.get(str(event.task_id)) if event.task_id else None
+
+    def _on_started(self, source: Any, event: LLMCallStartedEvent) -> None:
+        streams = self._streams_of(event)
+        if streams is not None:
+            streams.started(str(event.task_id), event.model or getattr(source, "model", None))
+
+    def _on_chunk(self, source: Any, event: LLMStreamChunkEvent) -> None:
+        # pylint: disable=unused-argument
+        streams = self._streams_of(event)
+        if streams is not None:
+            streams.chunk(str(event.task_id), event.chunk)
+
+    def _on_completed(self, source: Any, event: LLMCallCompletedEvent) -> None:
+        # pylint: disable=unused-argument
+        streams = self._streams_of(event)
+        if streams is not None:
+            streams.finished(str(event.task_id))
+
+    def _on_failed(self, source: Any, event: LLMCallFailedEvent) -> None:
+        # pylint: disable=unused-argument
+        streams = self._streams_of(event)
+        if streams is not None:
+            streams.finished(str(event.task_id), failed=True)
+
+
+_listener: Optional[StreamListener] = None
+_listener_lock = threading.Lock()
+
+
+def get_stream_listener() -> StreamListener:
+    """
+    Return the process-wide stream listener, registering it on first use.
+
+    Returns:
+        StreamListener: The listener on the global crewai event bus.
+    """
+    global _listener  # pylint: disable=global-statement
+    with _listener_lock:
+        if _listener is None:
+            _listener = StreamListener()
+        return _listener
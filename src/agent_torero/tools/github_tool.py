@@ -2,12 +2,14 @@
 Crew AI GitHub Tool
 """
 
-from typing import Type
+from typing import Optional, Type
 
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
-from src.agent_torero.handlers.github import GitHubAPIError, GitHubHandler
+from src.agent_torero.budget import TokenBudget, fit_tool_output
+from src.agent_torero.handlers.github import (GitHubAPIError,
+                                              create_github_handler)
 
 
 class GitHubPRReviewToolInput(BaseModel):
@@ -15,6 +17,17 @@ class GitHubPRReviewToolInput(BaseModel):
 
     pull_number: int = Field(..., description="The Pull Request number.")
     repo_name: str = Field(..., description="The repository name.")
+    file_path: Optional[str] = Field(
+        None,
+        description="A file path from 'diff_index' to read the diff of. Leave empty to get "
+        "the PR details and the index of changed files.",
+    )
+    page: int = Field(1, description="The page of the file's diff to read, starting at 1.")
+    since_sha: Optional[str] = Field(
+        None,
+        description="For incremental reviews, the last reviewed commit SHA. The diff then "
+        "covers only the changes pushed since that commit.",
+    )
 
 
 class GithubPullRequestReviewTool(BaseTool):
@@ -22,30 +35,79 @@ class GithubPullRequestReviewTool(BaseTool):
 
     name: str = "GitHub Pull Request Review Tool"
     description: str = (
-        "A tool to fetch GitHub Pull Request information for a PR Number and Repo "
-        "Returns a dictionary containing PR details and diff."
+        "A tool to fetch GitHub Pull Request information for a PR Number and Repo. "
+        "Without 'file_path' it returns the PR details, the commit subjects and "
+        "'diff_index', one entry per changed file with its change type, added/removed "
+        "line counts and hunks. "
+        "With 'file_path' it returns one 'page' of that file's diff; read the next page "
+        "while 'page' is lower than 'pages'. 'diff_manifest' lists the files left out "
+        "or truncated by the diff size budget."
     )
     args_schema: Type[BaseModel] = GitHubPRReviewToolInput
+    token_budget: Optional[TokenBudget] = Field(default=None, exclude=True)
 
     # pylint: disable=arguments-differ
-    def _run(self, pull_number: int, repo_name: str) -> dict:
+    def _run(
+        self,
+        pull_number: int,
+        repo_name: str,
+        file_path: Optional[str] = None,
+        page: int = 1,
+        since_sha: Optional[str] = None,
+    ) -> dict:
         """Fetch GitHub Pull Request details and diff.
         Args:
             pull_number (int): The Pull Request number.
             repo_name (str): The repository name.
+            file_path (Optional[str]): The file to read a page of the diff of.
+            page (int): The 1-based page of the file's diff.
+            since_sha (Optional[str]): Only return the changes since this commit.
         Returns:
-            dict: A dictionary containing PR details and diff or error information.
+            dict: A dictionary containing PR details and the diff index, a page of a
+                file's diff, or error information, compacted to the 'github' token budget.
         """
+        result = self._fetch(pull_number, repo_name, file_path, page, since_sha)
+        return fit_tool_output(self.token_budget, "github", result)
+
+    @staticmethod
+    def _fetch(
+        pull_number: int,
+        repo_name: str,
+        file_path: Optional[str],
+        page: int,
+        since_sha: Optional[str],
+    ) -> dict:
+        """Fetch the tool result; see _run()."""
         try:
-            github_api = GitHubHandler(pull_number=pull_number, repo_name=repo_name)
-            pr_details = github_api.fetch_pr_details()
-            pr_diff = github_api.fetch_pr_diff()
+            github_api = create_github_handler(pull_number=pull_number, repo_name=repo_name)
+
+            if file_path:
+                diff_index = github_api.fetch_pr_diff_index(since_sha=since_sha or None)
+                try:
+                    diff_page = diff_index.page(file_path, page)
+                except (KeyError, IndexError) as e:
+                    return {
+                        "error": f"No diff page {page} for '{file_path}': {str(e)}",
+                        "files": [entry["path"] for entry in diff_index.summary()],
+                        "success": False,
+                    }
+                return dict(diff_page, success=True)
 
+            bundle = github_api.fetch_pr_bundle(since_sha=since_sha or None)
             response_json = {
-                "pr_details": pr_details,
-                "pr_diff": pr_diff,
+                "pr_details": bundle["pr_details"],
+                "diff_index": bundle["diff_index"].summary(),
+                "diff_manifest": bundle["diff_index"].manifest,
+                "commits": [
+                    {"sha": commit["sha"][:12], "message": commit["message"].split("\n", 1)[0]}
+                    for commit in bundle["commits"]
+                ],
                 "success": True,
             }
+            if bundle["errors"]:
+                response_json["errors"] = bundle["errors"]
+            if "query_cost" in bundle:
+                response_json["query_cost"] = bundle["query_cost"]
             return response_json
 
         except GitHubAPIError as e:
@@ -5,12 +5,16 @@ This module provides functions to interact with the JIRA API, including fetching
 ticket details and comments.
 """
 
-from typing import Type
+from typing import Optional, Type
 
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
-from src.agent_torero.handlers.jira import JIRAHandler
+from src.agent_torero.budget import TokenBudget, fit_tool_output
+from src.agent_torero.config import get_bool_config
+from src.agent_torero.handlers.jira import (REVIEW_TICKET_ID, JIRAAPIError,
+                                            JIRAHandler)
+from src.agent_torero.outbox import get_comment_outbox
 
 
 class JIRTicketInfoToolInput(BaseModel):
@@ -32,8 +36,11 @@ class JIRATicketInfoTool(BaseTool):
     description: str = (
         "Fetches and returns details of list of JIRA tickets "
         "including its summary, description, status, and comments. "
+        "Texts are plain text; only the newest comments are returned and "
+        "'dropped' counts the comments and characters left out. "
     )
     args_schema: Type[BaseModel] = JIRTicketInfoToolInput
+    token_budget: Optional[TokenBudget] = Field(default=None, exclude=True)
 
     # pylint: disable=arguments-differ
     def _run(self, ticket_ids: list[str]) -> list[dict]:
@@ -47,7 +54,53 @@ class JIRATicketInfoTool(BaseTool):
         """
         jira_handler = JIRAHandler()
         tickets_details = jira_handler.fetch_tickets_details(ticket_ids)
-        return tickets_details
+        return fit_tool_output(self.token_budget, "jira", tickets_details)
+
+
+class JIRAIssueGraphToolInput(BaseModel):
+    """Input schema for JIRAIssueGraphTool."""
+
+    ticket_ids: list[str] = Field(
+        ...,
+        description="The JIRA tickets to start from, e.g., ['RBI-1234', 'RBI-56789'].",
+    )
+    depth: Optional[int] = Field(
+        None,
+        description="The number of link hops to follow. Defaults to the configured depth.",
+    )
+
+
+class JIRAIssueGraphTool(BaseTool):
+    """
+    JIRA Tool for fetching the parent epics, sub-tasks and linked issues of tickets.
+
+    """
+
+    name: str = "JIRA Linked Issues Graph"
+    description: str = (
+        "Fetches the graph of issues linked to a list of JIRA tickets in one call: "
+        "parent epics, sub-tasks and 'blocks' / 'relates to' links, up to a few hops away. "
+        "Returns the key, summary, status and type of each issue and the links between them."
+    )
+    args_schema: Type[BaseModel] = JIRAIssueGraphToolInput
+    token_budget: Optional[TokenBudget] = Field(default=None, exclude=True)
+
+    # pylint: disable=arguments-differ
+    def _run(self, ticket_ids: list[str], depth: Optional[int] = None) -> dict:
+        """Fetch the linked-issue graph of JIRA tickets.
+        Args:
+            ticket_ids: A list of JIRA ticket identifiers (e.g., ['RBI-1234', 'RBI-56789']).
+            depth: The number of link hops to follow.
+        Returns:
+            dict: The 'nodes', 'edges' ([from, relation, to]), 'missing' keys and
+                  'truncated' flag of the graph, or {"error": <error_message>}.
+        """
+        jira_handler = JIRAHandler()
+        try:
+            graph = jira_handler.expand_issue_graph(ticket_ids, max_depth=depth)
+        except JIRAAPIError as e:
+            return {"error": str(e)}
+        return fit_tool_output(self.token_budget, "jira_graph", graph)
 
 
 class JIRAAddCommentToolInput(BaseModel):
@@ -57,6 +110,13 @@ class JIRAAddCommentToolInput(BaseModel):
         ...,
         description="The comment text to add to the JIRA ticket.",
     )
+    review_id: Optional[str] = Field(
+        None,
+        description=(
+            "The reviewed pull request, e.g. 'repo#123'. A later comment with the same "
+            "review_id replaces this one."
+        ),
+    )
 
 
 class JIRAAddCommentTool(BaseTool):
@@ -69,21 +129,35 @@ class JIRAAddCommentTool(BaseTool):
     name: str = "JIRA Add Comment"
     description: str = (
         "Adds a comment to JIRA ticket. "
-        "Useful for updating tickets with new information or feedback."
+        "Useful for updating tickets with new information or feedback. "
+        "The comment is posted in the background; posting again with the same "
+        "review_id edits the earlier comment instead of adding a new one."
     )
     args_schema: Type[BaseModel] = JIRAAddCommentToolInput
 
     # pylint: disable=arguments-differ
-    def _run(self, comment: str) -> bool:
+    def _run(self, comment: str, review_id: Optional[str] = None) -> bool:
         """
         Add a comment to a JIRA ticket.
 
+        With the JIRA_OUTBOX setting on, the comment is queued in the comment outbox
+        and posted by its background flusher.
+
         Args:
             comment: The comment text to add to the JIRA ticket.
+            review_id: Identifies the comment on the ticket. Defaults to the first
+                line of the comment, the report title.
 
         Returns:
-            bool: True if the comment was added successfully, False otherwise.
+            bool: True if the comment was queued or added successfully, False otherwise.
         """
-        jira_handler = JIRAHandler()
-        success = jira_handler.add_comment_to_ticket(comment)
-        return success
+        if not get_bool_config("JIRA_OUTBOX", True):
+            jira_handler = JIRAHandler()
+            success = jira_handler.add_comment_to_ticket(comment)
+            return success
+
+        marker = review_id or next(
+            (line.strip("# ")[:200] for line in comment.splitlines() if line.strip()), "review"
+        )
+        get_comment_outbox().enqueue(REVIEW_TICKET_ID, marker, comment)
+        return True
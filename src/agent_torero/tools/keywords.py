@@ -7,17 +7,35 @@ from typing import List, Optional, Type
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
-from src.agent_torero.handlers.keywords import SearchTestCases
+from src.agent_torero.budget import TokenBudget, fit_tool_output
+from src.agent_torero.handlers.keywords import get_test_case_index
 
 
 class TestCaseSearchToolInput(BaseModel):
     """Input schema for TestCaseSearchTool."""
 
     keywords: Optional[List[str]] = Field(
+        default=None,
         description=(
             "A list of keywords to filter test cases. "
             "If not provided, the tool will return a list of all available keywords."
-        )
+        ),
+    )
+    terms: Optional[List[str]] = Field(
+        default=None,
+        description=(
+            "A list of free-form terms to resolve to the closest available keywords. "
+            "When provided, the tool returns the matching keywords with similarity scores "
+            "instead of test cases."
+        ),
+    )
+    top_k: Optional[int] = Field(
+        default=25,
+        description="The maximum number of test cases to return, most relevant first.",
+    )
+    min_score: Optional[float] = Field(
+        default=0.0,
+        description="Only return test cases with a relevance score above this value.",
     )
 
 
@@ -27,6 +45,8 @@ class TestCaseSearchTool(BaseTool):
 
     Also filters and retrieves test cases based on provided keywords.
 
+    If terms are provided, it resolves them to the closest available keywords.
+
     If no keywords are provided, it returns a list of all available keywords.
 
     """
@@ -35,38 +55,63 @@ class TestCaseSearchTool(BaseTool):
     description: str = (
         "Searches a CSV file for test cases. "
         "Can be used to get all keywords or to retrieve specific test cases "
-        "based on a list of keywords. If no keywords are provided, "
-        "it returns a list of all available keywords."
+        "based on a list of keywords. Test cases are ranked by relevance and at most "
+        "'top_k' of them are returned. Use 'terms' to resolve free-form terms to the "
+        "closest available keywords before searching. If neither keywords nor terms "
+        "are provided, it returns a list of all available keywords."
     )
     args_schema: Type[BaseModel] = TestCaseSearchToolInput
+    token_budget: Optional[TokenBudget] = Field(default=None, exclude=True)
 
     # pylint: disable=arguments-differ
-    def _run(self, keywords: Optional[List[str]] = None) -> str | List[str]:
+    def _run(
+        self,
+        keywords: Optional[List[str]] = None,
+        top_k: Optional[int] = 25,
+        min_score: Optional[float] = 0.0,
+        terms: Optional[List[str]] = None,
+    ) -> str | List[str]:
         """
         Retrieves keywords or filters test cases based on provided keywords.
         If no keywords are provided, returns all available keywords. List[str].
-        If keywords are provided, returns matching test cases. str.
+        If keywords are provided, returns the most relevant matching test cases. str.
 
         Args:
           keywords (Optional[List[str]]): List of keywords to filter test cases.
             If None, returns all available keywords.
+          top_k (Optional[int]): Maximum number of test cases to return. Defaults to 25.
+          min_score (Optional[float]): Minimum relevance score of returned test cases.
+          terms (Optional[List[str]]): Free-form terms to resolve to available keywords.
 
         Returns:
           List[str]: List of all keywords from the knowledge base if no keywords are provided.
 
           List[str]: List of matching test cases if keywords are provided.
+
+          List[str]: List of resolved keywords per term if terms are provided.
         """
-        search_tool = SearchTestCases()
+        search_tool = get_test_case_index().get()
         response = []
+        if terms:
+            # create a str like <term>: <keyword> (<score>), <keyword> (<score>)
+            for term, matches in search_tool.resolve_keywords(terms).items():
+                resolved = ", ".join(f"{keyword} ({score})" for keyword, score in matches)
+                response.append(f"{term}: {resolved or 'no close keyword found'}")
+            return fit_tool_output(self.token_budget, "test_cases", response)
         if keywords:
-            # If keywords are provided return filtered test cases
-            test_cases_list = search_tool.filter_by_keywords(keywords)
-            # create a str like ID: <id>, Title: <title>, Summary: <summary>
+            # If keywords are provided return the top ranked test cases
+            test_cases_list = search_tool.rank_by_keywords(
+                keywords,
+                top_k=25 if top_k is None else top_k,
+                min_score=min_score or 0.0,
+            )
+            # create a str like ID: <id>, Title: <title>, Summary: <summary>, Score: <score>
             for test_case in test_cases_list:
                 t = (
                     f"ID: {test_case.get('ID', 'N/A')}, Title: {test_case.get('Title', 'N/A')}, "
-                    f"Summary: {test_case.get('Summary', 'N/A')}"
+                    f"Summary: {test_case.get('Summary', 'N/A')}, "
+                    f"Score: {test_case.get('Score', 'N/A')}"
                 )
                 response.append(t)
-            return response
-        return search_tool.get_all_keywords()
+            return fit_tool_output(self.token_budget, "test_cases", response)
+        return fit_tool_output(self.token_budget, "test_cases", search_tool.get_all_keywords())
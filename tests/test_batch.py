@@ -0,0 +1,64 @@
+"""
+Unit tests for the batch review mode.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add the src directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+# pylint: disable=wrong-import-position
+from agent_torero import batch
+
+
+def test_parse_targets():
+    """
+    Test that selectors expand to single pull requests or all open pull requests.
+    """
+    open_pulls = {"other": [3, 5]}
+    targets = batch.parse_targets(
+        ["repo#7", " other ", "repo:7", "", "repo#8"], list_pull_requests=open_pulls.get
+    )
+    assert targets == [("repo", 7), ("other", 3), ("other", 5), ("repo", 8)]
+
+    with pytest.raises(ValueError):
+        batch.parse_targets(["repo#latest"])
+
+
+def test_run_batch_bounds_concurrency_and_summarizes():
+    """
+    Test that reviews run concurrently up to max_workers and failures are recorded.
+    """
+    lock = threading.Lock()
+    running = {"now": 0, "peak": 0}
+
+    def review(repo_name, pull_number):
+        with lock:
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+        time.sleep(0.1)
+        with lock:
+            running["now"] -= 1
+        if pull_number == 3:
+            raise RuntimeError("boom")
+        return f"reports/{repo_name}_{pull_number}.md"
+
+    targets = [("repo", number) for number in range(1, 7)]
+    result = batch.run_batch(targets, max_workers=2, review=review)
+
+    assert running["peak"] == 2
+    assert [(r["repo_name"], r["pull_number"]) for r in result["results"]] == targets
+    assert result["results"][0]["report"] == "reports/repo_1.md"
+    assert result["results"][2] == dict(result["results"][2], success=False, error="boom")
+
+    summary = result["summary"]
+    assert (summary["jobs"], summary["succeeded"], summary["failed"]) == (6, 5, 1)
+    assert 0.3 <= summary["wall_seconds"] < 0.6
+    assert summary["latency_p50"] >= 0.1
+    assert summary["throughput_per_minute"] > 0
+    assert "6 pull requests with 2 workers" in batch.format_summary(summary)
@@ -0,0 +1,82 @@
+"""
+Unit tests for the token budget.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the src directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+# pylint: disable=wrong-import-position
+from agent_torero.budget import TokenBudget, compact, count_tokens
+
+
+def test_compact_keeps_structure_within_the_limit():
+    """
+    Test that compaction is deterministic, keeps the structure and fits the limit.
+    """
+    value = {
+        "pr_details": {"title": "Fix cookies", "body": "x" * 4000},
+        "diff_index": [{"path": f"src/file_{n}.js", "additions": n} for n in range(200)],
+        "success": True,
+    }
+
+    compacted = compact(value, 2000)
+
+    assert compacted == compact(value, 2000)
+    assert count_tokens(compacted) * 4 <= 2000 + 4
+    assert compacted["success"] is True
+    assert compacted["pr_details"]["title"] == "Fix cookies"
+    assert compacted["pr_details"]["body"].endswith("characters trimmed]")
+    assert compacted["diff_index"][0] == {"path": "src/file_0.js", "additions": 0}
+    assert compacted["diff_index"][-1].endswith("more items trimmed]")
+    assert value["pr_details"]["body"] == "x" * 4000  # The input is left untouched.
+
+
+def test_budget_trims_per_source_and_records_usage():
+    """
+    Test that each source gets its share of the limit and trimming is recorded.
+    """
+    budget = TokenBudget(limit=1000)
+    small = ["ID: C1, Title: Cookies"]
+    large = "log line\n" * 500
+
+    assert budget.fit("test_cases", small) is small
+    trimmed = budget.fit("task_output", large)
+
+    assert count_tokens(trimmed) <= budget.source_limit("task_output") == 150
+    summary = budget.summary()
+    assert summary["test_cases"]["trimmed_values"] == 0
+    assert summary["task_output"] == {
+        "values": 1,
+        "tokens": count_tokens(large),
+        "kept_tokens": count_tokens(trimmed),
+        "trimmed_values": 1,
+    }
+    assert "Token budget task_output: 1 values" in budget.format_summary()
+
+
+def test_keyword_list_is_counted_against_the_test_cases_budget(monkeypatch):
+    """
+    Test that the full keyword list returned without arguments is fit to the budget.
+    """
+    # pylint: disable=import-outside-toplevel
+    from types import SimpleNamespace
+
+    from src.agent_torero import budget as src_budget
+    from src.agent_torero.tools import keywords as keywords_tool
+
+    all_keywords = [f"keyword number {n}" for n in range(500)]
+    search = SimpleNamespace(get_all_keywords=lambda: all_keywords)
+    monkeypatch.setattr(
+        keywords_tool, "get_test_case_index", lambda: SimpleNamespace(get=lambda: search)
+    )
+    budget = src_budget.TokenBudget(limit=1000)
+
+    result = keywords_tool.TestCaseSearchTool(token_budget=budget)._run()
+
+    assert result[0] == "keyword number 0"
+    assert result[-1].endswith("more items trimmed]")
+    assert count_tokens(result) <= budget.source_limit("test_cases")
+    assert budget.summary()["test_cases"]["trimmed_values"] == 1
@@ -0,0 +1,50 @@
+"""
+Unit tests for the persistent LRU cache.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add the src directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+# pylint: disable=wrong-import-position
+from agent_torero.cache import DiskLRUCache
+
+
+def test_cache_round_trip_and_lru_eviction(tmp_path):
+    """
+    Test that values round-trip and the least recently used entry is evicted first.
+    """
+    cache = DiskLRUCache(tmp_path / "cache.sqlite3", max_bytes=10)
+    cache.set("a", b"aaaa", {"etag": "1"})
+    cache.set("b", b"bbbb")
+    assert cache.get("a") == (b"aaaa", {"etag": "1"})
+
+    cache.set("c", b"cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+    cache.set("huge", b"x" * 11)
+    assert cache.get("huge") is None
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["bytes"] == 8
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3
+    assert stats["misses"] == 2
+
+
+def test_cache_ttl(tmp_path):
+    """
+    Test that entries older than the TTL are treated as missing.
+    """
+    cache = DiskLRUCache(tmp_path / "cache.sqlite3", max_bytes=100, ttl_seconds=0.05)
+    cache.set("a", b"value")
+    assert cache.get("a") is not None
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,116 @@
+"""
+Unit tests for the diff-driven test case selection.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the src directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+# pylint: disable=wrong-import-position
+from agent_torero.handlers.diff_selector import (DiffTestCaseSelector,
+                                                 extract_diff_terms)
+from agent_torero.handlers.keywords import SearchTestCases
+
+DIFF = """diff --git a/src/client/storage/rlocalstorage.js b/src/client/storage/rlocalstorage.js
+index 1111111..2222222 100644
+--- a/src/client/storage/rlocalstorage.js
++++ b/src/client/storage/rlocalstorage.js
+@@ -10,7 +10,9 @@ function RLocalStorage() {
+   var _substorages = [];
+-  function getData(query) {
++  function getCookieData(query) {
++    log("serialize cookie substorage requests");
+     return _pending.then(function () {
+diff --git a/scripts/publish/config/provider.json b/scripts/publish/config/provider.json
+index 3333333..4444444 100644
+--- a/scripts/publish/config/provider.json
++++ b/scripts/publish/config/provider.json
+@@ -1,3 +1,3 @@
+-  "storage_subdomain": 3,
++  "storage_subdomain": 0,
+"""
+
+
+@pytest.fixture
+def search(tmp_path):
+    """
+    Fixture creating a SearchTestCases over a small synthetic knowledge base.
+    """
+    (tmp_path / "test_cases.csv").write_text(
+        "ID;Title;Summary;SearchKeywords\n"
+        "C1;Cookie storage;Verify cookies are stored;cookie storage, cookies\n"
+        "C2;Local storage;Verify local storage;local storage\n"
+        "C3;Substorage;Verify substorage is disabled;storage subdomain, substorage\n"
+        "C4;Audio;Verify audio playback;audio\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "all_keywords.txt").write_text(
+        "audio\ncookie storage\ncookies\nlocal storage\nstorage subdomain\nsubstorage\n",
+        encoding="utf-8",
+    )
+    return SearchTestCases(tmp_path / "test_cases.csv", tmp_path / "all_keywords.txt")
+
+
+def test_extract_diff_terms():
+    """
+    Test that paths, identifiers and string literals are split into weighted terms.
+    """
+    terms = extract_diff_terms(DIFF)
+    assert {"storage", "rlocalstorage", "cookie", "substorage", "subdomain"} <= set(terms)
+    assert terms["storage"] > terms["substorage"]
+    assert "function" not in terms
+    assert "index" not in terms
+
+
+def test_extract_diff_terms_from_paths_with_spaces():
+    """
+    Test that the terms of paths containing spaces are extracted like DiffIndex parses them.
+    """
+    # pylint: disable=import-outside-toplevel
+    from agent_torero.handlers.github import DiffIndex
+
+    diff = (
+        "diff --git a/docs/cookie policy.md b/docs/cookie policy.md\n"
+        "--- a/docs/cookie policy.md\n+++ b/docs/cookie policy.md\n"
+        "@@ -1 +1 @@\n-a\n+b\n"
+        "diff --git a/legacy widget.js b/sub storage/fresh widget.js\n"
+        "rename from legacy widget.js\nrename to sub storage/fresh widget.js\n"
+    )
+    terms = extract_diff_terms(diff)
+    assert {"cookie", "policy", "docs", "sub", "storage", "legacy", "fresh", "widget"} <= set(terms)
+    assert terms["cookie"] == terms["policy"]
+    assert [entry["path"] for entry in DiffIndex(diff).summary()] == [
+        "docs/cookie policy.md",
+        "sub storage/fresh widget.js",
+    ]
+
+
+# pylint: disable=redefined-outer-name
+def test_selector_ranks_test_cases_for_diff(search):
+    """
+    Test that the selector matches keywords and returns ranked test cases.
+    """
+    selection = DiffTestCaseSelector(search).select(DIFF, top_k=3)
+
+    keywords = [k["keyword"] for k in selection["keywords"]]
+    assert "cookie storage" in keywords
+    assert "storage subdomain" in keywords
+    assert "audio" not in keywords
+    assert [tc["ID"] for tc in selection["test_cases"]][:1] in (["C1"], ["C3"])
+    assert "C4" not in [tc["ID"] for tc in selection["test_cases"]]
+    assert selection["confidence"] == 1.0
+
+
+# pylint: disable=redefined-outer-name
+def test_selector_has_no_confidence_without_matches(search):
+    """
+    Test that an unrelated diff yields no test cases and zero confidence.
+    """
+    diff = "diff --git a/README.md b/README.md\n+Fixed a typo in the docs.\n"
+    selection = DiffTestCaseSelector(search).select(diff)
+    assert not selection["test_cases"]
+    assert selection["confidence"] == 0.0
@@ -0,0 +1,476 @@
+"""
+Unit tests for the GitHub handler.
+"""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Add the src directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+# pylint: disable=wrong-import-position
+from src.agent_torero import config
+from src.agent_torero.handlers.github_graphql import GitHubGraphQLHandler
+from src.agent_torero.ratelimit import get_scheduler
+from agent_torero.cache import DiskLRUCache
+from agent_torero.handlers import github
+
+
+class _ScriptedHandler(BaseHTTPRequestHandler):
+    """
+    HTTP handler replying with the next scripted (status, headers, body) per path.
+    """
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """
+        Serve the next scripted response for the requested path.
+        """
+        server = self.server
+        time.sleep(server.delay)
+        with server.lock:
+            server.requests.append((self.path, dict(self.headers)))
+            script = server.scripts.get((self.path, self.headers.get("Accept")))
+            if script is None:
+                script = server.scripts.get(self.path, [])
+            status, headers, body = script.pop(0) if len(script) > 1 else script[0]
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """
+        Record the JSON body and serve the next scripted response for the path.
+        """
+        length = int(self.headers.get("Content-Length", 0))
+        with self.server.lock:
+            self.server.bodies.append(json.loads(self.rfile.read(length) or b"null"))
+        self.do_GET()
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        """
+        Keep test output quiet.
+        """
+
+
+@pytest.fixture
+def server():
+    """
+    Fixture running a local HTTP server with scripted responses.
+
+    Scripts are keyed by path, or by (path, Accept header) to serve media types apart.
+    """
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _ScriptedHandler)
+    httpd.delay = 0.0
+    httpd.lock = threading.Lock()
+    httpd.scripts = {}
+    httpd.requests = []
+    httpd.bodies = []
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+# pylint: disable=redefined-outer-name
+def test_session_retries_transient_errors(server):
+    """
+    Test that the shared session retries 5xx and secondary rate limit responses.
+    """
+    server.scripts["/flaky"] = [
+        (503, {}, b"unavailable"),
+        (403, {"Retry-After": "0"}, b"secondary rate limit"),
+        (200, {}, b"ok"),
+    ]
+    server.scripts["/forbidden"] = [(403, {}, b"forbidden")]
+
+    session = github.get_session()
+    bucket = get_scheduler().bucket("github")
+    acquired = bucket.metrics()["acquired"]
+    response = session.get(f"{server.url}/flaky", timeout=5)
+    assert response.status_code == 200
+    assert response.text == "ok"
+    # Every attempt, retries included, waits for a token of the bucket.
+    assert bucket.metrics()["acquired"] == acquired + 3
+
+    # A plain 403 without Retry-After is a permanent failure.
+    response = session.get(f"{server.url}/forbidden", timeout=5)
+    assert response.status_code == 403
+    assert [path for path, _ in server.requests].count("/forbidden") == 1
+
+
+def test_session_is_shared():
+    """
+    Test that every caller gets the same pooled session.
+    """
+    assert github.get_session() is github.get_session()
+
+
+# pylint: disable=redefined-outer-name
+def test_response_cache_serves_not_modified_from_disk(server, tmp_path):
+    """
+    Test that cached bodies are revalidated with If-None-Match and 304s served from disk.
+    """
+    server.scripts["/repos/o/r/pulls/1"] = [
+        (200, {"ETag": '"v1"', "Content-Type": "application/json"}, b'{"title": "T"}'),
+        (304, {"ETag": '"v1"'}, b""),
+    ]
+    cache = github.GitHubResponseCache(DiskLRUCache(tmp_path / "http.sqlite3", 1024))
+    session = github.get_session()
+    url = f"{server.url}/repos/o/r/pulls/1"
+    headers = {"Authorization": "Bearer t", "Accept": "application/json"}
+
+    first = cache.get(session, url, headers, timeout=5)
+    second = cache.get(session, url, headers, timeout=5)
+
+    assert first.json() == second.json() == {"title": "T"}
+    assert second.status_code == 200
+    assert "If-None-Match" not in server.requests[0][1]
+    assert server.requests[1][1]["If-None-Match"] == '"v1"'
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["bytes_saved"] == len(b'{"title": "T"}')
+
+    # A different media type is a different cache entry.
+    other = dict(headers, Accept="application/vnd.github.v3.diff")
+    assert cache.cache_key(url, other) != cache.cache_key(url, headers)
+
+
+SAMPLE_DIFF = (
+    "diff --git a/one.py b/one.py\n"
+    "index 1111111..2222222 100644\n"
+    "--- a/one.py\n"
+    "+++ b/one.py\n"
+    "@@ -1,2 +1,2 @@\n"
+    "-old = 1\n"
+    "+new = 1\n"
+    "diff --git a/two.py b/two.py\n"
+    "index 3333333..4444444 100644\n"
+    "--- a/two.py\n"
+    "+++ b/two.py\n"
+    "@@ -1,2 +1,2 @@\n"
+    "-a = 1\n"
+    "+a = 2\n"
+    "@@ -10,2 +10,2 @@ def f():\n"
+    "-b = 1\n"
+    "+b = 2\n"
+    "diff --git a/logo.png b/logo.png\n"
+    "index 5555555..6666666 100644\n"
+    "Binary files a/logo.png and b/logo.png differ\n"
+)
+
+
+def _chunks(text: str, size: int = 7):
+    data = text.encode("utf-8")
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+def test_read_diff_without_budget_keeps_everything():
+    """
+    Test that an unlimited budget returns the whole diff with every file included.
+    """
+    diff, manifest, raw = github.read_diff_within_budget(_chunks(SAMPLE_DIFF), 0)
+    assert diff == SAMPLE_DIFF
+    assert raw == SAMPLE_DIFF.encode("utf-8")
+    assert manifest["complete"]
+    assert manifest["included"] == ["one.py", "two.py", "logo.png"]
+    assert not manifest["truncated"]
+    assert not manifest["skipped"]
+
+
+def test_read_diff_cuts_on_hunk_boundary():
+    """
+    Test that the budget cuts between hunks and reports the truncated file.
+    """
+    cut = SAMPLE_DIFF.index("@@ -10,2")
+    diff, manifest, _ = github.read_diff_within_budget(_chunks(SAMPLE_DIFF), cut + 5)
+    assert diff == SAMPLE_DIFF[:cut]
+    assert not manifest["complete"]
+    assert manifest["bytes"] == cut
+    assert manifest["included"] == ["one.py"]
+    assert manifest["truncated"] == ["two.py"]
+    assert not manifest["skipped"]
+
+
+def test_read_diff_skips_file_that_does_not_fit_and_stops_reading():
+    """
+    Test that a file whose first hunk does not fit is skipped and the stream is left unread.
+    """
+    read = []
+
+    def chunks():
+        for chunk in _chunks(SAMPLE_DIFF):
+            read.append(chunk)
+            yield chunk
+
+    second = SAMPLE_DIFF.index("diff --git a/two.py")
+    diff, manifest, _ = github.read_diff_within_budget(chunks(), second + 20)
+    assert diff == SAMPLE_DIFF[:second]
+    assert manifest["included"] == ["one.py"]
+    assert manifest["skipped"] == ["two.py"]
+    assert len(b"".join(read)) < len(SAMPLE_DIFF)
+
+
+def test_diff_index_summarizes_files():
+    """
+    Test that the diff index lists every file with its change type and line counts.
+    """
+    diff = (
+        SAMPLE_DIFF + "diff --git a/new.txt b/new.txt\n"
+        "new file mode 100644\n"
+        "index 0000000..7777777\n"
+        "--- /dev/null\n"
+        "+++ b/new.txt\n"
+        "@@ -0,0 +1,2 @@\n"
+        "+first\n"
+        "+second\n"
+    )
+    index = github.DiffIndex(diff)
+    summary = {entry["path"]: entry for entry in index.summary()}
+
+    assert list(summary) == ["one.py", "two.py", "logo.png", "new.txt"]
+    assert summary["two.py"]["hunks"] == 2
+    assert (summary["two.py"]["additions"], summary["two.py"]["deletions"]) == (2, 2)
+    assert summary["logo.png"]["binary"] and summary["logo.png"]["hunks"] == 0
+    assert summary["new.txt"]["change_type"] == "added"
+    assert (summary["new.txt"]["additions"], summary["new.txt"]["deletions"]) == (2, 0)
+    assert sum(entry["bytes"] for entry in summary.values()) == len(diff)
+    assert index.hunk("two.py", 2) == "@@ -10,2 +10,2 @@ def f():\n-b = 1\n+b = 2\n"
+
+
+def test_diff_index_pages_hunks():
+    """
+    Test that a file's hunks are paged by size, each page starting with the file header.
+    """
+    index = github.DiffIndex(SAMPLE_DIFF)
+    header = "diff --git a/two.py b/two.py\nindex 3333333..4444444 100644\n"
+    header += "--- a/two.py\n+++ b/two.py\n"
+
+    whole = index.page("two.py", page_bytes=1000)
+    assert whole["pages"] == 1 and whole["hunks"] == [1, 2]
+    assert whole["diff"] == header + index.hunk("two.py", 1) + index.hunk("two.py", 2)
+
+    first = index.page("two.py", 1, page_bytes=30)
+    second = index.page("two.py", 2, page_bytes=30)
+    assert first["pages"] == second["pages"] == 2
+    assert first["diff"] == header + index.hunk("two.py", 1)
+    assert second["hunks"] == [2, 2]
+    assert second["diff"] == header + index.hunk("two.py", 2)
+
+    assert index.page("logo.png")["diff"].endswith("differ\n")
+    with pytest.raises(IndexError):
+        index.page("two.py", 3, page_bytes=30)
+    with pytest.raises(KeyError):
+        index.page("missing.py")
+
+
+# pylint: disable=redefined-outer-name
+def test_pr_bundle_fetches_endpoints_concurrently(server, monkeypatch):
+    """
+    Test that the bundle merges details, diff, files and commits fetched in parallel.
+    """
+    monkeypatch.setitem(config.CONFIG, "GITHUB_TOKEN", "t")
+    monkeypatch.setitem(config.CONFIG, "GITHUB_CACHE", "false")
+    budget = SAMPLE_DIFF.index("diff --git a/two.py")
+    monkeypatch.setitem(config.CONFIG, "MAX_DIFF_SIZE", str(budget))
+    pr_path = "/repos/o/r/pulls/7"
+    server.scripts[(pr_path, "application/vnd.github.v3+json")] = [
+        (200, {}, b'{"title": "RBI-1: Fix", "body": null, "head": {"ref": "rbi-2-fix"}}')
+    ]
+    server.scripts[(pr_path, "application/vnd.github.v3.diff")] = [
+        (200, {}, SAMPLE_DIFF.encode("utf-8"))
+    ]
+    server.scripts[f"{pr_path}/files?per_page=100&page=1"] = [
+        (200, {}, b'[{"filename": "one.py"}, {"filename": "two.py"}, {"filename": "logo.png"}]')
+    ]
+    server.scripts[f"{pr_path}/commits?per_page=100&page=1"] = [
+        (200, {}, b'[{"sha": "abc", "commit": {"message": "RBI-3: Part two"}}]')
+    ]
+    server.delay = 0.4
+    handler = github.GitHubHandler(pull_number=7, repo_name="r", owner="o")
+    handler.pr_url = f"{server.url}{pr_path}"
+
+    started = time.perf_counter()
+    bundle = handler.fetch_pr_bundle()
+    elapsed = time.perf_counter() - started
+
+    # Four serial requests would take at least 1.6 seconds.
+    assert elapsed < 2 * server.delay
+    assert bundle["pr_details"]["branch"] == "rbi-2-fix"
+    assert bundle["pr_details"]["jira_tickets"] == ["RBI-1", "RBI-2", "RBI-3"]
+    assert [file["path"] for file in bundle["files"]] == ["one.py", "two.py", "logo.png"]
+    assert bundle["commits"] == [{"sha": "abc", "message": "RBI-3: Part two"}]
+    manifest = bundle["diff_index"].manifest
+    assert manifest["included"] == ["one.py"]
+    assert manifest["skipped"] == ["two.py", "logo.png"]
+    assert not bundle["errors"]
+
+
+def _graphql_page(pull_request: dict) -> tuple:
+    """Build a scripted GraphQL response around a pullRequest object."""
+    data = {
+        "rateLimit": {"cost": 1, "remaining": 4999, "resetAt": "2026-01-01T00:00:00Z"},
+        "repository": {"pullRequest": pull_request},
+    }
+    return (200, {"Content-Type": "application/json"}, json.dumps({"data": data}).encode())
+
+
+# pylint: disable=redefined-outer-name
+def test_graphql_bundle_follows_cursors_and_reports_cost(server, monkeypatch):
+    """
+    Test that the GraphQL backend fetches metadata in one query plus the missing pages.
+    """
+    monkeypatch.setitem(config.CONFIG, "GITHUB_TOKEN", "t")
+    monkeypatch.setitem(config.CONFIG, "GITHUB_CACHE", "false")
+    pr_path = "/repos/o/r/pulls/9"
+    server.scripts[(pr_path, "application/vnd.github.v3.diff")] = [
+        (200, {}, SAMPLE_DIFF.encode("utf-8"))
+    ]
+    server.scripts["/graphql"] = [
+        _graphql_page(
+            {
+                "title": "Fix storage",
+                "body": None,
+                "headRefName": "feature/rbi-12-storage",
+                "baseRefName": "main",
+                "headRefOid": "head",
+                "baseRefOid": "base",
+                "closingIssuesReferences": {"nodes": []},
+                "files": {
+                    "pageInfo": {"hasNextPage": True, "endCursor": "F1"},
+                    "nodes": [
+                        {"path": "one.py", "additions": 1, "deletions": 1, "changeType": "MODIFIED"}
+                    ],
+                },
+                "commits": {
+                    "pageInfo": {"hasNextPage": False, "endCursor": "C1"},
+                    "nodes": [{"commit": {"oid": "abc", "message": "RBI-34 fixup"}}],
+                },
+            }
+        ),
+        _graphql_page(
+            {
+                "files": {
+                    "pageInfo": {"hasNextPage": False, "endCursor": "F2"},
+                    "nodes": [
+                        {"path": "new.py", "additions": 3, "deletions": 0, "changeType": "ADDED"}
+                    ],
+                },
+            }
+        ),
+    ]
+    handler = GitHubGraphQLHandler(pull_number=9, repo_name="r", owner="o")
+    handler.pr_url = f"{server.url}{pr_path}"
+    handler.graphql_url = f"{server.url}/graphql"
+
+    bundle = handler.fetch_pr_bundle()
+
+    details = bundle["pr_details"]
+    assert (details["head_sha"], details["base_sha"]) == ("head", "base")
+    assert details["jira_tickets"] == ["RBI-12", "RBI-34"]
+    assert bundle["files"] == [
+        {"path": "one.py", "status": "modified", "additions": 1, "deletions": 1},
+        {"path": "new.py", "status": "added", "additions": 3, "deletions": 0},
+    ]
+    assert bundle["commits"] == [{"sha": "abc", "message": "RBI-34 fixup"}]
+    assert bundle["query_cost"]["requests"] == 2
+    assert bundle["query_cost"]["cost"] == 2
+    assert bundle["diff_index"].manifest["complete"]
+
+    follow_up = server.bodies[1]["variables"]
+    assert follow_up["filesCursor"] == "F1"
+    assert not follow_up["withDetails"] and not follow_up["withCommits"]
+
+
+# pylint: disable=redefined-outer-name
+def test_compare_diff_since_last_reviewed_head(server, monkeypatch):
+    """
+    Test that a since_sha diff is fetched from the compare endpoint up to the current head.
+    """
+    monkeypatch.setitem(config.CONFIG, "GITHUB_TOKEN", "t")
+    monkeypatch.setitem(config.CONFIG, "GITHUB_CACHE", "false")
+    server.scripts[("/repos/o/r/pulls/5", "application/vnd.github.v3+json")] = [
+        (200, {}, b'{"title": "T", "body": "", "head": {"ref": "b", "sha": "new"}}')
+    ]
+    server.scripts["/repos/o/r/compare/old...new?per_page=1"] = [
+        (200, {}, b'{"status": "ahead", "ahead_by": 2, "behind_by": 0}')
+    ]
+    delta = SAMPLE_DIFF[SAMPLE_DIFF.index("diff --git a/two.py") :]
+    server.scripts[("/repos/o/r/compare/old...new", "application/vnd.github.v3.diff")] = [
+        (200, {}, delta.encode("utf-8"))
+    ]
+    handler = github.GitHubHandler(pull_number=5, repo_name="r", owner="o")
+    handler.repo_url = f"{server.url}/repos/o/r"
+    handler.pr_url = f"{handler.repo_url}/pulls/5"
+
+    assert handler.fetch_head_sha() == "new"
+    assert handler.compare_commits("old", "new")["status"] == "ahead"
+    index = handler.fetch_pr_diff_index(since_sha="old")
+    assert [entry["path"] for entry in index.summary()] == ["two.py", "logo.png"]
+    assert index.manifest["since_sha"] == "old"
+
+
+# pylint: disable=redefined-outer-name
+def test_cached_diff_index_is_revalidated_against_the_head(server, monkeypatch):
+    """
+    Test that an old diff index is reused while the PR head stays, and downloaded
+    again once the head moved.
+    """
+    monkeypatch.setitem(config.CONFIG, "GITHUB_TOKEN", "t")
+    monkeypatch.setitem(config.CONFIG, "GITHUB_CACHE", "false")
+    monkeypatch.setattr(github, "_diff_indexes", github.OrderedDict())
+    pr_path = "/repos/o/r/pulls/9"
+    details = server.scripts[(pr_path, "application/vnd.github.v3+json")] = [
+        (200, {}, b'{"title": "T", "body": "", "head": {"ref": "b", "sha": "one"}}')
+    ]
+    diff_path = (pr_path, "application/vnd.github.v3.diff")
+    delta = SAMPLE_DIFF[SAMPLE_DIFF.index("diff --git a/two.py") :]
+    server.scripts[diff_path] = [(200, {}, SAMPLE_DIFF.encode("utf-8"))]
+    server.scripts[f"{pr_path}/files?per_page=100&page=1"] = [(200, {}, b"[]")]
+    server.scripts[f"{pr_path}/commits?per_page=100&page=1"] = [(200, {}, b"[]")]
+    handler = github.GitHubHandler(pull_number=9, repo_name="r", owner="o")
+    handler.pr_url = f"{server.url}{pr_path}"
+
+    def downloads():
+        return [path for path, headers in server.requests if headers.get("Accept") == diff_path[1]]
+
+    first = handler.fetch_pr_bundle()["diff_index"]
+    assert handler.fetch_pr_diff_index() is first
+    monkeypatch.setitem(config.CONFIG, "DIFF_INDEX_TTL_SECONDS", "0")
+    assert handler.fetch_pr_diff_index() is first
+    assert len(downloads()) == 1
+
+    details[0] = (200, {}, b'{"title": "T", "body": "", "head": {"ref": "b", "sha": "two"}}')
+    server.scripts[diff_path] = [(200, {}, delta.encode("utf-8"))]
+    second = handler.fetch_pr_diff_index()
+    assert second is not first
+    assert [entry["path"] for entry in second.summary()] == ["two.py", "logo.png"]
+    assert len(downloads()) == 2
+
+
+def test_parse_diff_git_line_handles_spaces():
+    """
+    Test that diff headers are parsed with spaces and ' b/' inside the paths.
+    """
+    assert github.parse_diff_git_line("diff --git a/x.py b/x.py\n") == ("x.py", "x.py")
+    assert github.parse_diff_git_line("diff --git a/a b/c.txt b/a b/c.txt") == (
+        "a b/c.txt",
+        "a b/c.txt",
+    )
+    assert github.parse_diff_git_line("diff --git a/old one.c b/new one.c") == (
+        "old one.c",
+        "new one.c",
+    )
+    assert github.parse_diff_git_line("index 111..222") is None
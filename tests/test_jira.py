@@ -0,0 +1,364 @@
+"""
+Unit tests for the JIRA handler.
+"""
+
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the src directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+# pylint: disable=wrong-import-position
+from src.agent_torero import config
+from src.agent_torero.cache import DiskLRUCache
+from src.agent_torero.handlers.jira import (TICKET_FIELDS, JIRAHandler,
+                                            JIRATicketCache, check_jira_client,
+                                            normalize_jira_text)
+
+
+def _issue(key, comments=2, embedded=None, summary=None, updated="2025-01-01T00:00:00"):
+    """Build an issue JSON as returned by the Jira search API."""
+    bodies = [f"{key} comment {number}" for number in range(comments)]
+    shown = bodies if embedded is None else bodies[:embedded]
+    return {
+        "key": key,
+        "fields": {
+            "summary": summary or f"Summary of {key}",
+            "description": f"Description of {key}",
+            "status": {"name": "Open"},
+            "comment": {"total": len(bodies), "comments": [{"body": body} for body in shown]},
+            "updated": updated,
+        },
+    }
+
+
+class FakeJira:
+    """
+    In-memory stand-in for atlassian.Jira recording the calls made to it.
+    """
+
+    def __init__(self, issues):
+        self.issues = {issue["key"]: issue for issue in issues}
+        self.calls = []
+
+    def jql(self, jql, fields="*all", start=0, limit=None, expand=None, validate_query=None):
+        # pylint: disable=unused-argument,too-many-arguments
+        """Serve a 'key in (...)' search, dropping unknown keys like validateQuery=warn."""
+        self.calls.append(("jql", jql, start, limit, tuple(fields)))
+        keys = re.search(r"key in \((.*)\)", jql).group(1).split(", ")
+        found = [
+            {
+                "key": key,
+                "fields": {
+                    name: value
+                    for name, value in self.issues[key]["fields"].items()
+                    if name in fields
+                },
+            }
+            for key in keys
+            if key in self.issues
+        ]
+        return {"total": len(found), "issues": found[start : start + (limit or 50)]}
+
+    def issue_get_comments(self, key):
+        """Return every comment of an issue."""
+        self.calls.append(("comments", key))
+        total = self.issues[key]["fields"]["comment"]["total"]
+        return {"comments": [{"body": f"{key} comment {number}"} for number in range(total)]}
+
+
+@pytest.fixture
+def jira_handler(monkeypatch):
+    """
+    Fixture creating a JIRAHandler whose client is replaced by a FakeJira.
+    """
+    monkeypatch.setitem(config.CONFIG, "JIRA_SERVER", "https://jira.example.com")
+    monkeypatch.setitem(config.CONFIG, "JIRA_USER_EMAIL", "user@example.com")
+    monkeypatch.setitem(config.CONFIG, "JIRA_API_TOKEN", "token")
+    monkeypatch.setitem(config.CONFIG, "JIRA_CACHE", "false")
+    handler = JIRAHandler()
+    handler.jira = FakeJira(
+        [_issue(f"RBI-{number}") for number in range(1, 60)] + [_issue("RBI-99", 5, embedded=2)]
+    )
+    return handler
+
+
+# pylint: disable=redefined-outer-name
+def test_bulk_search_projects_fields_and_reports_missing_keys(jira_handler, monkeypatch):
+    """
+    Test that tickets are fetched with paged JQL searches and missing keys become errors.
+    """
+    monkeypatch.setattr("src.agent_torero.handlers.jira.JQL_PAGE_SIZE", 20)
+    ids = [f"RBI-{number}" for number in range(1, 50)] + ["RBI-404", "rbi-99", "not a key"]
+
+    results = jira_handler.fetch_tickets_details(ids)
+
+    searches = [call for call in jira_handler.jira.calls if call[0] == "jql"]
+    assert [call[2] for call in searches] == [0, 20, 40]
+    assert all(call[4] == tuple(TICKET_FIELDS) for call in searches)
+    assert len(results) == 52
+    assert results[0] == {
+        "id": "RBI-1",
+        "summary": "Summary of RBI-1",
+        "description": "Description of RBI-1",
+        "status": "Open",
+        "comments": ["RBI-1 comment 0", "RBI-1 comment 1"],
+    }
+    assert results[49] == {"id": "RBI-404", "error": "Ticket RBI-404 not found"}
+    assert len(results[50]["comments"]) == 5  # Truncated embedded comments are refetched.
+    assert ("comments", "RBI-99") in jira_handler.jira.calls
+    assert "error" in results[51]
+
+
+def test_failed_search_falls_back_to_single_fetches(jira_handler, monkeypatch):
+    """
+    Test that a failing JQL search falls back to fetching the tickets one by one.
+    """
+
+    def failing_jql(*args, **kwargs):
+        raise RuntimeError("search is down")
+
+    def issue(key, fields=None):  # pylint: disable=unused-argument
+        return jira_handler.jira.issues[key]
+
+    monkeypatch.setattr(jira_handler.jira, "jql", failing_jql, raising=False)
+    monkeypatch.setattr(jira_handler.jira, "issue", issue, raising=False)
+
+    results = jira_handler.fetch_tickets_details(["RBI-1", "RBI-2"])
+
+    assert [result["id"] for result in results] == ["RBI-1", "RBI-2"]
+    assert results[1]["comments"] == ["RBI-2 comment 0", "RBI-2 comment 1"]
+
+
+def test_ticket_cache_revalidates_with_updated_time(jira_handler, tmp_path):
+    """
+    Test that cached tickets are served after an 'updated'-only search and refetched
+    when they changed, or once their entry expired.
+    """
+    cache = JIRATicketCache(DiskLRUCache(tmp_path / "jira.sqlite3", 1024 * 1024), 3600, 1)
+    jira = jira_handler.jira
+
+    first = jira_handler.search_tickets(["RBI-1", "RBI-2"], cache=cache)
+    jira.calls.clear()
+    jira.issues["RBI-2"] = _issue("RBI-2", summary="Changed", updated="2025-02-01T00:00:00")
+    second = jira_handler.search_tickets(["RBI-1", "RBI-2"], cache=cache)
+
+    assert second[0] == first[0]
+    assert second[1]["summary"] == "Changed"
+    searches = [(call[1], call[4]) for call in jira.calls if call[0] == "jql"]
+    assert searches == [
+        ("key in (RBI-1, RBI-2)", ("updated",)),
+        ("key in (RBI-2)", tuple(TICKET_FIELDS)),
+    ]
+    stats = cache.stats()
+    assert (stats["hits"], stats["stale"], stats["misses"]) == (1, 1, 2)
+    assert stats["hit_rate"] == 0.25
+    assert stats["memory_hits"] == 0  # RBI-1 was evicted from memory by RBI-2.
+    assert stats["memory_entries"] == 1  # The memory front is bounded, the disk store is not.
+    assert stats["entries"] == 2
+
+    jira_handler.search_tickets(["RBI-2"], cache=cache)
+    assert cache.stats()["memory_hits"] == 1
+
+    cache.ttl_seconds = 0
+    jira.calls.clear()
+    jira_handler.search_tickets(["RBI-1"], cache=cache)
+    assert [call[4] for call in jira.calls if call[0] == "jql"] == [tuple(TICKET_FIELDS)]
+
+
+def test_client_is_shared_and_rebuilt_on_credential_change(monkeypatch):
+    """
+    Test that handlers share one Jira client until the server or credentials change,
+    and that a failing health check drops it.
+    """
+    monkeypatch.setitem(config.CONFIG, "JIRA_SERVER", "https://jira.example.com")
+    monkeypatch.setitem(config.CONFIG, "JIRA_USER_EMAIL", "user@example.com")
+    monkeypatch.setitem(config.CONFIG, "JIRA_API_TOKEN", "pool-token")
+    monkeypatch.setitem(config.CONFIG, "JIRA_POOL_SIZE", "3")
+
+    client = JIRAHandler().jira
+    assert JIRAHandler().jira is client
+    adapter = client.session.get_adapter("https://jira.example.com/rest/api/2/search")
+    assert adapter.bucket_name == "jira"
+    assert adapter._pool_maxsize == 3  # pylint: disable=protected-access
+    assert adapter.max_retries.total == 3
+
+    monkeypatch.setitem(config.CONFIG, "JIRA_API_TOKEN", "rotated")
+    rotated = JIRAHandler().jira
+    assert rotated is not client
+
+    def unreachable():
+        raise ConnectionError("connection refused")
+
+    monkeypatch.setattr(rotated, "myself", unreachable)
+    assert not check_jira_client()
+    assert JIRAHandler().jira is not rotated
+
+
+def _graph_issue(key, parent=None, subtasks=(), blocks=(), blocked_by=()):
+    """Build an issue JSON with the fields followed by the linked-issue graph."""
+    block = {"name": "Blocks", "inward": "is blocked by", "outward": "blocks"}
+    return {
+        "key": key,
+        "fields": {
+            "summary": f"Summary of {key}",
+            "status": {"name": "Open"},
+            "issuetype": {"name": "Task"},
+            "parent": {"key": parent} if parent else None,
+            "subtasks": [{"key": subtask} for subtask in subtasks],
+            "issuelinks": [{"type": block, "outwardIssue": {"key": other}} for other in blocks]
+            + [{"type": block, "inwardIssue": {"key": other}} for other in blocked_by],
+        },
+    }
+
+
+def test_issue_graph_is_expanded_breadth_first_within_limits(jira_handler):
+    """
+    Test that the linked-issue graph is fetched level by level with bounded depth and size.
+    """
+    jira_handler.jira = FakeJira(
+        [
+            _graph_issue("RBI-1", parent="RBI-10", blocks=["RBI-2"]),
+            _graph_issue("RBI-2", blocked_by=["RBI-1"], blocks=["RBI-3"]),
+            _graph_issue("RBI-3", blocked_by=["RBI-2"], blocks=["RBI-4"]),
+            _graph_issue("RBI-4", blocked_by=["RBI-3"]),
+            _graph_issue("RBI-10", subtasks=["RBI-1", "RBI-11"]),
+            _graph_issue("RBI-11", parent="RBI-10"),
+        ]
+    )
+
+    graph = jira_handler.expand_issue_graph(["rbi-1", "RBI-404"], max_depth=2, max_nodes=10)
+
+    assert [(node["key"], node["depth"]) for node in graph["nodes"]] == [
+        ("RBI-1", 0),
+        ("RBI-10", 1),
+        ("RBI-2", 1),
+        ("RBI-11", 2),
+        ("RBI-3", 2),
+    ]
+    assert graph["edges"] == [
+        ["RBI-1", "parent", "RBI-10"],
+        ["RBI-1", "blocks", "RBI-2"],
+        ["RBI-10", "subtask", "RBI-11"],
+        ["RBI-2", "blocks", "RBI-3"],
+    ]
+    assert graph["missing"] == ["RBI-404"]
+    assert not graph["truncated"]
+    searches = [call[1] for call in jira_handler.jira.calls if call[0] == "jql"]
+    assert searches == [
+        "key in (RBI-1, RBI-404)",
+        "key in (RBI-10, RBI-2)",
+        "key in (RBI-11, RBI-3)",
+    ]
+
+    small = jira_handler.expand_issue_graph(["RBI-1"], max_depth=5, max_nodes=2)
+    assert [node["key"] for node in small["nodes"]] == ["RBI-1", "RBI-10"]
+    assert small["truncated"]
+
+
+def test_normalize_wiki_markup_drops_noise():
+    """
+    Test that wiki markup is reduced to plain text without images, quotes or long logs.
+    """
+    log = "\n".join(f"12:00:{second:02} DEBUG request {second}" for second in range(30))
+    text = (
+        "h2. Problem\n"
+        "Start time is high on [this page|https://example.com/page] !screen.png|thumbnail!\n"
+        f"{{code:java}}\n{log}\n{{code}}\n"
+        "{quote}An earlier comment{quote}\n"
+        "bq. Quoted reply\n"
+        "{noformat}exit code 1{noformat}\n\n\n"
+        "{color:red}Fixed{color} in build 5"
+    )
+
+    plain, dropped = normalize_jira_text(text, 1000)
+
+    assert plain == (
+        "Problem\nStart time is high on this page\n[30 lines of code or logs omitted]\n"
+        "exit code 1\n\nFixed in build 5"
+    )
+    assert dropped == len(text) - len(plain)
+    assert normalize_jira_text(text, 20) == ("Problem\nStart time…", len(text) - 19)
+
+
+def test_normalize_adf_document():
+    """
+    Test that ADF documents are reduced to plain text without media or quotes.
+    """
+    document = {
+        "type": "doc",
+        "content": [
+            {
+                "type": "paragraph",
+                "content": [
+                    {"type": "text", "text": "Assigned to "},
+                    {"type": "mention", "attrs": {"text": "@dev"}},
+                ],
+            },
+            {"type": "mediaSingle", "content": [{"type": "media"}]},
+            {"type": "codeBlock", "content": [{"type": "text", "text": "make test"}]},
+            {"type": "blockquote", "content": [{"type": "text", "text": "old"}]},
+        ],
+    }
+
+    assert normalize_jira_text(document, 100)[0] == "Assigned to @dev\nmake test"
+
+
+def test_ticket_keeps_newest_comments_within_budget(jira_handler, monkeypatch):
+    """
+    Test that only the newest comments fitting the per-ticket budget are kept.
+    """
+    monkeypatch.setitem(config.CONFIG, "JIRA_MAX_COMMENTS", "3")
+    monkeypatch.setitem(config.CONFIG, "JIRA_TICKET_CHAR_BUDGET", "60")
+    jira_handler.jira = FakeJira([_issue("RBI-1", comments=6)])
+
+    ticket = jira_handler.fetch_tickets_details(["RBI-1"])[0]
+
+    assert ticket["description"] == "Description of RBI-1"
+    assert ticket["comments"] == ["RBI-1 comment 4", "RBI-1 comment 5"]
+    assert ticket["dropped"] == {"comments": 4, "characters": 4 * len("RBI-1 comment 0")}
+
+
+def test_upsert_comments_edits_the_marked_comment(jira_handler):
+    """
+    Test that a review comment is edited when a comment with its marker exists,
+    and added otherwise, with one comment listing per ticket.
+    """
+    calls = []
+    existing = [
+        {"id": "7", "body": "Looks good"},
+        {"id": "9", "body": "Old review\n\n----\n{{agent-torero-review: repo#1}}"},
+        {"id": "11", "body": "Review\n\n----\n{{agent-torero-review: repo#123}}"},
+    ]
+
+    class CommentJira:
+        """Stand-in for atlassian.Jira comment calls."""
+
+        def issue_get_comments(self, key):
+            calls.append(("get", key))
+            return {"comments": existing}
+
+        def issue_add_comment(self, key, text):
+            calls.append(("add", key, text))
+            return {"id": "10"}
+
+        def issue_edit_comment(self, key, comment_id, text, notify_users=True):
+            calls.append(("edit", key, comment_id, text, notify_users))
+
+    jira_handler.jira = CommentJira()
+
+    ids = jira_handler.upsert_comments(
+        "RBI-1", {"repo#1": "New review", "repo#2": "Other", "repo#12": "Prefix"}
+    )
+
+    assert ids == {"repo#1": "9", "repo#2": "10", "repo#12": "10"}
+    assert calls == [
+        ("get", "RBI-1"),
+        ("edit", "RBI-1", "9", "New review\n\n----\n{{agent-torero-review: repo#1}}", False),
+        ("add", "RBI-1", "Other\n\n----\n{{agent-torero-review: repo#2}}"),
+        # The comment of repo#123 is not taken for the one of repo#12.
+        ("add", "RBI-1", "Prefix\n\n----\n{{agent-torero-review: repo#12}}"),
+    ]
@@ -2,17 +2,24 @@
 Unit tests for the SearchTestCases class.
 """
 
+import os
+import random
+import re
 import sys
 from pathlib import Path
 
+import pandas as pd
 import pytest
 
 # Add the src directory to the Python path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+from src.agent_torero import config
 from src.agent_torero.config import get_config
 
 # pylint: disable=wrong-import-position
-from agent_torero.handlers.keywords import SearchTestCases
+from agent_torero.handlers.keywords import (KeywordResolver, SearchTestCases,
+                                            TestCaseIndex)
+from agent_torero.handlers.keywords_db import TestCasesDB
 
 
 @pytest.fixture
@@ -58,3 +65,329 @@ def test_filter_by_keywords_not_found(search_test_cases):
     results = search_test_cases.filter_by_keywords(keywords)
     assert isinstance(results, list)
     assert not results
+
+
+def _write_test_cases(directory: Path, rows: list[tuple[str, str, str, str]]) -> Path:
+    """
+    Write a small semicolon separated test cases CSV and return its path.
+    """
+    csv_path = directory / "test_cases.csv"
+    lines = ["ID;Title;Summary;SearchKeywords"]
+    lines.extend(";".join(row) for row in rows)
+    csv_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return csv_path
+
+
+@pytest.fixture
+def knowledge_dir(tmp_path):
+    """
+    Fixture creating a synthetic knowledge directory with test cases and keywords.
+    """
+    _write_test_cases(
+        tmp_path,
+        [
+            ("C1", "Login", "Verify login", "3rd party auth flow, login"),
+            ("C2", "Push", "Verify push", "push_mode, websocket"),
+        ],
+    )
+    (tmp_path / "all_keywords.txt").write_text(
+        "3rd party auth flow\nlogin\npush_mode\nwebsocket\n", encoding="utf-8"
+    )
+    return tmp_path
+
+
+# pylint: disable=redefined-outer-name
+def test_index_loads_once(knowledge_dir):
+    """
+    Test that the shared index parses the files once and serves later calls from memory.
+    """
+    index = TestCaseIndex(
+        knowledge_dir / "test_cases.csv", knowledge_dir / "all_keywords.txt"
+    )
+    first = index.get()
+    second = index.get()
+    assert first is second
+    stats = index.stats()
+    assert stats["loads"] == 1
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+    assert stats["last_load_seconds"] > 0
+
+
+# pylint: disable=redefined-outer-name
+def test_index_reloads_on_file_change(knowledge_dir):
+    """
+    Test that the shared index reloads when the CSV changes on disk.
+    """
+    csv_path = knowledge_dir / "test_cases.csv"
+    index = TestCaseIndex(csv_path, knowledge_dir / "all_keywords.txt")
+    first = index.get()
+    assert len(first.filter_by_keywords(["websocket"])) == 1
+
+    _write_test_cases(
+        knowledge_dir,
+        [
+            ("C1", "Login", "Verify login", "login"),
+            ("C2", "Push", "Verify push", "push_mode, websocket"),
+            ("C3", "Socket", "Verify socket", "websocket"),
+        ],
+    )
+    stat = csv_path.stat()
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    second = index.get()
+    assert second is not first
+    assert len(second.filter_by_keywords(["websocket"])) == 2
+    assert index.stats()["loads"] == 2
+
+
+def _regex_filter(csv_path: Path, keywords: list[str]) -> list[str]:
+    """
+    Reference implementation: the per-query regex scan the inverted index replaced.
+    """
+    df = pd.read_csv(csv_path, sep=";", dtype=str)
+    df["SearchKeywords"] = df["SearchKeywords"].fillna("").astype(str)
+    pattern = "|".join([r"\b" + re.escape(k.strip()) + r"\b" for k in keywords])
+    mask = df["SearchKeywords"].str.contains(pattern, case=False, na=False, regex=True)
+    return df[mask]["ID"].tolist()
+
+
+@pytest.fixture(scope="module")
+def large_knowledge_dir(tmp_path_factory):
+    """
+    Fixture creating a large synthetic test cases CSV with mixed-case, punctuated keywords.
+    """
+    tmp_path = tmp_path_factory.mktemp("large_knowledge")
+    rng = random.Random(1234)
+    vocabulary = [
+        "3rd party auth flow", "3rd Party Authentication Flow", "push_mode", "push",
+        "about:blank", "accept-language", "Ajax mode", "ajax", "audio live streaming",
+        "audio", "badssl", "back button", "cookie", "cookies", "iframe", "c++",
+        "Tab eviction", "automatic tab eviction", "websocket", "web socket", "x-frame",
+    ]
+    rows = []
+    for i in range(20000):
+        keywords = rng.sample(vocabulary, rng.randint(0, 4))
+        rows.append((f"C{i}", f"Title {i}", f"Summary {i}", ", ".join(keywords)))
+    _write_test_cases(tmp_path, rows)
+    (tmp_path / "all_keywords.txt").write_text("\n".join(vocabulary), encoding="utf-8")
+    return tmp_path
+
+
+@pytest.fixture(scope="module")
+def large_search(large_knowledge_dir):
+    """
+    Fixture creating an in-memory SearchTestCases over the large CSV.
+    """
+    return SearchTestCases(
+        large_knowledge_dir / "test_cases.csv", large_knowledge_dir / "all_keywords.txt"
+    )
+
+
+# pylint: disable=redefined-outer-name
+@pytest.mark.parametrize(
+    "keywords",
+    [
+        ["3rd Party Auth Flow", "push_mode"],
+        ["push"],
+        ["PUSH_MODE"],
+        ["auth"],
+        ["about:blank"],
+        ["blank", "accept"],
+        ["accept-language"],
+        ["ajax mode"],
+        ["audio  live"],
+        ["live streaming"],
+        ["c++"],
+        ["tab"],
+        ["eviction", "cookie"],
+        ["socket"],
+        ["x-frame", "  websocket  "],
+        ["Nonexistent Keyword"],
+        [":"],
+    ],
+)
+def test_inverted_index_matches_regex_scan(large_knowledge_dir, large_search, keywords):
+    """
+    Test that the inverted index returns exactly what the regex scan returned.
+    """
+    csv_path = large_knowledge_dir / "test_cases.csv"
+    results = [row["ID"] for row in large_search.filter_by_keywords(keywords)]
+    assert results == _regex_filter(csv_path, keywords)
+
+
+# pylint: disable=redefined-outer-name
+def test_filter_by_keywords_all_mode_and_hit_counts(large_knowledge_dir, large_search):
+    """
+    Test AND matching and per-keyword hit counts against the regex scan.
+    """
+    csv_path = large_knowledge_dir / "test_cases.csv"
+    search = large_search
+    keywords = ["ajax", "cookie"]
+
+    expected = set(_regex_filter(csv_path, ["ajax"])) & set(
+        _regex_filter(csv_path, ["cookie"])
+    )
+    results = [row["ID"] for row in search.filter_by_keywords(keywords, match="all")]
+    assert set(results) == expected
+    assert search.keyword_hit_counts(keywords) == {
+        "ajax": len(_regex_filter(csv_path, ["ajax"])),
+        "cookie": len(_regex_filter(csv_path, ["cookie"])),
+    }
+    with pytest.raises(ValueError):
+        search.filter_by_keywords(keywords, match="some")
+
+
+@pytest.fixture(scope="module")
+def sqlite_search(large_knowledge_dir, tmp_path_factory):
+    """
+    Fixture creating a SearchTestCases backed by SQLite FTS5 over the large CSV.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setitem(config.CONFIG, "CACHE_DIR", str(tmp_path_factory.mktemp("cache")))
+        yield SearchTestCases(
+            large_knowledge_dir / "test_cases.csv",
+            large_knowledge_dir / "all_keywords.txt",
+            backend="sqlite",
+        )
+
+
+# pylint: disable=redefined-outer-name
+@pytest.mark.parametrize(
+    "keywords",
+    [
+        ["3rd Party Auth Flow", "push_mode"],
+        ["PUSH"],
+        ["about:blank"],
+        ["accept-language", "ajax mode"],
+        ["audio  live"],
+        ["c++"],
+        ["x-frame", "  websocket  "],
+        ["Nonexistent Keyword"],
+    ],
+)
+def test_sqlite_backend_matches_regex_scan(large_knowledge_dir, sqlite_search, keywords):
+    """
+    Test that the SQLite FTS5 backend returns exactly what the regex scan returned.
+    """
+    csv_path = large_knowledge_dir / "test_cases.csv"
+    results = sqlite_search.filter_by_keywords(keywords)
+    assert [row["ID"] for row in results] == _regex_filter(csv_path, keywords)
+    assert all(set(row) == {"ID", "Title", "Summary", "SearchKeywords"} for row in results)
+
+
+# pylint: disable=redefined-outer-name
+def test_sqlite_sync_reimports_only_changed_rows(knowledge_dir, tmp_path):
+    """
+    Test that a re-sync only touches inserted, changed and deleted rows.
+    """
+    csv_path = knowledge_dir / "test_cases.csv"
+    database = TestCasesDB(tmp_path / "cache" / "test_cases.sqlite3", csv_path)
+    assert database.sync()["inserted"] == 2
+    assert database.sync()["unchanged"] == 2
+
+    _write_test_cases(
+        knowledge_dir,
+        [
+            ("C2", "Push", "Verify push", "push_mode, websocket, sse"),
+            ("C3", "Socket", "Verify socket", "websocket"),
+        ],
+    )
+    stat = csv_path.stat()
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    stats = database.sync()
+    assert stats == {"inserted": 1, "updated": 1, "moved": 0, "deleted": 1, "unchanged": 0}
+    assert database.match_keyword("SSE") == {0}
+    assert database.match_keyword("login") == set()
+    assert [row["ID"] for row in database.fetch_rows([1, 0])] == ["C2", "C3"]
+    database.close()
+
+
+# pylint: disable=redefined-outer-name
+def test_rank_by_keywords_returns_bounded_ordered_results(large_search):
+    """
+    Test that ranked retrieval returns at most top_k cases, highest score first.
+    """
+    search = large_search
+    results = search.rank_by_keywords(["automatic tab eviction", "cookie"], top_k=7)
+    assert len(results) == 7
+    scores = [row["Score"] for row in results]
+    assert scores == sorted(scores, reverse=True)
+    assert all(score > 0 for score in scores)
+    assert "eviction" in results[0]["SearchKeywords"].lower()
+
+    assert not search.rank_by_keywords(["cookie"], min_score=1000.0)
+    assert not search.rank_by_keywords(["Nonexistent Keyword"])
+    assert not search.rank_by_keywords(["cookie"], top_k=0)
+
+
+# pylint: disable=redefined-outer-name
+def test_sqlite_rank_by_keywords(sqlite_search):
+    """
+    Test that the SQLite backend ranks with FTS5 bm25 and honours top_k.
+    """
+    results = sqlite_search.rank_by_keywords(["automatic tab eviction"], top_k=5)
+    assert len(results) == 5
+    scores = [row["Score"] for row in results]
+    assert scores == sorted(scores, reverse=True)
+    assert all("eviction" in row["SearchKeywords"].lower() for row in results)
+
+
+# pylint: disable=redefined-outer-name
+def test_get_all_keywords_reads_one_keyword_per_line(knowledge_dir):
+    """
+    Test that the newline separated keywords file yields one sorted entry per keyword.
+    """
+    (knowledge_dir / "all_keywords.txt").write_text(
+        "websocket\nlogin\npush_mode, 3rd party auth flow\nlogin\n", encoding="utf-8"
+    )
+    search = SearchTestCases(
+        knowledge_dir / "test_cases.csv", knowledge_dir / "all_keywords.txt"
+    )
+    assert search.get_all_keywords() == [
+        "3rd party auth flow",
+        "login",
+        "push_mode",
+        "websocket",
+    ]
+
+
+def test_keyword_resolver_maps_terms_to_canonical_keywords():
+    """
+    Test that the trigram resolver finds canonical keywords for approximate terms.
+    """
+    keywords_path = Path(__file__).parent.parent / "knowledge" / "all_keywords.txt"
+    keywords = keywords_path.read_text(encoding="utf-8").splitlines()
+    resolver = KeywordResolver(keywords)
+
+    exact = resolver.resolve("3rd Party Auth Flow")
+    assert exact[0] == ("3rd party auth flow", 1.0)
+    assert "3rd party authentication flow" in [kw for kw, _ in exact]
+
+    assert resolver.resolve("Push_Mode")[0] == ("push mode", 1.0)
+    assert resolver.resolve("acept langauge")[0][0] == "accept-language"
+    assert len(resolver.resolve("audio", limit=2)) == 2
+    assert not resolver.resolve("zzqx")
+    assert not resolver.resolve("")
+
+
+# pylint: disable=redefined-outer-name
+def test_sqlite_backend_keeps_one_database_per_csv(knowledge_dir, tmp_path, monkeypatch):
+    """
+    Test that SQLite searches over different CSV files use separate databases.
+    """
+    monkeypatch.setitem(config.CONFIG, "CACHE_DIR", str(tmp_path / "cache"))
+    other_dir = tmp_path / "other"
+    other_dir.mkdir()
+    _write_test_cases(other_dir, [("C9", "Audio", "Verify audio", "websocket")])
+    keywords_path = knowledge_dir / "all_keywords.txt"
+
+    first = SearchTestCases(knowledge_dir / "test_cases.csv", keywords_path, backend="sqlite")
+    other = SearchTestCases(other_dir / "test_cases.csv", keywords_path, backend="sqlite")
+    again = SearchTestCases(knowledge_dir / "test_cases.csv", keywords_path, backend="sqlite")
+
+    assert len(list((tmp_path / "cache").glob("test_cases_*.sqlite3"))) == 2
+    assert [row["ID"] for row in first.filter_by_keywords(["websocket"])] == ["C2"]
+    assert [row["ID"] for row in other.filter_by_keywords(["websocket"])] == ["C9"]
+    assert [row["ID"] for row in again.filter_by_keywords(["websocket"])] == ["C2"]
@@ -0,0 +1,44 @@
+"""
+Unit tests for the LLM response cache.
+"""
+
+import sys
+from pathlib import Path
+
+from crewai import LLM
+
+# Add the src directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+# pylint: disable=wrong-import-position
+from src.agent_torero import config, llm
+
+
+def test_identical_calls_are_answered_from_the_cache(monkeypatch, tmp_path):
+    """
+    Test that a repeated call is served from the cache unless the prompt, the
+    parameters or the bypass switch differ.
+    """
+    monkeypatch.setitem(config.CONFIG, "LLM_CACHE", "true")
+    monkeypatch.setitem(config.CONFIG, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(llm, "_llm_cache", None)
+    calls = []
+
+    def fake_call(self, messages, **kwargs):  # pylint: disable=unused-argument
+        calls.append(messages)
+        return f"answer {len(calls)}"
+
+    monkeypatch.setattr(LLM, "call", fake_call)
+    model = llm.CachedLLM(model="gemini/gemini-2.5-flash", api_key="test", temperature=0.0)
+    messages = [{"role": "user", "content": "Review this diff"}]
+
+    assert model.call(messages) == "answer 1"
+    assert model.call([dict(message) for message in messages]) == "answer 1"
+    assert model.call([{"role": "user", "content": "Review that diff"}]) == "answer 2"
+    assert model.call(messages, use_cache=False) == "answer 3"
+    warmer = llm.CachedLLM(model="gemini/gemini-2.5-flash", api_key="test", temperature=0.5)
+    assert warmer.call(messages) == "answer 4"
+    assert model.call(messages, available_functions={"tool": print}) == "answer 5"
+
+    stats = llm.get_llm_cache().stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 3, 3)
@@ -0,0 +1,81 @@
+"""
+Unit tests for the Jira comment outbox.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add the src directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+# pylint: disable=wrong-import-position
+from agent_torero.outbox import CommentOutbox
+
+
+class FakePoster:
+    """
+    Records the comment batches it is given, failing the first 'failures' calls.
+    """
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.batches = []
+
+    def __call__(self, ticket_id, comments):
+        self.batches.append((ticket_id, dict(comments)))
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("Jira is down")
+        return {marker: f"{ticket_id}/{marker}" for marker in comments}
+
+
+def test_comments_are_batched_per_ticket_and_not_reposted(tmp_path):
+    """
+    Test that the pending comments of a ticket are posted together, and that
+    enqueuing a posted body again is a no-op while a new body is posted again.
+    """
+    poster = FakePoster()
+    outbox = CommentOutbox(tmp_path / "outbox.sqlite3", poster=poster)
+    outbox.start = lambda: None  # Flush by hand.
+
+    assert outbox.enqueue("RBI-1", "repo#1", "first draft")
+    assert outbox.enqueue("RBI-1", "repo#1", "final review")
+    assert outbox.enqueue("RBI-1", "repo#2", "other review")
+    assert outbox.enqueue("RBI-2", "repo#1", "final review")
+    assert outbox.flush() == 3
+
+    assert sorted(poster.batches) == [
+        ("RBI-1", {"repo#1": "final review", "repo#2": "other review"}),
+        ("RBI-2", {"repo#1": "final review"}),
+    ]
+    assert not outbox.enqueue("RBI-1", "repo#1", "final review")
+    assert outbox.enqueue("RBI-1", "repo#1", "updated review")
+    assert outbox.flush() == 1
+    assert poster.batches[-1] == ("RBI-1", {"repo#1": "updated review"})
+    assert outbox.status() == {"pending": 0, "sent": 3, "failed": 0}
+    outbox.close()
+
+
+def test_failed_posts_are_retried_with_backoff(tmp_path):
+    """
+    Test that the background flusher retries failed posts and gives up after max_attempts.
+    """
+    poster = FakePoster(failures=2)
+    outbox = CommentOutbox(
+        tmp_path / "outbox.sqlite3", poster=poster, max_attempts=3, backoff_seconds=0.05
+    )
+
+    started = time.perf_counter()
+    assert outbox.enqueue("RBI-1", "repo#1", "review")
+    assert outbox.drain(timeout=5)
+
+    assert len(poster.batches) == 3
+    assert time.perf_counter() - started >= 0.05 + 0.1
+    assert outbox.status() == {"pending": 0, "sent": 1, "failed": 0}
+
+    poster.failures = 3
+    outbox.enqueue("RBI-1", "repo#1", "second review")
+    assert outbox.drain(timeout=5)
+    assert outbox.status() == {"pending": 0, "sent": 0, "failed": 1}
+    outbox.close()
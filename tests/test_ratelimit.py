@@ -0,0 +1,136 @@
+"""
+Unit tests for the shared rate limit scheduler.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+from crewai import LLM
+
+# Add the src directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+# pylint: disable=wrong-import-position
+from src.agent_torero.llm import RateLimitedLLM
+from src.agent_torero.ratelimit import (TokenBucket, get_scheduler,
+                                        observe_response)
+
+
+def test_bucket_paces_callers_in_fifo_order():
+    """
+    Test that callers beyond the burst wait for tokens and are served first come first served.
+    """
+    bucket = TokenBucket("test", rate=20.0, capacity=1.0)
+    served = []
+    lock = threading.Lock()
+
+    def caller(number):
+        bucket.acquire()
+        with lock:
+            served.append(number)
+
+    started = time.monotonic()
+    threads = []
+    for number in range(5):
+        thread = threading.Thread(target=caller, args=(number,))
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.005)  # Queue the callers in order.
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    assert served == [0, 1, 2, 3, 4]
+    assert 0.18 <= elapsed < 0.5  # One free token, then 4 tokens at 20 per second.
+    metrics = bucket.metrics()
+    assert metrics["acquired"] == 5
+    assert metrics["waits"] >= 3
+    assert metrics["queued"] == 0
+
+
+def test_bucket_learns_from_rate_limit_headers():
+    """
+    Test that an exhausted budget pauses callers and 429s halve the rate.
+    """
+    bucket = TokenBucket("test", rate=100.0)
+    observe_response(
+        bucket, 200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(time.time() + 0.3)}
+    )
+    assert bucket.metrics()["blocked_for"] > 0
+    assert bucket.acquire() >= 0.2
+
+    bucket = TokenBucket("test", rate=100.0)
+    observe_response(bucket, 403, {})  # A plain permission error is not throttling.
+    observe_response(bucket, 429, {"Retry-After": "0"})
+    observe_response(bucket, 403, {"Retry-After": "0"})
+    metrics = bucket.metrics()
+    assert metrics["throttled"] == 2
+    assert metrics["rate"] == 25.0
+
+    observe_response(bucket, 200, {})
+    assert bucket.metrics()["rate"] == 35.0
+
+
+def test_exhausted_budget_blocks_until_reset_on_rejected_responses():
+    """
+    Test that a 403 reporting an exhausted budget, without Retry-After, pauses
+    callers until the reset instead of only slowing them down.
+    """
+    bucket = TokenBucket("test", rate=100.0)
+    observe_response(
+        bucket, 403, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(time.time() + 600)}
+    )
+    metrics = bucket.metrics()
+    assert metrics["throttled"] == 1
+    assert metrics["blocked_for"] > 590
+
+
+def test_budget_is_spread_only_once_it_runs_low():
+    """
+    Test that a near-full budget keeps the configured rate, and that a budget below
+    the low-water mark is spread evenly until the reset.
+    """
+    bucket = TokenBucket("test", rate=10.0)
+    reset = str(time.time() + 3600)
+    observe_response(
+        bucket,
+        200,
+        {"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "4990", "X-RateLimit-Reset": reset},
+    )
+    assert bucket.metrics()["rate"] == 10.0
+    started = time.monotonic()
+    for _ in range(20):
+        bucket.acquire()
+    assert time.monotonic() - started < 1.5  # 10 burst tokens, then 10 at 10 per second.
+
+    reset = str(time.time() + 100)
+    observe_response(
+        bucket,
+        200,
+        {"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "200", "X-RateLimit-Reset": reset},
+    )
+    assert 1.9 <= bucket.metrics()["rate"] <= 2.1
+
+
+def test_llm_retries_rate_limited_calls(monkeypatch):
+    """
+    Test that rate limited LLM calls are retried through the gemini bucket.
+    """
+    calls = []
+
+    def fake_call(self, messages, *args, **kwargs):  # pylint: disable=unused-argument
+        calls.append(messages)
+        if len(calls) < 3:
+            raise RuntimeError('429 RESOURCE_EXHAUSTED {"retryDelay": "0.01s"}')
+        return "done"
+
+    monkeypatch.setattr(LLM, "call", fake_call)
+    bucket = get_scheduler().bucket("gemini")
+    throttled = bucket.metrics()["throttled"]
+
+    llm = RateLimitedLLM(model="gemini/gemini-2.5-flash", api_key="test")
+    assert llm.call("hello") == "done"
+    assert len(calls) == 3
+    assert bucket.metrics()["throttled"] == throttled + 2
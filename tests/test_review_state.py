@@ -0,0 +1,34 @@
+"""
+Unit tests for the review state store.
+"""
+
+import sys
+from pathlib import Path
+
+# Add the src directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+# pylint: disable=wrong-import-position
+from agent_torero.review_state import ReviewStateStore
+
+
+def test_review_state_round_trip(tmp_path):
+    """
+    Test that the last review of each pull request is stored, replaced and persisted.
+    """
+    path = tmp_path / "review_state.sqlite3"
+    store = ReviewStateStore(path)
+    assert store.get("repo", 1) is None
+
+    store.save("repo", 1, "aaa", "# First review")
+    store.save("repo", 1, "bbb", "# Second review")
+    store.save("other", 1, "ccc", "# Other repo")
+    store.close()
+
+    store = ReviewStateStore(path)
+    state = store.get("repo", 1)
+    assert (state["head_sha"], state["report"]) == ("bbb", "# Second review")
+    assert store.get("other", 1)["head_sha"] == "ccc"
+
+    store.delete("repo", 1)
+    assert store.get("repo", 1) is None
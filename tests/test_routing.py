@@ -0,0 +1,103 @@
+"""
+Unit tests for the model routing between Gemini Flash and Pro.
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+from crewai import LLM
+
+# Add the src directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+# pylint: disable=wrong-import-position
+from src.agent_torero import config, routing
+
+REACT_PROMPT = "Use the format:\nThought: ...\nFinal Answer: the answer"
+
+
+def test_route_by_task_class_size_and_complexity():
+    """
+    Test that fetch calls go to Flash, synthesis to Pro, and analysis to Pro only
+    when its prompt is large or complex.
+    """
+    router = routing.ModelRouter(pro_min_tokens=1000, pro_min_complexity=3)
+
+    assert router.route("fetch", 50000, 100).model == routing.FLASH_MODEL
+    assert router.route("synthesis", 10, 0).model == routing.PRO_MODEL
+    assert router.route("unknown", 10, 0).model == routing.PRO_MODEL
+    small = router.route("analysis", 999, 2)
+    assert small == (routing.FLASH_MODEL, "medium", "small analysis task")
+    assert router.route("analysis", 1000, 0).model == routing.PRO_MODEL
+    assert router.route("analysis", 10, 3).reason == "complexity 3"
+    diff = "```diff\n@@ -1 +1 @@\n-a\n+b\n@@ -9 +9 @@\n```\n```\ncode\n```"
+    assert routing.complexity_score(diff) == 4
+
+
+def test_invalid_flash_answers_are_escalated_to_pro(monkeypatch):
+    """
+    Test that an unusable Flash answer is retried on Pro, and that the calls are
+    reported with the model that served them.
+    """
+    monkeypatch.setitem(config.CONFIG, "LLM_CACHE", "false")
+    served = []
+
+    def fake_call(self, messages, **kwargs):  # pylint: disable=unused-argument
+        served.append((self.model, self.stop))
+        if self.model == routing.FLASH_MODEL:
+            return "I think the answer is 42" if "broken" in messages else "Final Answer: 42"
+        return "Final Answer: 42"
+
+    monkeypatch.setattr(LLM, "call", fake_call)
+    router = routing.ModelRouter()
+    model = routing.RoutedLLM(router, "fetch", api_key="test")
+    model.stop = ["\nObservation:"]
+    fetch = SimpleNamespace(name="jira_tickets_info_task")
+    review = SimpleNamespace(name="review_and_synthesis_task")
+
+    assert model.call(REACT_PROMPT, from_task=fetch) == "Final Answer: 42"
+    assert model.call(REACT_PROMPT + " broken", from_task=fetch) == "Final Answer: 42"
+    assert model.call(REACT_PROMPT, from_task=review) == "Final Answer: 42"
+    assert [model for model, _ in served] == [
+        routing.FLASH_MODEL,
+        routing.FLASH_MODEL,
+        routing.PRO_MODEL,
+        routing.PRO_MODEL,
+    ]
+    assert all(stop == ["\nObservation:"] for _, stop in served)
+    # The stop words of the agent do not leak into the LLMs of other callers.
+    route = routing.Route(routing.FLASH_MODEL, "low", "fetch task")
+    assert not routing.get_route_llm(route).stop
+    assert routing.get_route_llm(route, ["\nObservation:"]).stop == ["\nObservation:"]
+
+    summary = router.summary()
+    assert summary["models"][routing.FLASH_MODEL]["calls"] == 2
+    assert summary["models"][routing.PRO_MODEL]["calls"] == 2
+    assert summary["escalations"] == 1
+    assert summary["cost_saved"] >= 0
+    assert [call["escalated"] for call in router.calls] == [False, True, False, False]
+    assert router.calls[2]["reason"].startswith("escalated")
+    assert "1 escalated" in router.format_summary()
+
+
+def test_failing_flash_calls_are_escalated_and_pro_errors_raised(monkeypatch):
+    """
+    Test that a Flash error falls back to Pro, while a Pro error is raised.
+    """
+    monkeypatch.setitem(config.CONFIG, "LLM_CACHE", "false")
+
+    def fake_call(self, messages, **kwargs):  # pylint: disable=unused-argument
+        raise RuntimeError(f"{self.model} is down")
+
+    monkeypatch.setattr(LLM, "call", fake_call)
+    router = routing.ModelRouter()
+
+    try:
+        router.call("jira_tickets_info_task", "fetch", "Summarize the tickets")
+    except RuntimeError as e:
+        assert routing.PRO_MODEL in str(e)
+    else:
+        raise AssertionError("the Pro error was not raised")
+    assert [call["model"] for call in router.calls] == [routing.FLASH_MODEL]
+    assert router.calls[0]["escalated"]
@@ -0,0 +1,91 @@
+"""
+Unit tests for the streaming of LLM output to report files.
+"""
+
+import sys
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+
+from crewai.events import LLMStreamChunkEvent, crewai_event_bus
+from crewai.events.types.llm_events import (LLMCallCompletedEvent,
+                                            LLMCallStartedEvent, LLMCallType)
+
+# Add the src directory to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+# pylint: disable=wrong-import-position
+from src.agent_torero.streaming import StreamListener, TaskStreams
+
+
+def _task(name, output_file=None):
+    return SimpleNamespace(
+        id=uuid.uuid4(), name=name, description=name, agent=None, output_file=output_file
+    )
+
+
+def _stream(task, chunks):
+    """Emit the events of a streamed LLM call of a task."""
+    source = SimpleNamespace(model="gemini/gemini-2.5-pro")
+    crewai_event_bus.emit(source, LLMCallStartedEvent(from_task=task, model=source.model))
+    for chunk in chunks:
+        crewai_event_bus.emit(source, LLMStreamChunkEvent(chunk=chunk, from_task=task))
+    crewai_event_bus.emit(
+        source,
+        LLMCallCompletedEvent(
+            response="".join(chunks), call_type=LLMCallType.LLM_CALL, from_task=task
+        ),
+    )
+
+
+def test_final_answer_is_written_to_the_output_file_as_it_streams(tmp_path):
+    """
+    Test that the final answer reaches the report while it is generated, that the
+    chunks go to the progress callback and that the calls are timed.
+    """
+    report = tmp_path / "reports" / "repo_7.md"
+    review = _task("review_and_synthesis_task", str(report))
+    fetch = _task("github_pull_request_details_task")
+    other_run = _task("review_and_synthesis_task", str(tmp_path / "other.md"))
+    progress = []
+    streams = TaskStreams([review, fetch], progress=lambda task, chunk: progress.append(task))
+
+    with crewai_event_bus.scoped_handlers():
+        listener = StreamListener(crewai_event_bus)
+        listener.register(streams)
+        _stream(fetch, ["Thought: fetch\n", "Final Answer: details"])
+        _stream(review, ["Thought: I know it\nFinal ", "Answer:", " ", "# Review\n"])
+        assert report.read_text(encoding="utf-8") == "# Review\n"
+        _stream(review, ["Final Answer: # Review\n", "Looks good."])
+        _stream(other_run, ["Final Answer: not mine"])
+        listener.unregister(streams)
+        _stream(review, ["Final Answer: after the run"])
+
+    assert report.read_text(encoding="utf-8") == "# Review\nLooks good."
+    assert not (tmp_path / "other.md").exists()
+    assert progress.count("review_and_synthesis_task") == 6
+    assert progress.count("github_pull_request_details_task") == 2
+    assert [call["task"] for call in streams.calls] == [
+        "github_pull_request_details_task",
+        "review_and_synthesis_task",
+        "review_and_synthesis_task",
+    ]
+    assert all(call["ttft"] <= call["seconds"] for call in streams.calls)
+    summary = streams.summary()
+    assert summary["review_and_synthesis_task"]["calls"] == 2
+    assert summary["review_and_synthesis_task"]["streamed"] == 2
+    assert "first token after" in streams.format_summary()
+
+
+def test_calls_without_chunks_have_no_time_to_first_token():
+    """
+    Test that a call answered without streaming is timed without a first token.
+    """
+    task = _task("jira_tickets_info_task")
+    streams = TaskStreams([task])
+    streams.started(str(task.id), "gemini/gemini-2.5-flash")
+    streams.finished(str(task.id))
+
+    assert streams.calls[0]["ttft"] is None
+    assert streams.summary()["jira_tickets_info_task"]["ttft_mean"] is None
+    assert "nothing streamed" in streams.format_summary()